@@ -0,0 +1,16 @@
+# bench/_app.py
+"""Aplicação apontando para um SQLite temporário, criado por ``init_database()``, para os benchmarks."""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_database_dir = tempfile.TemporaryDirectory()
+DATABASE_PATH = os.path.join(_database_dir.name, 'app.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DATABASE_PATH}'
+
+from src.main import app, init_database, db  # noqa: E402
+
+init_database()
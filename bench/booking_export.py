@@ -0,0 +1,69 @@
+# bench/booking_export.py
+"""
+Exportação de agendamentos em streaming x lista JSON (ver GET /bookings/export).
+
+Insere N agendamentos direto no SQLite temporário e consome a resposta pelo
+cliente de testes sem bufferizar, medindo tempo, tamanho e o aumento do pico de
+memória (RSS) do processo.
+
+    python bench/booking_export.py                       # 1 milhão de linhas, CSV
+    python bench/booking_export.py --rows 1000000 --format ndjson
+    python bench/booking_export.py --rows 100000 --format json   # GET /bookings (lista inteira)
+"""
+import argparse
+import resource
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from _app import app, DATABASE_PATH
+
+FIRST_DAY = date(2000, 1, 1)
+SLOTS_PER_DAY = 16
+
+
+def populate(rows):
+    connection = sqlite3.connect(DATABASE_PATH)
+    connection.execute("INSERT INTO customer (id, name, email, phone) VALUES (1, 'Cliente Teste', 'a@exemplo.com', '1')")
+    connection.executemany(
+        'INSERT INTO booking (customer_id, service_id, booking_date, booking_time, status, notes, price, created_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        ((1, 1 + i % 25, (FIRST_DAY + timedelta(days=i // SLOTS_PER_DAY)).isoformat(),
+          f'{8 + (i % SLOTS_PER_DAY) // 2:02d}:{30 * (i % 2):02d}:00.000000', 'confirmed', 'obs', 120.0,
+          '2024-01-01 00:00:00.000000') for i in range(rows)))
+    connection.commit()
+    connection.close()
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--format', choices=('csv', 'ndjson', 'json'), default='csv',
+                        help='csv/ndjson usam /bookings/export; json usa a lista de GET /bookings')
+    args = parser.parse_args()
+
+    populate(args.rows)
+    client = app.test_client()
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    size = lines = 0
+    if args.format == 'json':
+        response = client.get(f'/api/bookings?start_date={FIRST_DAY.isoformat()}')
+        size, lines = len(response.data), len(response.json)
+    else:
+        response = client.get(f'/api/bookings/export?format={args.format}', buffered=False)
+        for chunk in response.response:
+            size += len(chunk)
+            lines += chunk.count(b'\n')
+        response.close()
+    elapsed = time.perf_counter() - started
+    print(f'{args.format}: {args.rows} agendamentos, {lines} linhas, {elapsed:.1f} s, '
+          f'{size / 1e6:.0f} MB, pico de RSS +{peak_rss_mb() - baseline:.0f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# bench/customer_search.py
+"""
+Busca de clientes por prefixo (ver GET /customers/search em src/routes/customers.py).
+
+Insere N clientes com nomes, e-mails e telefones variados e mede o melhor tempo da
+rota para buscas por nome, e-mail e telefone, ao lado do plano e do tempo da mesma
+busca feita com ``LIKE '%...%'`` (varredura da tabela inteira).
+
+    python bench/customer_search.py
+    python bench/customer_search.py --rows 500000
+"""
+import argparse
+import random
+import sqlite3
+import time
+
+from _app import app, DATABASE_PATH
+from src.models.customer import Customer, normalize_name
+
+REPEAT = 20
+FIRST_NAMES = ('Ana', 'Beatriz', 'Carla', 'Daniela', 'Eduarda', 'Fernanda', 'Gabriela', 'Helena', 'Isabela',
+               'Júlia', 'Larissa', 'Mariana', 'Natália', 'Paula', 'Renata', 'Sofia', 'Tatiane', 'Vitória',
+               'João', 'Pedro', 'Lucas', 'Márcio', 'Rafael', 'Tiago')
+LAST_NAMES = ('Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Costa', 'Rodrigues', 'Almeida',
+              'Nascimento', 'Araújo', 'Carvalho', 'Gomes', 'Martins', 'Ribeiro', 'Conceição')
+# (descrição, q, filtro LIKE equivalente)
+SEARCHES = (
+    ('nome comum', 'ana', "name LIKE '%ana%'"),
+    ('nome e sobrenome', 'mariana sou', "name LIKE '%mariana sou%'"),
+    ('nome raro', 'vitória conceição 99', "name LIKE '%vitória conceição 99%'"),
+    ('e-mail', 'julia.lima.1', "email LIKE '%julia.lima.1%'"),
+    ('telefone', '(11) 90000-1', "phone LIKE '%90000-1%'"),
+)
+
+
+def populate(rows):
+    random.seed(7)
+    connection = sqlite3.connect(DATABASE_PATH)
+    customers = []
+    for number in range(rows):
+        first, last = random.choice(FIRST_NAMES), random.choice(LAST_NAMES)
+        name = f'{first} {last} {number % 1000}'
+        email = f'{normalize_name(first)}.{normalize_name(last)}.{number}@exemplo.com'
+        phone = f'(11) 9{number // 10000:04d}-{number % 10000:04d}'
+        customers.append(Customer.normalized_values(name, email, phone))
+    connection.executemany(
+        'INSERT INTO customer (name, email, phone, name_normalized, email_normalized, phone_normalized, created_at) '
+        "VALUES (:name, :email, :phone, :name_normalized, :email_normalized, :phone_normalized, '2024-01-01')",
+        customers)
+    connection.commit()
+    connection.execute('ANALYZE')
+    connection.commit()
+    return connection
+
+
+def best_of(call):
+    best = float('inf')
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    connection = populate(args.rows)
+    client = app.test_client()
+    for label, query_text, like_filter in SEARCHES:
+        def search():
+            response = client.get('/api/customers/search', query_string={'q': query_text})
+            assert response.status_code == 200, response.json
+            return response.json['customers']
+
+        found = len(search())
+        like_sql = f'SELECT * FROM customer WHERE {like_filter} ORDER BY name LIMIT 20'
+        like_plan = ' | '.join(row[3] for row in connection.execute(f'EXPLAIN QUERY PLAN {like_sql}'))
+        like_ms = best_of(lambda: connection.execute(like_sql).fetchall())
+        print(f'{label:<18} {found:>2} resultado(s)  rota {best_of(search):6.2f} ms  '
+              f'LIKE {like_ms:7.2f} ms ({like_plan})')
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
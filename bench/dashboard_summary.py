@@ -0,0 +1,85 @@
+# bench/dashboard_summary.py
+"""
+Resumo do dashboard em uma chamada x as quatro rotas separadas (ver src/dashboard.py).
+
+Insere N agendamentos (1 em cada 7 cancelado) em torno de hoje, reconstrói os
+rollups e mede o melhor tempo e a quantidade de comandos SQL de: as quatro rotas
+do dashboard, /admin/dashboard/summary sem cache e com o cache quente, e cada
+rota isolada.
+
+    python bench/dashboard_summary.py
+    python bench/dashboard_summary.py --rows 50000
+"""
+import argparse
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from _app import app, db, DATABASE_PATH
+from src.rollups import rebuild_booking_rollups
+
+SLOTS_PER_DAY = 16
+REPEAT = 20
+DASHBOARD_ROUTES = ('daily-appointments-count', 'next-appointments', 'appointments-by-service',
+                    'appointments-by-month')
+
+
+def populate(rows):
+    first_day = date.today() - timedelta(days=rows // (2 * SLOTS_PER_DAY))
+    connection = sqlite3.connect(DATABASE_PATH)
+    connection.execute("INSERT INTO customer (id, name, email, phone) VALUES (1, 'Cliente', 'a@exemplo.com', '1')")
+    connection.executemany(
+        'INSERT INTO booking (customer_id, service_id, booking_date, booking_time, status, notes, price, created_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        ((1, 1 + i % 25, (first_day + timedelta(days=i // SLOTS_PER_DAY)).isoformat(),
+          f'{8 + (i % SLOTS_PER_DAY) // 2:02d}:{30 * (i % 2):02d}:00.000000',
+          'confirmed' if i % 7 else 'cancelled', '', 120.0, '2024-01-01 00:00:00.000000') for i in range(rows)))
+    connection.commit()
+    connection.close()
+    with app.app_context():
+        rebuild_booking_rollups()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    populate(args.rows)
+    client = app.test_client()
+    statements = [0]
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *_: statements.__setitem__(0, statements[0] + 1))
+
+    def measure(label, call):
+        best = float('inf')
+        for _ in range(REPEAT):
+            started = time.perf_counter()
+            call()
+            best = min(best, time.perf_counter() - started)
+        statements[0] = 0
+        call()
+        print(f'{label:<28} {best * 1000:8.2f} ms  {statements[0]} comando(s) SQL')
+
+    def get(url):
+        response = client.get(url)
+        assert response.status_code == 200, response.json
+
+    def four_routes():
+        for route in DASHBOARD_ROUTES:
+            get(f'/api/admin/dashboard/{route}')
+
+    app.config['DASHBOARD_CACHE_SECONDS'] = 0
+    measure('4 rotas', four_routes)
+    measure('summary sem cache', lambda: get('/api/admin/dashboard/summary'))
+    app.config['DASHBOARD_CACHE_SECONDS'] = 5
+    get('/api/admin/dashboard/summary')
+    measure('summary com cache', lambda: get('/api/admin/dashboard/summary'))
+    for route in DASHBOARD_ROUTES:
+        measure(route, lambda route=route: get(f'/api/admin/dashboard/{route}'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# bench/date_range_filters.py
+"""
+Filtros de data com strftime x intervalos semiabertos (ver src/routes/admin.py).
+
+Preenche um SQLite temporário com N bloqueios e N agendamentos espalhados por
+~11 anos e compara o plano (EXPLAIN QUERY PLAN) e o tempo médio das consultas
+do mês de bloqueios e da contagem por mês do dashboard, nas duas formas.
+
+    python bench/date_range_filters.py            # 500 mil linhas em cada tabela
+    python bench/date_range_filters.py --rows 100000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select
+
+from src.extensions import db
+from src.models.booking import Booking
+from src.models.blocked_time import BlockedTime
+from src.models.customer import Customer
+from src.models.service import Service
+
+FIRST_DAY = date(2015, 1, 1)
+DAYS = 4000
+REPEAT = 20
+
+
+def populate(path, rows):
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine, tables=[Customer.__table__, Service.__table__, Booking.__table__,
+                                           BlockedTime.__table__])
+    connection = sqlite3.connect(path)
+    random.seed(3)
+    connection.executemany(
+        'INSERT INTO blocked_time (blocked_date, start_time, end_time, reason, active) VALUES (?, ?, ?, ?, ?)',
+        (((FIRST_DAY + timedelta(days=random.randrange(DAYS))).isoformat(), '14:00:00.000000', '14:29:00.000000',
+          'bench', random.random() < 0.3) for _ in range(rows)))
+    connection.executemany(
+        'INSERT OR IGNORE INTO booking (customer_id, service_id, booking_date, booking_time, status) '
+        'VALUES (1, 1, ?, ?, ?)',
+        (((FIRST_DAY + timedelta(days=random.randrange(DAYS))).isoformat(),
+          '%02d:%02d:00.000000' % (i % 24, (i // 24) % 60), random.choice(['confirmed', 'cancelled']))
+         for i in range(rows)))
+    connection.commit()
+    connection.execute('ANALYZE')
+    connection.commit()
+    return engine, connection
+
+
+def measure(engine, connection, label, statement):
+    sql = str(statement.compile(engine, compile_kwargs={'literal_binds': True}))
+    plan = ' | '.join(row[3] for row in connection.execute(f'EXPLAIN QUERY PLAN {sql}'))
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        connection.execute(sql).fetchall()
+    elapsed = (time.perf_counter() - started) / REPEAT * 1000
+    print(f'{label:<34} {elapsed:8.2f} ms  {plan}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500_000, help='linhas em blocked_time e em booking')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine, connection = populate(os.path.join(directory, 'bench.db'), args.rows)
+        month_start, month_end = date(2020, 7, 1), date(2020, 8, 1)
+        year_start, year_end = date(2020, 1, 1), date(2021, 1, 1)
+
+        measure(engine, connection, 'bloqueios do mês, strftime', select(BlockedTime.id).where(
+            func.strftime('%Y-%m', BlockedTime.blocked_date) == '2020-07', BlockedTime.active == True))
+        measure(engine, connection, 'bloqueios do mês, intervalo', select(BlockedTime.id).where(
+            BlockedTime.blocked_date >= month_start, BlockedTime.blocked_date < month_end,
+            BlockedTime.active == True))
+
+        month = func.strftime('%m', Booking.booking_date).label('month')
+        measure(engine, connection, 'agendamentos por mês, strftime',
+                select(month, func.count(Booking.id)).where(
+                    func.strftime('%Y', Booking.booking_date) == '2020', Booking.status == 'confirmed')
+                .group_by(month))
+        measure(engine, connection, 'agendamentos por mês, intervalo',
+                select(month, func.count(Booking.id)).where(
+                    Booking.booking_date >= year_start, Booking.booking_date < year_end,
+                    Booking.status == 'confirmed')
+                .group_by(month))
+        connection.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
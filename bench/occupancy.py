@@ -0,0 +1,75 @@
+# bench/occupancy.py
+"""
+Ocupação por dia da semana x horário (ver src/analytics.py e /admin/analytics/occupancy).
+
+Insere N agendamentos (1 em cada 7 cancelado) nos dias que terminam ontem, um por
+slot de 30 minutos do dia, e mede o melhor tempo de ``analytics.occupancy()`` e da
+rota inteira para 12 meses e para o máximo de meses, com o número de agendamentos
+confirmados de cada período.
+
+    python bench/occupancy.py
+    python bench/occupancy.py --rows 500000
+"""
+import argparse
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from _app import app, DATABASE_PATH
+from src import analytics
+from src.models.booking import Booking
+
+SLOTS_PER_DAY = 48
+REPEAT = 20
+
+
+def populate(rows):
+    first_day = date.today() - timedelta(days=-(-rows // SLOTS_PER_DAY))
+    connection = sqlite3.connect(DATABASE_PATH)
+    connection.execute("INSERT INTO customer (id, name, email, phone) VALUES (1, 'Cliente', 'a@exemplo.com', '1')")
+    connection.executemany(
+        'INSERT INTO booking (customer_id, service_id, booking_date, booking_time, status, notes, price, created_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        ((1, 1 + i % 25, (first_day + timedelta(days=i // SLOTS_PER_DAY)).isoformat(),
+          f'{(i % SLOTS_PER_DAY) // 2:02d}:{30 * (i % 2):02d}:00.000000',
+          'confirmed' if i % 7 else 'cancelled', '', 120.0, '2024-01-01 00:00:00.000000') for i in range(rows)))
+    connection.commit()
+    connection.execute('ANALYZE')
+    connection.commit()
+    connection.close()
+
+
+def best_of(call):
+    best = float('inf')
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    populate(args.rows)
+    client = app.test_client()
+    end_date = date.today()
+    for months in (12, analytics.MAX_OCCUPANCY_MONTHS):
+        start_date = analytics.months_before(end_date, months)
+        with app.app_context():
+            confirmed = Booking.query.filter(Booking.status == 'confirmed', Booking.booking_date >= start_date,
+                                             Booking.booking_date < end_date).count()
+            function_ms = best_of(lambda: analytics.occupancy(start_date, end_date))
+
+        def route():
+            response = client.get(f'/api/admin/analytics/occupancy?months={months}')
+            assert response.status_code == 200, response.json
+
+        print(f'{months:>2} meses ({confirmed} confirmados de {args.rows}): '
+              f'occupancy() {function_ms:7.2f} ms  rota {best_of(route):7.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# bench/slot_hold_contention.py
+"""
+Disputa pelo mesmo horário com e sem holds (ver src/slot_holds.py).
+
+Em cada rodada, N clientes (threads, cada um com o próprio client_token) pedem o mesmo
+horário ao mesmo tempo. Sem holds, todos abrem uma transação de escrita e os
+perdedores colidem na UniqueConstraint (IntegrityError + rollback). Com holds, só
+quem ganhou o POST /slot-holds chega a escrever; os demais desistem com 409 sem
+abrir transação.
+
+    python bench/slot_hold_contention.py
+    python bench/slot_hold_contention.py --clients 50 --rounds 10
+"""
+import argparse
+import collections
+import threading
+import time
+from datetime import date, timedelta
+
+from _app import app
+
+BOOKING_TIME = '15:00'
+
+
+def _weekdays(count):
+    """Próximos ``count`` dias úteis a partir de uma semana à frente (dentro do horizonte dos holds)."""
+    days = []
+    current_date = date.today() + timedelta(days=7)
+    while len(days) < count:
+        if current_date.isoweekday() <= 5:
+            days.append(current_date.isoformat())
+        current_date += timedelta(days=1)
+    return days
+
+
+def run_round(booking_date, clients, use_holds):
+    outcomes = collections.Counter()
+    barrier = threading.Barrier(clients)
+
+    def customer(number):
+        client = app.test_client()
+        payload = {'customer': {'name': 'Cliente', 'email': f'{use_holds}-{booking_date}-{number}@exemplo.com',
+                                'phone': f'{use_holds:d}{booking_date.replace("-", "")}{number:04d}'},
+                   'booking_date': booking_date, 'booking_time': BOOKING_TIME, 'service_id': 1}
+        barrier.wait()
+        if use_holds:
+            response = client.post('/api/slot-holds', json={
+                'booking_date': booking_date, 'booking_time': BOOKING_TIME, 'service_id': 1,
+                'client_token': f'cliente-{number}'})
+            if response.status_code != 201:
+                outcomes['desistiu no hold (sem transação)'] += 1
+                return
+            payload['hold_token'] = response.json['hold_token']
+        response = client.post('/api/bookings', json=payload)
+        outcomes['transações de escrita'] += 1
+        if response.status_code == 201:
+            outcomes['201'] += 1
+        elif 'acabou de ser' in response.json.get('error', ''):
+            outcomes['IntegrityError + rollback'] += 1
+        else:
+            outcomes[f"{response.status_code} {response.json.get('error')}"] += 1
+
+    threads = [threading.Thread(target=customer, args=(number,)) for number in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=30, help='clientes disputando cada horário')
+    parser.add_argument('--rounds', type=int, default=5, help='rodadas (dias diferentes) por modo')
+    args = parser.parse_args()
+
+    days = _weekdays(args.rounds * 2)
+    for use_holds, mode_days in ((False, days[:args.rounds]), (True, days[args.rounds:])):
+        totals = collections.Counter()
+        elapsed = 0.0
+        for booking_date in mode_days:
+            outcomes, seconds = run_round(booking_date, args.clients, use_holds)
+            totals += outcomes
+            elapsed += seconds
+        print(f"{'com holds' if use_holds else 'sem holds':<10} {dict(totals)}  "
+              f"{elapsed * 1000 / args.rounds:.0f} ms/rodada")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+# src/analytics.py
+"""
+Relatórios administrativos: ocupação da agenda e faturamento.
+
+Ocupação: por dia da semana e slot de 30 minutos.
+
+A capacidade de cada (dia da semana, slot) vem dos modelos compilados em
+src/schedule.py: os slots de funcionamento menos as regras recorrentes, somados
+em todas as ocorrências daquele dia da semana no período. Os agendamentos
+confirmados são agregados pelo próprio SQLite em poucas centenas de linhas
+(dia da semana, horário, serviço, quantidade), e cada linha vira a máscara dos
+slots que o atendimento ocupa, somada de uma vez pela quantidade. Assim o custo
+não cresce com o número de objetos Booking e não há ORM no laço.
+
+Faturamento: soma dos preços registrados nos agendamentos confirmados
+(``Booking.price``), lida do rollup booking_daily_count, que já guarda o
+faturamento por (dia, serviço). O SQLite agrupa os dias por período e a
+categoria vem do catálogo.
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import func
+
+from src.models.user import db
+from src.models.booking import Booking
+from src.models.booking_daily_count import BookingDailyCount
+from src.catalog import get_catalog
+from src import slot_engine, schedule
+
+DEFAULT_OCCUPANCY_MONTHS = 3
+MAX_OCCUPANCY_MONTHS = 24
+REVENUE_GRANULARITIES = ('day', 'week', 'month')
+
+
+def months_before(d, months):
+    """A mesma data ``months`` meses antes (limitada ao último dia do mês de destino)."""
+    month_index = d.year * 12 + d.month - 1 - months
+    year, month = divmod(month_index, 12)
+    first_of_next = date(year + (month + 1) // 12, (month + 1) % 12 + 1, 1)
+    return date(year, month + 1, min(d.day, (first_of_next - timedelta(days=1)).day))
+
+
+def weekday_occurrences(start_date, end_date):
+    """Quantas vezes cada dia da semana ISO (índices 1 a 7) aparece em [start, end)."""
+    total_days = max((end_date - start_date).days, 0)
+    full_weeks, remainder = divmod(total_days, 7)
+    occurrences = [0] + [full_weeks] * 7
+    first = start_date.isoweekday()
+    for offset in range(remainder):
+        occurrences[(first - 1 + offset) % 7 + 1] += 1
+    return occurrences
+
+
+def _confirmed_counts(start_date, end_date):
+    """Linhas ``(dia da semana SQLite, horário, serviço, quantidade)`` dos agendamentos confirmados em [start, end)."""
+    weekday = func.strftime('%w', Booking.booking_date)
+    return db.session.query(weekday, Booking.booking_time, Booking.service_id, func.count()) \
+        .filter(Booking.status == 'confirmed',
+                Booking.booking_date >= start_date,
+                Booking.booking_date < end_date) \
+        .group_by(weekday, Booking.booking_time, Booking.service_id).all()
+
+
+def occupancy(start_date, end_date):
+    """
+    Retorna ``(capacity, booked)``, matrizes 8 x 48 indexadas por dia da semana ISO e
+    slot: quantos slots reserváveis existiram e quantos foram ocupados por agendamentos
+    confirmados em [start, end). Slots ocupados fora da capacidade (ex.: um atendimento
+    que passa do horário de funcionamento) não entram na conta.
+    """
+    working, recurring = schedule.get_templates()
+    open_masks = [working[weekday] & ~recurring[weekday] for weekday in range(8)]
+    occurrences = weekday_occurrences(start_date, end_date)
+
+    capacity = [[0] * slot_engine.SLOTS_PER_DAY for _ in range(8)]
+    for weekday in range(1, 8):
+        mask = open_masks[weekday]
+        while mask:
+            lowest = mask & -mask
+            capacity[weekday][lowest.bit_length() - 1] = occurrences[weekday]
+            mask ^= lowest
+
+    catalog = get_catalog()
+    booked = [[0] * slot_engine.SLOTS_PER_DAY for _ in range(8)]
+    for sqlite_weekday, booking_time, service_id, count in _confirmed_counts(start_date, end_date):
+        weekday = int(sqlite_weekday) or 7  # strftime('%w') usa 0 para domingo
+        service = catalog.get(service_id)
+        duration = (service.duration_minutes if service else None) or slot_engine.SLOT_MINUTES
+        mask = slot_engine.duration_mask(booking_time, duration) & open_masks[weekday]
+        row = booked[weekday]
+        while mask:
+            lowest = mask & -mask
+            row[lowest.bit_length() - 1] += count
+            mask ^= lowest
+    return capacity, booked
+
+
+def _period_start(granularity):
+    """Expressão SQL da data inicial do período (dia, semana começando na segunda ou mês) de cada dia."""
+    if granularity == 'day':
+        return func.date(BookingDailyCount.day)
+    if granularity == 'week':
+        return func.date(BookingDailyCount.day, 'weekday 0', '-6 days')
+    return func.date(BookingDailyCount.day, 'start of month')
+
+
+def revenue_by_period(start_date, end_date, granularity):
+    """
+    Faturamento e quantidade de agendamentos confirmados em [start, end), por período,
+    serviço e categoria. Retorna ``(periods, totals)`` prontos para serializar.
+    """
+    if granularity not in REVENUE_GRANULARITIES:
+        raise ValueError(f"granularity deve ser um de: {', '.join(REVENUE_GRANULARITIES)}.")
+    period = _period_start(granularity).label('period')
+    rows = db.session.query(
+        period, BookingDailyCount.service_id,
+        func.sum(BookingDailyCount.confirmed_count), func.sum(BookingDailyCount.revenue)
+    ).filter(
+        BookingDailyCount.day >= start_date,
+        BookingDailyCount.day < end_date
+    ).group_by(period, BookingDailyCount.service_id) \
+        .order_by(period) \
+        .all()
+
+    catalog = get_catalog()
+    categories = sorted({service.category for service in catalog.services})
+    periods = {}
+    totals = {'bookings': 0, 'revenue': 0.0, 'by_category': dict.fromkeys(categories, 0.0)}
+    totals_by_service = {}
+    for period_start, service_id, count, revenue in rows:
+        if not count:
+            continue
+        service = catalog.get(service_id)
+        category = service.category if service else None
+        entry = periods.get(period_start)
+        if entry is None:
+            entry = periods[period_start] = {
+                'period_start': period_start, 'bookings': 0, 'revenue': 0.0,
+                'by_category': dict.fromkeys(categories, 0.0), 'by_service': [],
+            }
+        entry['bookings'] += count
+        entry['revenue'] += revenue
+        entry['by_service'].append({'service_id': service_id, 'service': service.name if service else None,
+                                    'category': category, 'bookings': count, 'revenue': revenue})
+        totals['bookings'] += count
+        totals['revenue'] += revenue
+        service_total = totals_by_service.setdefault(service_id, {
+            'service_id': service_id, 'service': service.name if service else None,
+            'category': category, 'bookings': 0, 'revenue': 0.0})
+        service_total['bookings'] += count
+        service_total['revenue'] += revenue
+        if category is not None:  # Serviço apagado do catálogo: entra só nos totais
+            entry['by_category'][category] = entry['by_category'].get(category, 0.0) + revenue
+            totals['by_category'][category] = totals['by_category'].get(category, 0.0) + revenue
+
+    totals['by_service'] = list(totals_by_service.values())
+    for entry in list(periods.values()) + [totals]:
+        entry['revenue'] = round(entry['revenue'], 2)
+        entry['by_category'] = {category: round(value, 2) for category, value in entry['by_category'].items()}
+        for service_entry in entry['by_service']:
+            service_entry['revenue'] = round(service_entry['revenue'], 2)
+        entry['by_service'].sort(key=lambda item: item['revenue'], reverse=True)
+    return list(periods.values()), totals
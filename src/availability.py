@@ -0,0 +1,143 @@
+# src/availability.py
+"""
+Disponibilidade materializada por dia.
+
+As rotas de escrita chamam ``refresh_day_availability`` antes do commit, na mesma
+transação que altera os BlockedTime, e as rotas de leitura fazem apenas uma busca
+pela chave primária (ou um intervalo de chaves) em ``day_availability``.
+Dias sem linha não têm bloqueios ativos.
+
+Quando há assinantes do dia (``/availability/stream``), o recálculo também compara
+os slots reserváveis antes e depois e publica o delta no hub depois do commit.
+"""
+from datetime import datetime, date, timedelta
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects.sqlite import insert
+
+from src.models.user import db
+from src.models.blocked_time import BlockedTime
+from src.models.day_availability import DayAvailability
+from src import slot_engine, schedule
+from src.availability_events import availability_hub
+from src.commit_hooks import after_commit
+
+
+def refresh_day_availability(target_date):
+    """Recalcula a linha materializada de ``target_date`` a partir dos bloqueios ativos."""
+    blocked_mask, full_day_closed = slot_engine.blocks_mask(
+        BlockedTime.query.with_entities(BlockedTime.start_time, BlockedTime.end_time)
+        .filter_by(blocked_date=target_date, active=True).all()
+    )
+    if availability_hub.has_subscribers(target_date):
+        _queue_availability_delta(target_date, blocked_mask, full_day_closed)
+    values = {'blocked_mask': blocked_mask, 'full_day_closed': full_day_closed, 'updated_at': datetime.utcnow()}
+    db.session.execute(
+        insert(DayAvailability)
+        .values(day=target_date, version=1, **values)
+        .on_conflict_do_update(index_elements=[DayAvailability.day],
+                               set_=dict(values, version=DayAvailability.version + 1))
+    )
+    return blocked_mask, full_day_closed
+
+
+def _queue_availability_delta(target_date, blocked_mask, full_day_closed):
+    """Agenda para depois do commit a publicação dos slots que abriram ou fecharam no dia."""
+    previous = db.session.execute(
+        db.select(DayAvailability.blocked_mask, DayAvailability.full_day_closed)
+        .where(DayAvailability.day == target_date)
+    ).first()
+    old_free = schedule.bookable_mask(target_date, *(previous or (0, False)))
+    new_free = schedule.bookable_mask(target_date, blocked_mask, full_day_closed)
+    if old_free == new_free:
+        return
+    event = {
+        'type': 'availability',
+        'date': target_date.isoformat(),
+        'added': slot_engine.mask_labels(new_free & ~old_free),
+        'removed': slot_engine.mask_labels(old_free & ~new_free),
+    }
+    after_commit(lambda: availability_hub.publish(target_date, event))
+
+
+def get_day_availability(target_date):
+    """
+    Retorna ``(blocked_mask, full_day_closed, version)`` de um dia. A versão muda a cada
+    recálculo e serve de base para o ETag das rotas de disponibilidade.
+    """
+    row = db.session.get(DayAvailability, target_date)
+    if row is None:
+        return 0, False, 0
+    return row.blocked_mask, row.full_day_closed, row.version
+
+
+def get_availability_range(start_date, end_date):
+    """
+    Retorna ``{data: (blocked_mask, full_day_closed, version)}`` para os dias materializados
+    em [start, end).
+    """
+    rows = db.session.query(
+        DayAvailability.day, DayAvailability.blocked_mask, DayAvailability.full_day_closed, DayAvailability.version
+    ).filter(DayAvailability.day >= start_date, DayAvailability.day < end_date).all()
+    return {day: (blocked_mask, full_day_closed, version) for day, blocked_mask, full_day_closed, version in rows}
+
+
+def find_conflicting_block(target_date, start_time, duration_minutes, exclude_booking_id=None):
+    """
+    Retorna o primeiro BlockedTime ativo que intersecta [start_time, start_time + duração)
+    na data, ou None. Bloqueios de dia inteiro (sem início e fim) sempre conflitam e vêm
+    primeiro, pois NULL ordena antes no SQLite.
+
+    A sobreposição é resolvida pelo banco: o índice parcial ix_blocked_time_active_day
+    já entrega os bloqueios ativos do dia ordenados por início, e a busca para no primeiro
+    conflito, então o caminho de escrita não materializa os bloqueios do dia enquanto
+    segura o lock.
+    """
+    end_time = (datetime.combine(date.min, start_time) + timedelta(minutes=duration_minutes)).time()
+    query = BlockedTime.query.filter(
+        BlockedTime.blocked_date == target_date,
+        BlockedTime.active == True,
+        or_(
+            and_(BlockedTime.start_time == None, BlockedTime.end_time == None),
+            and_(BlockedTime.start_time < end_time, BlockedTime.end_time > start_time)
+        )
+    )
+    if exclude_booking_id is not None:
+        query = query.filter(or_(BlockedTime.booking_id == None, BlockedTime.booking_id != exclude_booking_id))
+    return query.order_by(BlockedTime.start_time).first()
+
+
+def rebuild_day_availability():
+    """
+    Reconstrói a tabela inteira a partir dos BlockedTime ativos (carga inicial ou reparo).
+
+    As linhas são atualizadas no lugar, nunca apagadas: um dia que mudou ganha
+    ``version + 1`` e os demais mantêm a versão, então um ETag ``(dia, versão)`` nunca
+    volta a um valor que um cliente já guardou com outro conteúdo.
+    """
+    blocks_by_day = {}
+    for blocked_date, start_time, end_time in db.session.query(
+            BlockedTime.blocked_date, BlockedTime.start_time, BlockedTime.end_time
+    ).filter(BlockedTime.active == True):
+        blocks_by_day.setdefault(blocked_date, []).append((start_time, end_time))
+
+    # Dias já materializados que ficaram sem bloqueios voltam para máscara vazia
+    days = set(blocks_by_day).union(day for (day,) in db.session.query(DayAvailability.day))
+    now = datetime.utcnow()
+    rows = []
+    for day in days:
+        blocked_mask, full_day_closed = slot_engine.blocks_mask(blocks_by_day.get(day, ()))
+        rows.append({'day': day, 'blocked_mask': blocked_mask, 'full_day_closed': full_day_closed,
+                     'version': 1, 'updated_at': now})
+    if rows:
+        statement = insert(DayAvailability)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[DayAvailability.day],
+            set_={'blocked_mask': statement.excluded.blocked_mask,
+                  'full_day_closed': statement.excluded.full_day_closed,
+                  'updated_at': statement.excluded.updated_at,
+                  'version': DayAvailability.version + 1},
+            where=or_(DayAvailability.blocked_mask != statement.excluded.blocked_mask,
+                      DayAvailability.full_day_closed != statement.excluded.full_day_closed)
+        ), rows)
+    db.session.commit()
+    return len(blocks_by_day)
@@ -0,0 +1,87 @@
+# src/availability_events.py
+"""
+Hub pub/sub em processo para mudanças de disponibilidade por data.
+
+Cada assinante é apenas uma fila limitada registrada para uma data; o hub não
+cria threads, e publicar custa O(assinantes daquela data). As rotas de escrita
+publicam (via src/availability.py) somente o delta de slots que ficaram livres
+ou ocupados, depois do commit.
+
+Em um servidor WSGI com threads (``flask run``) cada conexão SSE ocupa uma thread
+do sistema enquanto está aberta. O contêiner (src/Dockerfile) roda gunicorn com um
+único worker gevent: as filas e locks passam a ser cooperativos e cada assinante
+bloqueia apenas a própria greenlet (ver tests/test_availability_stream.py). O hub
+vive na memória do processo, então os assinantes e as escritas precisam estar no
+mesmo worker.
+"""
+import queue
+import threading
+
+# Eventos pendentes por assinante antes de pedir ao cliente que recarregue o dia
+SUBSCRIBER_QUEUE_SIZE = 64
+
+
+class Subscription:
+    """Assinatura das mudanças de uma data."""
+
+    def __init__(self, target_date):
+        self.target_date = target_date
+        self.events = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def get(self, timeout):
+        """Próximo evento, ou None se nada chegou dentro de ``timeout`` segundos."""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AvailabilityHub:
+    """Distribui eventos de disponibilidade para os assinantes de cada data."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, target_date):
+        subscription = Subscription(target_date)
+        with self._lock:
+            self._subscribers.setdefault(target_date, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.target_date)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.target_date]
+
+    def has_subscribers(self, target_date):
+        return target_date in self._subscribers
+
+    def subscriber_count(self, target_date=None):
+        with self._lock:
+            if target_date is not None:
+                return len(self._subscribers.get(target_date, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, target_date, event):
+        """Entrega ``event`` a todos os assinantes da data (sem bloquear quem publica)."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(target_date, ()))
+        for subscription in subscribers:
+            if subscription.overflowed:
+                continue
+            try:
+                subscription.events.put_nowait(event)
+            except queue.Full:
+                # Cliente lento: descarta a fila e pede para recarregar o dia inteiro
+                subscription.overflowed = True
+                with subscription.events.mutex:
+                    subscription.events.queue.clear()
+                subscription.events.put_nowait({'type': 'resync', 'date': target_date.isoformat()})
+
+
+availability_hub = AvailabilityHub()
@@ -0,0 +1,83 @@
+# src/catalog.py
+"""
+Retrato imutável do catálogo de serviços, compartilhado por todas as rotas.
+
+O catálogo tem poucas dezenas de linhas e muda raramente, então as rotas de
+agendamento, os serializadores e o GET /services leem este retrato em vez de
+consultar a tabela Service a cada requisição. As rotas que alteram serviços chamam
+``invalidate_catalog`` depois do commit; a próxima leitura reconstrói o retrato e a
+versão nova entra nos ETags. Como o cache das regras (src/schedule.py), vale por
+processo.
+"""
+import threading
+from collections import namedtuple
+
+from src.models.service import Service
+
+_SERVICE_FIELDS = ('id', 'name', 'description', 'price', 'original_price', 'on_promotion',
+                   'discount_percentage', 'category', 'sessions', 'services_included',
+                   'duration_minutes', 'active')
+
+
+class ServiceInfo(namedtuple('ServiceInfo', _SERVICE_FIELDS)):
+    """Linha imutável do catálogo, com os mesmos campos de ``Service.to_dict``."""
+    __slots__ = ()
+
+    def to_dict(self):
+        return self._asdict()
+
+
+class CatalogSnapshot:
+    """Serviços ordenados por id e indexados por id, em uma versão do catálogo."""
+    __slots__ = ('version', 'services', '_by_id')
+
+    def __init__(self, version, services):
+        self.version = version
+        self.services = tuple(services)
+        self._by_id = {service.id: service for service in self.services}
+
+    def get(self, service_id):
+        """ServiceInfo do id, ou None se não existir."""
+        return self._by_id.get(service_id)
+
+    def active_services(self):
+        return tuple(service for service in self.services if service.active)
+
+
+_lock = threading.Lock()
+_cache = {'snapshot': None, 'version': 0}
+
+
+def _build_snapshot(version):
+    services = Service.query.order_by(Service.id).all()
+    return CatalogSnapshot(version, (ServiceInfo(**service.to_dict()) for service in services))
+
+
+def get_catalog():
+    """Retorna o retrato atual, reconstruindo-o na primeira chamada após uma invalidação."""
+    snapshot = _cache['snapshot']
+    if snapshot is None:
+        version = _cache['version']
+        snapshot = _build_snapshot(version)
+        with _lock:
+            # Só guarda se o catálogo não mudou durante a reconstrução
+            if _cache['version'] == version:
+                _cache['snapshot'] = snapshot
+    return snapshot
+
+
+def invalidate_catalog():
+    """Descarta o retrato (chamar após o commit de alterações em Service)."""
+    with _lock:
+        _cache['snapshot'] = None
+        _cache['version'] += 1
+
+
+def catalog_version():
+    """Versão do catálogo no processo; muda a cada invalidação."""
+    return _cache['version']
+
+
+def get_service_info(service_id):
+    """Atalho para ``get_catalog().get(service_id)``."""
+    return get_catalog().get(service_id)
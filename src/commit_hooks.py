@@ -0,0 +1,39 @@
+# src/commit_hooks.py
+"""
+Callbacks executados somente depois que a transação da sessão é confirmada.
+
+Efeitos fora do banco (notificar assinantes, invalidar caches em memória) não
+podem acontecer antes do commit: se a transação for desfeita, o efeito já teria
+vazado. ``after_commit(callback)`` agenda o callback na sessão atual; ele roda
+após o commit e é descartado em caso de rollback.
+"""
+from sqlalchemy import event
+
+from src.models.user import db
+
+_INFO_KEY = 'after_commit_callbacks'
+
+
+def after_commit(callback):
+    """
+    Agenda ``callback()`` para depois do próximo commit da sessão atual. O mesmo
+    callback agendado várias vezes na transação roda uma vez só.
+    """
+    callbacks = db.session.info.setdefault(_INFO_KEY, [])
+    if callback not in callbacks:
+        callbacks.append(callback)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _run_callbacks(session):
+    callbacks = session.info.pop(_INFO_KEY, [])
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            print(f"Erro em callback pós-commit: {e}")
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_callbacks(session):
+    session.info.pop(_INFO_KEY, None)
@@ -0,0 +1,128 @@
+# src/dashboard.py
+"""
+Widgets do dashboard administrativo e o cache do resumo combinado.
+
+Cada widget é uma função que lê a sessão atual: as contagens vêm dos rollups
+(src/rollups.py) e os próximos agendamentos são a única consulta que carrega
+linhas de Booking. ``dashboard_summary`` monta os quatro widgets na mesma
+transação de leitura e guarda o resultado por alguns segundos
+(``DASHBOARD_CACHE_SECONDS`` na configuração do app). As escritas de agendamento
+chamam ``invalidate_dashboard`` depois do commit, via src/rollups.py, então o
+resumo nunca sobrevive a uma mudança feita por este processo.
+"""
+import threading
+import time as _time
+from datetime import datetime, date
+
+from sqlalchemy import func
+
+from src.models.user import db
+from src.models.booking import Booking, serialize_bookings
+from src.models.booking_daily_count import BookingDailyCount, BookingServiceCount
+from src.catalog import get_catalog
+
+DASHBOARD_CACHE_SECONDS = 5
+NEXT_APPOINTMENTS_LIMIT = 5
+
+
+def daily_appointments_count(today):
+    """Agendamentos confirmados em ``today``."""
+    return db.session.query(func.coalesce(func.sum(BookingDailyCount.confirmed_count), 0)) \
+        .filter(BookingDailyCount.day == today).scalar()
+
+
+def next_appointments_query(now, limit=NEXT_APPOINTMENTS_LIMIT):
+    """Consulta dos próximos ``limit`` agendamentos confirmados a partir de ``now``."""
+    return Booking.query.options(*Booking.list_options()).filter(
+        Booking.status == 'confirmed',
+        # Limite inferior explícito: com parâmetros ligados o SQLite não deduz o intervalo
+        # a partir do OR abaixo e percorreria todos os agendamentos passados no índice
+        Booking.booking_date >= now.date(),
+        (Booking.booking_date > now.date()) | (Booking.booking_time >= now.time())
+    ).order_by(Booking.booking_date, Booking.booking_time).limit(limit)
+
+
+def next_appointments(now, limit=NEXT_APPOINTMENTS_LIMIT):
+    """Próximos ``limit`` agendamentos confirmados a partir de ``now``, já serializados."""
+    return serialize_bookings(next_appointments_query(now, limit).all())
+
+
+def appointments_by_service():
+    """Contagem por nome de serviço, da maior para a menor."""
+    # Soma o rollup por serviço e agrupa pelo nome (via catálogo), como o JOIN com Service fazia
+    catalog = get_catalog()
+    counts_by_name = {}
+    for service_id, count in db.session.query(BookingServiceCount.service_id, BookingServiceCount.confirmed_count):
+        service = catalog.get(service_id)
+        if service is not None and count:
+            counts_by_name[service.name] = counts_by_name.get(service.name, 0) + count
+    return [{'service': name, 'count': count}
+            for name, count in sorted(counts_by_name.items(), key=lambda item: item[1], reverse=True)]
+
+
+def appointments_by_month(year):
+    """Contagem de cada mês de ``year``, com zero nos meses sem agendamentos."""
+    month_counts = db.session.query(
+        func.strftime('%m', BookingDailyCount.day).label('month'),
+        func.sum(BookingDailyCount.confirmed_count)
+    ).filter(
+        BookingDailyCount.day >= date(year, 1, 1),
+        BookingDailyCount.day < date(year + 1, 1, 1)
+    ).group_by('month') \
+        .order_by('month') \
+        .all()
+    result_dict = {month: count for month, count in month_counts}
+    return [{'month': f"{i:02d}", 'count': result_dict.get(f"{i:02d}", 0)} for i in range(1, 13)]
+
+
+def _begin_read_snapshot():
+    """
+    O driver sqlite3 não abre transação antes de um SELECT, então cada consulta veria o
+    banco em um instante diferente. Um BEGIN explícito faz as leituras do resumo
+    compartilharem o mesmo retrato; o rollback do fim da requisição encerra a transação.
+    """
+    connection = db.session.connection()
+    if connection.dialect.name != 'sqlite':
+        return
+    dbapi_connection = connection.connection.dbapi_connection
+    if not dbapi_connection.in_transaction:
+        dbapi_connection.execute('BEGIN')
+
+
+def _build_summary(now):
+    _begin_read_snapshot()
+    return {
+        'daily_appointments_count': daily_appointments_count(now.date()),
+        'next_appointments': next_appointments(now),
+        'appointments_by_service': appointments_by_service(),
+        'appointments_by_month': appointments_by_month(now.year),
+        'generated_at': now.isoformat(timespec='seconds'),
+    }
+
+
+_lock = threading.Lock()
+_cache = {'summary': None, 'expires_at': 0.0, 'version': 0}
+
+
+def dashboard_summary(ttl_seconds=DASHBOARD_CACHE_SECONDS):
+    """Os quatro widgets em um dicionário, reaproveitando o último resultado por até ``ttl_seconds``."""
+    if ttl_seconds <= 0:
+        return _build_summary(datetime.now())
+    summary = _cache['summary']
+    if summary is not None and _time.monotonic() < _cache['expires_at']:
+        return summary
+    version = _cache['version']
+    summary = _build_summary(datetime.now())
+    with _lock:
+        # Só guarda se nenhuma escrita invalidou o resumo durante o cálculo
+        if _cache['version'] == version:
+            _cache['summary'] = summary
+            _cache['expires_at'] = _time.monotonic() + ttl_seconds
+    return summary
+
+
+def invalidate_dashboard():
+    """Descarta o resumo em cache (chamar após o commit de alterações em Booking)."""
+    with _lock:
+        _cache['summary'] = None
+        _cache['version'] += 1
@@ -0,0 +1,39 @@
+# src/http_cache.py
+"""
+GET condicional (ETag / If-None-Match) para as rotas de leitura mais consultadas.
+
+Os ETags são derivados de contadores de versão baratos (versão do dia em
+day_availability, versão das regras em src/schedule.py e versão do catálogo de
+serviços em src/catalog.py), então uma requisição com If-None-Match válido
+recebe 304 sem consultar bloqueios nem serializar JSON.
+"""
+import hashlib
+import uuid
+
+from flask import Response, make_response, request
+
+# Identifica este processo: contadores em memória recomeçam do zero a cada inicialização,
+# então o ETag inclui o boot para não repetir valores de uma execução anterior.
+BOOT_ID = uuid.uuid4().hex[:8]
+
+
+def make_etag(*parts):
+    """Gera um ETag forte a partir das partes que determinam o conteúdo da resposta."""
+    key = '|'.join(str(part) for part in (BOOT_ID,) + parts)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:24]
+
+
+def conditional_response(etag, build_response):
+    """
+    Retorna 304 se o cliente já tem a versão ``etag``; caso contrário chama
+    ``build_response()`` (que pode devolver uma tupla como as rotas do Flask).
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = make_response(build_response())
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
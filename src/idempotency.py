@@ -0,0 +1,119 @@
+# src/idempotency.py
+"""
+Suporte ao cabeçalho ``Idempotency-Key`` nas rotas de escrita.
+
+Clientes móveis com conexão instável repetem o POST. Com o cabeçalho, a primeira
+resposta (status < 500) é guardada e as repetições com a mesma chave recebem a
+mesma resposta em O(1), sem tocar nas tabelas. Uma repetição que chega enquanto a
+primeira ainda está em andamento recebe 409; a mesma chave com outro corpo, 422.
+
+As rotas são públicas e não há identidade do chamador para separar as chaves (atrás
+do proxy o IP é o mesmo para todos), então a chave precisa ser um UUID: chaves curtas
+como "1" colidiriam entre clientes diferentes e uma receberia a resposta da outra.
+
+As respostas ficam em um OrderedDict por ordem de inserção: como o TTL é fixo, a
+entrada mais antiga é sempre a próxima a vencer, então a expiração só olha o
+início do dicionário. Como os outros caches em memória, o estado é por processo.
+"""
+import hashlib
+import threading
+import time as _time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, jsonify, make_response, request
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+# Tempo (segundos) durante o qual uma resposta é reaproveitada
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+# Teto de respostas guardadas; ao atingir, as mais antigas saem primeiro
+IDEMPOTENCY_MAX_ENTRIES = 10000
+
+_IN_PROGRESS = object()
+
+
+class IdempotencyStore:
+    """Respostas guardadas por (rota, chave), com expiração por TTL e limite de tamanho."""
+
+    def __init__(self, ttl_seconds=IDEMPOTENCY_TTL_SECONDS, max_entries=IDEMPOTENCY_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def _evict(self):
+        now = _time.monotonic()
+        while self._entries:
+            deadline = next(iter(self._entries.values()))[0]
+            if deadline > now and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+
+    def begin(self, key, fingerprint):
+        """
+        Reserva a chave. Retorna ``(None, None)`` se a requisição deve ser processada, ou
+        ``(fingerprint_guardado, resposta_ou_em_andamento)`` se a chave já existe.
+        """
+        with self._lock:
+            self._evict()
+            entry = self._entries.get(key)
+            if entry is not None:
+                _, stored_fingerprint, stored = entry
+                return stored_fingerprint, stored
+            self._entries[key] = (_time.monotonic() + self.ttl_seconds, fingerprint, _IN_PROGRESS)
+            return None, None
+
+    def finish(self, key, fingerprint, stored_response):
+        """Guarda a resposta da chave (ou libera a chave se ``stored_response`` for None)."""
+        with self._lock:
+            if stored_response is None:
+                self._entries.pop(key, None)
+                return
+            self._entries.pop(key, None)
+            self._entries[key] = (_time.monotonic() + self.ttl_seconds, fingerprint, stored_response)
+            self._evict()
+
+
+idempotency_store = IdempotencyStore()
+
+
+def idempotent(view):
+    """Decorator: aplica ``Idempotency-Key`` a uma rota de escrita (o cabeçalho é opcional)."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not idempotency_key:
+            return view(*args, **kwargs)
+        try:
+            idempotency_key = str(uuid.UUID(idempotency_key))
+        except ValueError:
+            return jsonify({'error': f'{IDEMPOTENCY_HEADER} deve ser um UUID (ex.: gerado por crypto.randomUUID()).'}), 400
+
+        key = (request.endpoint, tuple(sorted((request.view_args or {}).items())), idempotency_key)
+        fingerprint = hashlib.sha1(request.get_data()).digest()
+        stored_fingerprint, stored = idempotency_store.begin(key, fingerprint)
+        if stored is not None:
+            if stored_fingerprint != fingerprint:
+                return jsonify({'error': f'{IDEMPOTENCY_HEADER} já usado com outro conteúdo.'}), 422
+            if stored is _IN_PROGRESS:
+                return jsonify({'error': 'Uma requisição com este Idempotency-Key ainda está em andamento.'}), 409
+            status, body, mimetype = stored
+            response = Response(body, status=status, mimetype=mimetype)
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            idempotency_store.finish(key, fingerprint, None)
+            raise
+        if response.status_code >= 500 or response.is_streamed:
+            # Erros do servidor podem ser repetidos de verdade
+            idempotency_store.finish(key, fingerprint, None)
+        else:
+            idempotency_store.finish(key, fingerprint, (response.status_code, response.get_data(), response.mimetype))
+        return response
+
+    return wrapper
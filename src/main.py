@@ -19,6 +19,16 @@ from src.models.service import Service
 from src.models.customer import Customer
 from src.models.booking import Booking
 from src.models.blocked_time import BlockedTime
+from src.models.day_availability import DayAvailability
+from src.models.business_hours import BusinessHours
+from src.models.recurring_rule import RecurringRule
+from src.models.booking_daily_count import BookingDailyCount, BookingServiceCount
+from src.models.customer_stats import CustomerStats
+from src.availability import rebuild_day_availability
+from src.query_plans import check_query_plans
+from src.schedule import seed_default_schedule
+from src.catalog import invalidate_catalog
+from src.rollups import rebuild_booking_rollups, rebuild_customer_stats
 
 # Importar seus blueprints
 from src.routes.auth import auth_bp
@@ -27,6 +37,7 @@ from src.routes.services import services_bp
 from src.routes.bookings import bookings_bp
 from src.routes.blocked_times import blocked_times_bp
 from src.routes.whatsapp import whatsapp_bp
+from src.routes.customers import customers_bp
 from src.routes.admin import admin_bp # Já estava importado, mantido
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
@@ -37,13 +48,20 @@ app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT' # Sua chave secreta
 app.config["JWT_SECRET_KEY"] = "sua_chave_secreta_para_jwt_aqui" # MUDE ISSO PARA UMA CHAVE DIFERENTE E SEGURA!
 
 # Configuração do banco de dados (antes de inicializar db)
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+# DATABASE_URL permite apontar para outro banco (ex.: o banco temporário dos testes em tests/)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'DATABASE_URL', f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}")
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Segundos que o resumo do dashboard (/admin/dashboard/summary) fica em cache
+app.config['DASHBOARD_CACHE_SECONDS'] = 5
 
 # --- Inicializar Extensões ---
 db.init_app(app)
 bcrypt.init_app(app)
 jwt = JWTManager(app) # <--- **ESSENCIAL:** Inicialize o JWTManager com o app
+# Migrações ficam em src/migrations (flask db upgrade). render_as_batch é necessário no SQLite
+# para alterar tabelas existentes.
+migrate = Migrate(app, db, directory=os.path.join(os.path.dirname(__file__), 'migrations'), render_as_batch=True)
 
 # --- Configurar CORS ---
 # Esta linha é suficiente para configurar o CORS corretamente.
@@ -58,6 +76,7 @@ app.register_blueprint(services_bp, url_prefix='/api')
 app.register_blueprint(bookings_bp, url_prefix='/api')
 app.register_blueprint(blocked_times_bp, url_prefix='/api')
 app.register_blueprint(whatsapp_bp, url_prefix='/api')
+app.register_blueprint(customers_bp, url_prefix='/api')
 app.register_blueprint(auth_bp, url_prefix='/api/auth') # <--- MANTENHA ESTE PREFIXO PARA O Blueprint de AUTH
 app.register_blueprint(admin_bp, url_prefix='/api')
 
@@ -65,6 +84,10 @@ app.register_blueprint(admin_bp, url_prefix='/api')
 def init_database():
     """Inicializa o banco de dados com dados de exemplo"""
     with app.app_context():
+        # Tabelas do expediente criadas agora recebem os horários e regras padrão
+        inspector = db.inspect(db.engine)
+        new_schedule_tables = {table.name for table in (BusinessHours.__table__, RecurringRule.__table__)
+                               if not inspector.has_table(table.name)}
         db.create_all()
 
         # Verificar se já existe um administrador
@@ -115,8 +138,61 @@ def init_database():
                 db.session.add(service)
 
             db.session.commit()
+            invalidate_catalog()
             print("Banco de dados inicializado com serviços de exemplo")
 
+        # Horários de funcionamento e regras recorrentes padrão (só em tabelas recém-criadas)
+        if seed_default_schedule(new_schedule_tables):
+            print("Horários de funcionamento e regras recorrentes padrão criados.")
+
+        # Materializa a disponibilidade por dia caso a tabela ainda esteja vazia
+        if DayAvailability.query.count() == 0 and BlockedTime.query.filter_by(active=True).count() > 0:
+            days = rebuild_day_availability()
+            print(f"Disponibilidade materializada para {days} dia(s).")
+
+        # Preenche o rollup do dashboard caso a tabela ainda esteja vazia
+        if BookingDailyCount.query.count() == 0 and Booking.query.filter_by(status='confirmed').count() > 0:
+            rows = rebuild_booking_rollups()
+            print(f"Rollup do dashboard preenchido com {rows} linha(s).")
+
+        # Preenche o resumo por cliente caso a tabela ainda esteja vazia
+        if CustomerStats.query.count() == 0 and Booking.query.count() > 0:
+            customers = rebuild_customer_stats()
+            print(f"Resumo de {customers} cliente(s) preenchido.")
+
+
+@app.cli.command('rebuild-availability')
+def rebuild_availability_command():
+    """Recalcula a tabela day_availability a partir dos bloqueios ativos."""
+    days = rebuild_day_availability()
+    print(f"Disponibilidade materializada para {days} dia(s).")
+
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Recalcula os rollups do dashboard (booking_daily_count e booking_service_count)."""
+    rows = rebuild_booking_rollups()
+    print(f"Rollup do dashboard recalculado com {rows} linha(s).")
+
+
+@app.cli.command('rebuild-customer-stats')
+def rebuild_customer_stats_command():
+    """Recalcula a tabela customer_stats a partir dos agendamentos."""
+    customers = rebuild_customer_stats()
+    print(f"Resumo de {customers} cliente(s) recalculado.")
+
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Falha se alguma consulta quente deixou de usar o índice esperado."""
+    failures = 0
+    for description, plan, ok in check_query_plans():
+        print(f"[{'OK' if ok else 'FALHOU'}] {description}: {' | '.join(plan)}")
+        failures += not ok
+    if failures:
+        sys.exit(1)
+
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -0,0 +1,44 @@
+"""Índices das consultas de agendamento e bloqueio
+
+As tabelas são criadas por db.create_all() em init_database; esta revisão
+apenas adiciona os índices secundários a bancos já existentes.
+
+Revision ID: 3f1c2a9d8b7e
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d8b7e'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_date_status', ['booking_date', 'status'], unique=False, if_not_exists=True)
+        batch_op.create_index('ix_booking_status_date_time', ['status', 'booking_date', 'booking_time'],
+                              unique=False, if_not_exists=True)
+        batch_op.create_index('ix_booking_created_at', ['created_at'], unique=False, if_not_exists=True)
+
+    with op.batch_alter_table('blocked_time', schema=None) as batch_op:
+        batch_op.create_index('ix_blocked_time_date_active', ['blocked_date', 'active'], unique=False,
+                              if_not_exists=True)
+        batch_op.create_index('ix_blocked_time_active_day', ['blocked_date', 'start_time'], unique=False,
+                              sqlite_where=sa.text('active = 1'), if_not_exists=True)
+
+
+def downgrade():
+    with op.batch_alter_table('blocked_time', schema=None) as batch_op:
+        batch_op.drop_index('ix_blocked_time_active_day', if_exists=True)
+        batch_op.drop_index('ix_blocked_time_date_active', if_exists=True)
+
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_created_at', if_exists=True)
+        batch_op.drop_index('ix_booking_status_date_time', if_exists=True)
+        batch_op.drop_index('ix_booking_date_status', if_exists=True)
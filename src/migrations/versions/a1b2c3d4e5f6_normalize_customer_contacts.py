@@ -0,0 +1,138 @@
+"""E-mail, telefone e nome normalizados de clientes
+
+Adiciona name_normalized, email_normalized e phone_normalized a customer,
+preenche as colunas, une clientes duplicados (mesmo e-mail ignorando maiúsculas
+e espaços) no de menor id, movendo os agendamentos, e cria os índices (únicos
+para e-mail e telefone).
+
+Um telefone repetido entre clientes com e-mails diferentes (ex.: familiares que
+dividem o número) não une os cadastros: o telefone normalizado fica com o cliente
+de menor id e os demais ficam com phone_normalized NULL, mantendo o telefone
+original em phone.
+
+A união de duplicados não é desfeita no downgrade.
+
+Revision ID: a1b2c3d4e5f6
+Revises: f7b8c9d0e1a2
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1b2c3d4e5f6'
+down_revision = 'f7b8c9d0e1a2'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_customer_name_normalized', 'name_normalized', False),
+    ('ix_customer_email_normalized', 'email_normalized', True),
+    ('ix_customer_phone_normalized', 'phone_normalized', True),
+)
+
+
+# Cópias das funções de src/models/customer.py na data desta migração, congeladas aqui
+# para que o resultado do upgrade não mude se o modelo mudar depois
+def normalize_email(email):
+    email = (email or '').strip().lower()
+    return email or None
+
+
+def normalize_phone(phone):
+    digits = re.sub(r'\D', '', phone or '')
+    if len(digits) >= 12 and digits.startswith('55'):
+        digits = digits[2:]
+    return digits or None
+
+
+def normalize_name(name):
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(without_accents.lower().split()) or None
+
+
+def _columns(table_name):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return None
+    return {column['name'] for column in inspector.get_columns(table_name)}
+
+
+def _duplicate_groups(customers):
+    """Ids dos clientes que repetem um e-mail normalizado: {menor id: [ids]} (``customers`` em ordem de id)."""
+    ids_by_email = {}
+    for customer_id, _, email, _ in customers:
+        if email is not None:
+            ids_by_email.setdefault(email, []).append(customer_id)
+    return {ids[0]: ids for ids in ids_by_email.values() if len(ids) > 1}
+
+
+def upgrade():
+    columns = _columns('customer')
+    if columns is None:
+        return
+    if 'email_normalized' not in columns:
+        with op.batch_alter_table('customer', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('name_normalized', sa.String(length=100), nullable=True))
+            batch_op.add_column(sa.Column('email_normalized', sa.String(length=120), nullable=True))
+            batch_op.add_column(sa.Column('phone_normalized', sa.String(length=20), nullable=True))
+
+    connection = op.get_bind()
+    rows = connection.execute(sa.text('SELECT id, name, email, phone FROM customer ORDER BY id')).all()
+    raw_phones = {customer_id: phone for customer_id, _, _, phone in rows}
+    customers = [(customer_id, normalize_name(name), normalize_email(email), normalize_phone(phone))
+                 for customer_id, name, email, phone in rows]
+    normalized = {customer_id: (name, email, phone) for customer_id, name, email, phone in customers}
+
+    # Duplicados são unidos no cliente de menor id, que herda o primeiro telefone disponível
+    for keeper, members in _duplicate_groups(customers).items():
+        duplicates = [member for member in members if member != keeper]
+        name, email, phone = normalized[keeper]
+        if phone is None:
+            donor = next((member for member in duplicates if normalized[member][2]), None)
+            if donor is not None:
+                phone = normalized[donor][2]
+                connection.execute(sa.text('UPDATE customer SET phone = :phone WHERE id = :id'),
+                                   {'phone': raw_phones[donor], 'id': keeper})
+                normalized[keeper] = (name, email, phone)
+        for duplicate in duplicates:
+            connection.execute(sa.text('UPDATE booking SET customer_id = :keeper WHERE customer_id = :duplicate'),
+                               {'keeper': keeper, 'duplicate': duplicate})
+            connection.execute(sa.text('DELETE FROM customer WHERE id = :duplicate'), {'duplicate': duplicate})
+            del normalized[duplicate]
+
+    # Telefone repetido entre clientes diferentes: só o de menor id fica com o normalizado
+    phone_owners = set()
+    for customer_id in sorted(normalized):
+        name, email, phone = normalized[customer_id]
+        if phone in phone_owners:
+            normalized[customer_id] = (name, email, None)
+        elif phone is not None:
+            phone_owners.add(phone)
+
+    if normalized:
+        connection.execute(
+            sa.text('UPDATE customer SET name_normalized = :name, email_normalized = :email, '
+                    'phone_normalized = :phone WHERE id = :id'),
+            [{'id': customer_id, 'name': name, 'email': email, 'phone': phone}
+             for customer_id, (name, email, phone) in normalized.items()]
+        )
+
+    for index_name, column, unique in INDEXES:
+        op.create_index(index_name, 'customer', [column], unique=unique, if_not_exists=True)
+
+
+def downgrade():
+    for index_name, _, _ in INDEXES:
+        op.drop_index(index_name, table_name='customer', if_exists=True)
+    if 'email_normalized' in (_columns('customer') or ()):
+        with op.batch_alter_table('customer', schema=None) as batch_op:
+            batch_op.drop_column('phone_normalized')
+            batch_op.drop_column('email_normalized')
+            batch_op.drop_column('name_normalized')
@@ -0,0 +1,70 @@
+"""Resumo do histórico por cliente (customer_stats)
+
+Cria customer_stats (se ainda não existir) com os índices das ordenações da
+listagem, o índice de booking usado no recálculo por cliente, e preenche a
+tabela a partir de booking.
+
+Revision ID: b2c3d4e5f6a7
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2c3d4e5f6a7'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+SORT_COLUMNS = ('visit_count', 'last_visit_date', 'cancelled_count', 'no_show_count')
+
+
+def upgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_customer_status_date', ['customer_id', 'status', 'booking_date'],
+                              unique=False, if_not_exists=True)
+
+    op.create_table(
+        'customer_stats',
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('visit_count', sa.Integer(), nullable=False),
+        sa.Column('last_visit_date', sa.Date(), nullable=True),
+        sa.Column('cancelled_count', sa.Integer(), nullable=False),
+        sa.Column('no_show_count', sa.Integer(), nullable=False),
+        sa.Column('favourite_service_id', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['customer_id'], ['customer.id']),
+        sa.PrimaryKeyConstraint('customer_id'),
+        if_not_exists=True
+    )
+    with op.batch_alter_table('customer_stats', schema=None) as batch_op:
+        for column in SORT_COLUMNS:
+            batch_op.create_index(f'ix_customer_stats_{column}', [column, 'customer_id'], unique=False,
+                                  if_not_exists=True)
+
+    connection = op.get_bind()
+    if not connection.execute(sa.text('SELECT 1 FROM customer_stats LIMIT 1')).first():
+        # Serviço favorito: o mais agendado; no empate, o agendado mais recentemente
+        connection.execute(sa.text(
+            "INSERT INTO customer_stats (customer_id, visit_count, last_visit_date, cancelled_count, "
+            "no_show_count, favourite_service_id, updated_at) "
+            "SELECT b.customer_id, "
+            "SUM(b.status = 'confirmed'), "
+            "MAX(CASE WHEN b.status = 'confirmed' THEN b.booking_date END), "
+            "SUM(b.status = 'cancelled'), "
+            "SUM(b.status = 'no_show'), "
+            "(SELECT f.service_id FROM booking AS f "
+            " WHERE f.customer_id = b.customer_id AND f.status = 'confirmed' "
+            " GROUP BY f.service_id ORDER BY COUNT(*) DESC, MAX(f.booking_date) DESC, f.service_id LIMIT 1), "
+            "CURRENT_TIMESTAMP "
+            "FROM booking AS b GROUP BY b.customer_id"
+        ))
+
+
+def downgrade():
+    op.drop_table('customer_stats', if_exists=True)
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_customer_status_date', if_exists=True)
@@ -0,0 +1,66 @@
+"""Horários de funcionamento e regras recorrentes editáveis
+
+Cria as tabelas business_hours e recurring_rule (se ainda não existirem) e
+insere os valores que antes eram fixos no código.
+
+Revision ID: b7d4e2c91a05
+Revises: 3f1c2a9d8b7e
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from datetime import datetime, time
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d4e2c91a05'
+down_revision = '3f1c2a9d8b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    business_hours = op.create_table(
+        'business_hours',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('weekday', sa.Integer(), nullable=False),
+        sa.Column('start_time', sa.Time(), nullable=False),
+        sa.Column('end_time', sa.Time(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    recurring_rule = op.create_table(
+        'recurring_rule',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('weekdays', sa.String(length=20), nullable=False),
+        sa.Column('start_time', sa.Time(), nullable=False),
+        sa.Column('end_time', sa.Time(), nullable=False),
+        sa.Column('reason', sa.String(length=200), nullable=True),
+        sa.Column('active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+
+    connection = op.get_bind()
+    if not connection.execute(sa.text('SELECT 1 FROM business_hours LIMIT 1')).first():
+        op.bulk_insert(business_hours, [
+            {'weekday': weekday, 'start_time': time(9, 0), 'end_time': time(18, 0)} for weekday in (1, 2, 3, 4, 5)
+        ] + [{'weekday': 6, 'start_time': time(9, 0), 'end_time': time(13, 0)}])
+    if not connection.execute(sa.text('SELECT 1 FROM recurring_rule LIMIT 1')).first():
+        now = datetime.utcnow()
+        op.bulk_insert(recurring_rule, [
+            {'weekdays': '1,3,5', 'start_time': time(9, 0), 'end_time': time(11, 30),
+             'reason': 'Manutenção', 'active': True, 'created_at': now},
+            {'weekdays': '1,3,5', 'start_time': time(11, 30), 'end_time': time(14, 0),
+             'reason': 'Intervalo de almoço', 'active': True, 'created_at': now},
+            {'weekdays': '2,4', 'start_time': time(11, 0), 'end_time': time(14, 0),
+             'reason': 'Intervalo de almoço', 'active': True, 'created_at': now},
+        ])
+
+
+def downgrade():
+    op.drop_table('recurring_rule')
+    op.drop_table('business_hours')
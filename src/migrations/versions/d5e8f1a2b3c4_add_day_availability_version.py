@@ -0,0 +1,38 @@
+"""Versão da disponibilidade materializada (ETag)
+
+Revision ID: d5e8f1a2b3c4
+Revises: b7d4e2c91a05
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e8f1a2b3c4'
+down_revision = 'b7d4e2c91a05'
+branch_labels = None
+depends_on = None
+
+
+def _columns(table_name):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return None
+    return {column['name'] for column in inspector.get_columns(table_name)}
+
+
+def upgrade():
+    # day_availability é criada por db.create_all() (já com a coluna); aqui só a adicionamos
+    # a tabelas criadas antes dela
+    columns = _columns('day_availability')
+    if columns is not None and 'version' not in columns:
+        with op.batch_alter_table('day_availability', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    if 'version' in (_columns('day_availability') or ()):
+        with op.batch_alter_table('day_availability', schema=None) as batch_op:
+            batch_op.drop_column('version')
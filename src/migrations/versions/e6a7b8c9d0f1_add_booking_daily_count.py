@@ -0,0 +1,55 @@
+"""Rollups de agendamentos confirmados por dia e serviço (dashboard)
+
+Cria booking_daily_count e booking_service_count (se ainda não existirem) e
+preenche a partir de booking.
+
+Revision ID: e6a7b8c9d0f1
+Revises: d5e8f1a2b3c4
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a7b8c9d0f1'
+down_revision = 'd5e8f1a2b3c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'booking_daily_count',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('service_id', sa.Integer(), nullable=False),
+        sa.Column('confirmed_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'service_id'),
+        if_not_exists=True
+    )
+    op.create_table(
+        'booking_service_count',
+        sa.Column('service_id', sa.Integer(), nullable=False),
+        sa.Column('confirmed_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('service_id'),
+        if_not_exists=True
+    )
+
+    connection = op.get_bind()
+    if not connection.execute(sa.text('SELECT 1 FROM booking_daily_count LIMIT 1')).first():
+        connection.execute(sa.text(
+            "INSERT INTO booking_daily_count (day, service_id, confirmed_count) "
+            "SELECT booking_date, service_id, COUNT(*) FROM booking "
+            "WHERE status = 'confirmed' GROUP BY booking_date, service_id"
+        ))
+    if not connection.execute(sa.text('SELECT 1 FROM booking_service_count LIMIT 1')).first():
+        connection.execute(sa.text(
+            "INSERT INTO booking_service_count (service_id, confirmed_count) "
+            "SELECT service_id, COUNT(*) FROM booking WHERE status = 'confirmed' GROUP BY service_id"
+        ))
+
+
+def downgrade():
+    op.drop_table('booking_service_count', if_exists=True)
+    op.drop_table('booking_daily_count', if_exists=True)
@@ -0,0 +1,71 @@
+"""Preço registrado no agendamento e faturamento nos rollups
+
+Adiciona price, original_price e on_promotion a booking e revenue a
+booking_daily_count. Agendamentos antigos recebem o preço atual do serviço (a
+melhor estimativa disponível) e o faturamento é recalculado a partir deles.
+
+Revision ID: f7b8c9d0e1a2
+Revises: e6a7b8c9d0f1
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7b8c9d0e1a2'
+down_revision = 'e6a7b8c9d0f1'
+branch_labels = None
+depends_on = None
+
+
+def _columns(table_name):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table_name):
+        return None
+    return {column['name'] for column in inspector.get_columns(table_name)}
+
+
+def upgrade():
+    # As tabelas podem ter sido criadas por db.create_all() já com as colunas novas
+    booking_columns = _columns('booking')
+    if booking_columns is not None and 'price' not in booking_columns:
+        with op.batch_alter_table('booking', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('price', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('original_price', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('on_promotion', sa.Boolean(), nullable=True))
+    daily_columns = _columns('booking_daily_count')
+    if daily_columns is not None and 'revenue' not in daily_columns:
+        with op.batch_alter_table('booking_daily_count', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('revenue', sa.Float(), nullable=False, server_default='0'))
+
+    connection = op.get_bind()
+    if booking_columns is not None:
+        connection.execute(sa.text(
+            "UPDATE booking SET "
+            "price = (SELECT service.price FROM service WHERE service.id = booking.service_id), "
+            "original_price = (SELECT service.original_price FROM service WHERE service.id = booking.service_id), "
+            "on_promotion = COALESCE((SELECT service.on_promotion FROM service "
+            "WHERE service.id = booking.service_id), 0) "
+            "WHERE price IS NULL"
+        ))
+    if daily_columns is not None:
+        connection.execute(sa.text(
+            "UPDATE booking_daily_count SET revenue = COALESCE(("
+            "SELECT SUM(booking.price) FROM booking "
+            "WHERE booking.booking_date = booking_daily_count.day "
+            "AND booking.service_id = booking_daily_count.service_id "
+            "AND booking.status = 'confirmed'), 0)"
+        ))
+
+
+def downgrade():
+    if 'revenue' in (_columns('booking_daily_count') or ()):
+        with op.batch_alter_table('booking_daily_count', schema=None) as batch_op:
+            batch_op.drop_column('revenue')
+    if 'price' in (_columns('booking') or ()):
+        with op.batch_alter_table('booking', schema=None) as batch_op:
+            batch_op.drop_column('on_promotion')
+            batch_op.drop_column('original_price')
+            batch_op.drop_column('price')
@@ -13,6 +13,15 @@ class BlockedTime(db.Model):
     booking_id = db.Column(db.Integer, db.ForeignKey('booking.id'), nullable=True, unique=True)
     booking = db.relationship('Booking', backref=db.backref('blocked_time_entry', uselist=False))
 
+    # Consultas de calendário filtram por intervalo de datas + active.
+    # O índice parcial cobre apenas os bloqueios ativos, que são os lidos no caminho de agendamento
+    # (a tabela só cresce, pois os bloqueios são desativados e nunca apagados).
+    # booking_id já é indexado pela constraint UNIQUE.
+    __table_args__ = (
+        db.Index('ix_blocked_time_date_active', 'blocked_date', 'active'),
+        db.Index('ix_blocked_time_active_day', 'blocked_date', 'start_time', sqlite_where=db.text('active = 1')),
+    )
+
     def __repr__(self):
         return f'<BlockedTime {self.blocked_date}>'
 
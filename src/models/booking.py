@@ -2,6 +2,8 @@
 from src.models.user import db
 from datetime import datetime
 from sqlalchemy import UniqueConstraint  # <-- 1. IMPORTE AQUI
+from sqlalchemy.orm import joinedload
+from src.catalog import get_catalog
 
 
 class Booking(db.Model):
@@ -13,6 +15,11 @@ class Booking(db.Model):
 
     status = db.Column(db.String(20), default='confirmed', nullable=False)  # Adicionado nullable=False para garantir
     notes = db.Column(db.Text)
+    # Preço do serviço no momento do agendamento: Service.price muda quando promoções
+    # são ligadas ou desligadas, e o faturamento deve refletir o valor cobrado
+    price = db.Column(db.Float)
+    original_price = db.Column(db.Float)
+    on_promotion = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -23,12 +30,43 @@ class Booking(db.Model):
     # <-- 2. ADICIONE ESSA LINHA
     # Garante que não pode haver duas linhas com a mesma data, hora e status.
     # Essencial para impedir agendamentos 'confirmed' duplicados.
-    __table_args__ = (UniqueConstraint('booking_date', 'booking_time', 'status', name='_booking_date_time_status_uc'),)
+    __table_args__ = (
+        UniqueConstraint('booking_date', 'booking_time', 'status', name='_booking_date_time_status_uc'),
+        # Consultas de calendário/dashboard filtram por intervalo de datas + status
+        db.Index('ix_booking_date_status', 'booking_date', 'status'),
+        # Próximos agendamentos: status fixo, ordenados por data e hora
+        db.Index('ix_booking_status_date_time', 'status', 'booking_date', 'booking_time'),
+        # GET /bookings?order_by=latest
+        db.Index('ix_booking_created_at', 'created_at'),
+        # Histórico de um cliente (recálculo de customer_stats)
+        db.Index('ix_booking_customer_status_date', 'customer_id', 'status', 'booking_date'),
+    )
 
     def __repr__(self):
         return f'<Booking {self.id} - {self.booking_date} {self.booking_time}>'
 
-    def to_dict(self):
+    @staticmethod
+    def list_options():
+        """
+        Opções de carregamento para listas de agendamentos: cliente e bloqueio vêm no mesmo
+        SELECT (joins), então serializar N linhas não dispara consultas por linha.
+        """
+        return (joinedload(Booking.customer, innerjoin=True), joinedload(Booking.blocked_time_entry))
+
+    def snapshot_price(self, service):
+        """Copia preço, preço original e promoção do serviço (Service ou ServiceInfo) para o agendamento."""
+        self.price = service.price
+        self.original_price = service.original_price
+        self.on_promotion = bool(service.on_promotion)
+
+    def _service_dict(self, catalog=None):
+        # O serviço vem do retrato do catálogo em memória, sem carregar o relacionamento por linha
+        service = (catalog or get_catalog()).get(self.service_id)
+        if service is not None:
+            return service.to_dict()
+        return self.service.to_dict() if self.service else None
+
+    def to_dict(self, catalog=None):
         data = {
             'id': self.id,
             'customer_id': self.customer_id,
@@ -37,12 +75,47 @@ class Booking(db.Model):
             'booking_time': self.booking_time.strftime('%H:%M') if self.booking_time else None,
             'status': self.status,
             'notes': self.notes,
+            'price': self.price,
+            'original_price': self.original_price,
+            'on_promotion': self.on_promotion,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'customer': self.customer.to_dict() if self.customer else None,
-            'service': self.service.to_dict() if self.service else None
+            'service': self._service_dict(catalog)
         }
 
         if hasattr(self, 'blocked_time_entry') and self.blocked_time_entry:
             data['blocked_time_entry'] = self.blocked_time_entry.to_dict()
-        return data
\ No newline at end of file
+        return data
+
+
+def serialize_bookings(bookings):
+    """
+    Serializa uma lista de agendamentos carregados com ``Booking.list_options()``,
+    lendo o catálogo de serviços uma única vez.
+    """
+    catalog = get_catalog()
+    return [booking.to_dict(catalog) for booking in bookings]
+
+
+# Campos escalares de Booking que podem ser pedidos em ?fields= (mesmos nomes de to_dict)
+BOOKING_FIELDS = ('id', 'customer_id', 'service_id', 'booking_date', 'booking_time', 'status', 'notes',
+                  'price', 'original_price', 'on_promotion', 'created_at', 'updated_at')
+
+
+def _format_field(name, value):
+    if value is None:
+        return None
+    if name == 'booking_time':
+        return value.strftime('%H:%M')
+    if name in ('booking_date', 'created_at', 'updated_at'):
+        return value.isoformat()
+    return value
+
+
+def serialize_booking_rows(rows, fields):
+    """
+    Serializa linhas de colunas (``query.with_entities(...)``) apenas com ``fields``,
+    no mesmo formato de ``to_dict``, sem objetos ORM nem cliente/serviço aninhados.
+    """
+    return [{name: _format_field(name, getattr(row, name)) for name in fields} for row in rows]
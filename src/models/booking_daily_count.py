@@ -0,0 +1,48 @@
+# src/models/booking_daily_count.py
+from src.models.user import db
+
+
+class BookingDailyCount(db.Model):
+    """
+    Rollup do dashboard: quantidade de agendamentos confirmados por (dia, serviço) e a
+    soma dos preços registrados neles (faturamento). Mantido pelas rotas de escrita de agendamentos na mesma transação (ver
+    src/rollups.py); ``flask rebuild-rollups`` recalcula a tabela do zero.
+    """
+    __tablename__ = 'booking_daily_count'
+
+    day = db.Column(db.Date, primary_key=True)
+    service_id = db.Column(db.Integer, primary_key=True)
+    confirmed_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f'<BookingDailyCount {self.day} {self.service_id}: {self.confirmed_count}>'
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'service_id': self.service_id,
+            'confirmed_count': self.confirmed_count,
+            'revenue': self.revenue
+        }
+
+
+class BookingServiceCount(db.Model):
+    """
+    Rollup do dashboard: total de agendamentos confirmados por serviço (todo o histórico),
+    mantido junto com BookingDailyCount para que a contagem por serviço leia uma linha
+    por serviço em vez de somar todos os dias.
+    """
+    __tablename__ = 'booking_service_count'
+
+    service_id = db.Column(db.Integer, primary_key=True)
+    confirmed_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<BookingServiceCount {self.service_id}: {self.confirmed_count}>'
+
+    def to_dict(self):
+        return {
+            'service_id': self.service_id,
+            'confirmed_count': self.confirmed_count
+        }
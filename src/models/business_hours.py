@@ -0,0 +1,23 @@
+# src/models/business_hours.py
+from src.models.user import db
+
+
+class BusinessHours(db.Model):
+    """Intervalo de funcionamento da clínica em um dia da semana (pode haver vários por dia)."""
+    __tablename__ = 'business_hours'
+
+    id = db.Column(db.Integer, primary_key=True)
+    weekday = db.Column(db.Integer, nullable=False)  # Dia ISO: 1=Segunda ... 7=Domingo
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+
+    def __repr__(self):
+        return f'<BusinessHours {self.weekday} {self.start_time}-{self.end_time}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'weekday': self.weekday,
+            'start_time': self.start_time.strftime('%H:%M') if self.start_time else None,
+            'end_time': self.end_time.strftime('%H:%M') if self.end_time else None
+        }
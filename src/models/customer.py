@@ -1,12 +1,47 @@
 # src/models/customer.py (Exemplo - Não altere se já estiver parecido com isso)
 from src.models.user import db
 from datetime import datetime
+import re
+import unicodedata
+from sqlalchemy.orm import validates
+
+
+# Maior caractere Unicode: "prefixo" <= valor < "prefixo" + PREFIX_END cobre exatamente
+# os valores que começam com o prefixo, e o SQLite resolve o intervalo pelo índice
+PREFIX_END = '\U0010ffff'
+
+
+def normalize_email(email):
+    """E-mail sem espaços nas pontas e em minúsculas ("Ana@X.com " -> "ana@x.com")."""
+    email = (email or '').strip().lower()
+    return email or None
+
+
+def normalize_phone(phone):
+    """Apenas os dígitos do telefone, sem o código do país 55 ("+55 (11) 98765-4321" -> "11987654321")."""
+    digits = re.sub(r'\D', '', phone or '')
+    if len(digits) >= 12 and digits.startswith('55'):
+        digits = digits[2:]
+    return digits or None
+
+
+def normalize_name(name):
+    """Nome em minúsculas, sem acentos e com espaços simples, para busca por prefixo."""
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(without_accents.lower().split()) or None
+
 
 class Customer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     phone = db.Column(db.String(20), nullable=True)
+    # Formas normalizadas, preenchidas automaticamente ao atribuir name/email/phone.
+    # E-mail e telefone identificam o cliente (únicos); as três servem à busca por prefixo.
+    name_normalized = db.Column(db.String(100), index=True)
+    email_normalized = db.Column(db.String(120), unique=True, index=True)
+    phone_normalized = db.Column(db.String(20), unique=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -16,6 +51,31 @@ class Customer(db.Model):
     def __repr__(self):
         return f'<Customer {self.name}>'
 
+    @validates('name')
+    def _normalize_name(self, key, value):
+        self.name_normalized = normalize_name(value)
+        return value
+
+    @validates('email')
+    def _normalize_email(self, key, value):
+        self.email_normalized = normalize_email(value)
+        return value
+
+    @validates('phone')
+    def _normalize_phone(self, key, value):
+        self.phone_normalized = normalize_phone(value)
+        return value
+
+    @staticmethod
+    def normalized_values(name, email, phone):
+        """Valores das colunas para inserir um cliente com ``insert(Customer)`` (sem passar pelo ORM)."""
+        return {
+            'name': name, 'email': email, 'phone': phone,
+            'name_normalized': normalize_name(name),
+            'email_normalized': normalize_email(email),
+            'phone_normalized': normalize_phone(phone),
+        }
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -24,4 +84,4 @@ class Customer(db.Model):
             'phone': self.phone,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+        }
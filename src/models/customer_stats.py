@@ -0,0 +1,44 @@
+# src/models/customer_stats.py
+from src.models.user import db
+from datetime import datetime
+
+
+class CustomerStats(db.Model):
+    """
+    Histórico resumido de um cliente, recalculado a partir dos agendamentos dele pelas
+    rotas de escrita na mesma transação (ver ``refresh_customer_stats`` em src/rollups.py).
+    Visitas são os agendamentos confirmados, inclusive os futuros.
+    Cada coluna ordenável tem índice com customer_id para a paginação por cursor.
+    """
+    __tablename__ = 'customer_stats'
+
+    customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'), primary_key=True)
+    visit_count = db.Column(db.Integer, nullable=False, default=0)
+    last_visit_date = db.Column(db.Date)
+    cancelled_count = db.Column(db.Integer, nullable=False, default=0)
+    no_show_count = db.Column(db.Integer, nullable=False, default=0)
+    favourite_service_id = db.Column(db.Integer)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    customer = db.relationship('Customer', backref=db.backref('stats', uselist=False, lazy=True))
+
+    __table_args__ = (
+        db.Index('ix_customer_stats_visit_count', 'visit_count', 'customer_id'),
+        db.Index('ix_customer_stats_last_visit_date', 'last_visit_date', 'customer_id'),
+        db.Index('ix_customer_stats_cancelled_count', 'cancelled_count', 'customer_id'),
+        db.Index('ix_customer_stats_no_show_count', 'no_show_count', 'customer_id'),
+    )
+
+    def __repr__(self):
+        return f'<CustomerStats {self.customer_id}: {self.visit_count} visitas>'
+
+    def to_dict(self):
+        return {
+            'customer_id': self.customer_id,
+            'visit_count': self.visit_count,
+            'last_visit_date': self.last_visit_date.isoformat() if self.last_visit_date else None,
+            'cancelled_count': self.cancelled_count,
+            'no_show_count': self.no_show_count,
+            'favourite_service_id': self.favourite_service_id,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
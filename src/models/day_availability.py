@@ -0,0 +1,30 @@
+# src/models/day_availability.py
+from src.models.user import db
+from datetime import datetime
+
+
+class DayAvailability(db.Model):
+    """
+    Disponibilidade materializada de um dia: os BlockedTime ativos da data já
+    convertidos em máscara de slots (ver src/slot_engine.py). Mantida pelas
+    rotas de escrita na mesma transação que altera os bloqueios.
+    """
+    __tablename__ = 'day_availability'
+
+    day = db.Column(db.Date, primary_key=True)
+    blocked_mask = db.Column(db.BigInteger, nullable=False, default=0)
+    full_day_closed = db.Column(db.Boolean, nullable=False, default=False)
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Incrementada a cada recálculo (ETag)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<DayAvailability {self.day}>'
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'blocked_mask': self.blocked_mask,
+            'full_day_closed': self.full_day_closed,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -0,0 +1,33 @@
+# src/models/recurring_rule.py
+from src.models.user import db
+from datetime import datetime
+
+
+class RecurringRule(db.Model):
+    """Intervalo indisponível que se repete toda semana (ex: manutenção Seg/Qua/Sex 09:00 - 11:30)."""
+    __tablename__ = 'recurring_rule'
+
+    id = db.Column(db.Integer, primary_key=True)
+    weekdays = db.Column(db.String(20), nullable=False)  # Dias ISO separados por vírgula, ex: "1,3,5"
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+    reason = db.Column(db.String(200))
+    active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<RecurringRule {self.weekdays} {self.start_time}-{self.end_time}>'
+
+    def weekday_list(self):
+        return [int(day) for day in self.weekdays.split(',') if day]
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'weekdays': self.weekday_list(),
+            'start_time': self.start_time.strftime('%H:%M') if self.start_time else None,
+            'end_time': self.end_time.strftime('%H:%M') if self.end_time else None,
+            'reason': self.reason,
+            'active': self.active,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
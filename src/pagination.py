@@ -0,0 +1,69 @@
+# src/pagination.py
+"""
+Paginação por cursor (keyset) para as listagens.
+
+Em vez de OFFSET, cada página continua a partir da chave de ordenação da última
+linha devolvida: ``WHERE (col1, col2, id) > (:v1, :v2, :id) ORDER BY col1, col2, id
+LIMIT n``. Com um índice nessa ordem, buscar a página 1 ou a página 1000 custa o
+mesmo. O cursor devolvido ao cliente (``next_cursor``) é opaco: base64 de um JSON
+com o tipo da ordenação e os valores da chave.
+"""
+import base64
+import json
+from datetime import date, datetime, time
+
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def page_size_arg(args):
+    """Lê ``page_size`` da query string, limitado a [1, MAX_PAGE_SIZE]."""
+    return min(max(int(args.get('page_size', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+
+
+def encode_cursor(kind, values):
+    """Gera o cursor opaco para os valores da chave de ordenação ``kind``."""
+    raw = [value.isoformat() if isinstance(value, (date, time, datetime)) else value for value in values]
+    payload = json.dumps([kind] + raw, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, kind, columns):
+    """Lê um cursor gerado por ``encode_cursor``; lança ValueError se for inválido ou de outra ordenação."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError('Cursor inválido.')
+    if not isinstance(payload, list) or len(payload) != len(columns) + 1 or payload[0] != kind:
+        raise ValueError('Cursor inválido para esta ordenação.')
+
+    values = []
+    for column, raw in zip(columns, payload[1:]):
+        python_type = column.type.python_type
+        try:
+            values.append(python_type.fromisoformat(raw) if hasattr(python_type, 'fromisoformat') else python_type(raw))
+        except (TypeError, ValueError):  # JSON válido com valores do tipo errado (ex.: número no lugar da data)
+            raise ValueError('Cursor inválido.')
+    return values
+
+
+def keyset_page(query, columns, kind, cursor, page_size, descending=False):
+    """
+    Aplica ordenação, filtro do cursor e limite a ``query``.
+    Retorna ``(linhas, next_cursor)``; ``next_cursor`` é None na última página.
+    """
+    key = tuple_(*columns)
+    if cursor:
+        values = decode_cursor(cursor, kind, columns)
+        query = query.filter(key < tuple(values) if descending else key > tuple(values))
+    query = query.order_by(*[column.desc() if descending else column for column in columns])
+
+    # Uma linha a mais indica se existe próxima página
+    rows = query.limit(page_size + 1).all()
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor(kind, [getattr(last, column.key) for column in columns])
@@ -0,0 +1,69 @@
+# src/query_plans.py
+"""
+Verificação dos planos de consulta dos caminhos quentes.
+
+Executa EXPLAIN QUERY PLAN nas consultas mais frequentes e confere se o SQLite
+usa o índice esperado. Rode com ``flask check-query-plans``; o comando termina
+com erro se algum índice deixou de ser usado (ex.: depois de mudar um filtro).
+"""
+from datetime import datetime, date, time
+
+from src.models.user import db
+from src.models.blocked_time import BlockedTime
+from src.models.booking import Booking
+from src.models.customer import Customer, PREFIX_END
+from src.models.customer_stats import CustomerStats
+from src.dashboard import next_appointments_query
+
+
+def _hot_queries():
+    """Pares (descrição, consulta, índices aceitos) dos caminhos quentes."""
+    today = date.today()
+    return [
+        ('Bloqueios ativos do dia',
+         BlockedTime.query.filter_by(blocked_date=today, active=True),
+         ('ix_blocked_time_active_day', 'ix_blocked_time_date_active')),
+        ('Bloqueio de um agendamento',
+         BlockedTime.query.filter_by(booking_id=1),
+         ('sqlite_autoindex_blocked_time_1',)),
+        ('Agendamentos confirmados do dia',
+         Booking.query.filter_by(booking_date=today, status='confirmed'),
+         ('ix_booking_date_status', 'ix_booking_status_date_time', 'sqlite_autoindex_booking_1')),
+        ('Próximos agendamentos',
+         next_appointments_query(datetime.combine(today, time(0, 0))),
+         ('ix_booking_status_date_time',)),
+        ('Agendamentos mais recentes',
+         Booking.query.order_by(Booking.created_at.desc()).limit(5),
+         ('ix_booking_created_at',)),
+        ('Cliente por e-mail',
+         Customer.query.filter_by(email_normalized='cliente@exemplo.com'),
+         ('ix_customer_email_normalized',)),
+        ('Busca de clientes por nome',
+         Customer.query.filter(Customer.name_normalized >= 'ana',
+                               Customer.name_normalized < 'ana' + PREFIX_END).order_by(Customer.name_normalized),
+         ('ix_customer_name_normalized',)),
+        ('Agendamentos de um cliente',
+         Booking.query.filter_by(customer_id=1, status='confirmed'),
+         ('ix_booking_customer_status_date',)),
+        ('Clientes por última visita',
+         CustomerStats.query.filter(CustomerStats.last_visit_date != None)
+         .order_by(CustomerStats.last_visit_date.desc(), CustomerStats.customer_id.desc()).limit(50),
+         ('ix_customer_stats_last_visit_date',)),
+    ]
+
+
+def explain(query):
+    """Retorna as linhas de detalhe do EXPLAIN QUERY PLAN de uma Query."""
+    sql = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}').all()
+    return [row[3] for row in rows]
+
+
+def check_query_plans():
+    """Retorna a lista de ``(descrição, plano, ok)`` para cada consulta quente."""
+    results = []
+    for description, query, expected_indexes in _hot_queries():
+        plan = explain(query)
+        ok = any(index in detail for detail in plan for index in expected_indexes)
+        results.append((description, plan, ok))
+    return results
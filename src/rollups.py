@@ -0,0 +1,146 @@
+# src/rollups.py
+"""
+Contagens e faturamento de agendamentos confirmados por (dia, serviço), e contagens
+por serviço, para o dashboard e os relatórios.
+
+Cada rota que cria, altera, cancela ou apaga agendamentos guarda o estado
+relevante antes da mudança (``booking_count_key``) e chama
+``apply_booking_change(antes, depois)`` antes do commit; as tabelas
+booking_daily_count e booking_service_count são ajustadas com upserts
+incrementais na mesma transação.
+Assim os widgets do dashboard leem poucas linhas de rollup em vez de agrupar
+toda a tabela Booking. As duas funções também agendam, para depois do commit, a
+invalidação do resumo do dashboard em cache (src/dashboard.py).
+
+O resumo por cliente (customer_stats) é recalculado por inteiro a partir dos
+agendamentos do cliente com ``refresh_customer_stats``, como a disponibilidade
+do dia em src/availability.py: são poucas linhas, lidas pelo índice
+ix_booking_customer_status_date.
+"""
+from datetime import datetime
+from sqlalchemy import case, func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import aliased
+
+from src.models.user import db
+from src.models.booking import Booking
+from src.models.booking_daily_count import BookingDailyCount, BookingServiceCount
+from src.models.customer_stats import CustomerStats
+from src.commit_hooks import after_commit
+from src.dashboard import invalidate_dashboard
+
+
+def booking_count_key(booking):
+    """
+    Chave ``(dia, serviço, preço)`` contada pelo rollup, ou None se o agendamento não está
+    confirmado. O preço é o registrado no agendamento (``Booking.price``).
+    """
+    if booking is None or booking.status != 'confirmed':
+        return None
+    return booking.booking_date, booking.service_id, booking.price or 0.0
+
+
+def adjust_confirmed_count(day, service_id, delta, revenue_delta=0.0):
+    """
+    Soma ``delta`` à contagem e ``revenue_delta`` ao faturamento de (dia, serviço), e
+    ``delta`` ao total do serviço.
+    """
+    after_commit(invalidate_dashboard)
+    db.session.execute(
+        insert(BookingDailyCount)
+        .values(day=day, service_id=service_id, confirmed_count=delta, revenue=revenue_delta)
+        .on_conflict_do_update(index_elements=[BookingDailyCount.day, BookingDailyCount.service_id],
+                               set_={'confirmed_count': BookingDailyCount.confirmed_count + delta,
+                                     'revenue': BookingDailyCount.revenue + revenue_delta})
+    )
+    db.session.execute(
+        insert(BookingServiceCount)
+        .values(service_id=service_id, confirmed_count=delta)
+        .on_conflict_do_update(index_elements=[BookingServiceCount.service_id],
+                               set_={'confirmed_count': BookingServiceCount.confirmed_count + delta})
+    )
+
+
+def apply_booking_change(before_key, after_key):
+    """Ajusta o rollup para um agendamento que passou de ``before_key`` para ``after_key``."""
+    # Mesmo sem mudar as contagens, a alteração pode mudar os próximos agendamentos
+    after_commit(invalidate_dashboard)
+    if before_key == after_key:
+        return
+    if before_key is not None:
+        day, service_id, price = before_key
+        adjust_confirmed_count(day, service_id, -1, -price)
+    if after_key is not None:
+        day, service_id, price = after_key
+        adjust_confirmed_count(day, service_id, 1, price)
+
+
+def rebuild_booking_rollups():
+    """Recalcula os rollups a partir de Booking (carga inicial ou reparo). Retorna o número de linhas diárias."""
+    BookingDailyCount.query.delete()
+    BookingServiceCount.query.delete()
+    rows = db.session.query(Booking.booking_date, Booking.service_id, func.count(Booking.id),
+                            func.coalesce(func.sum(Booking.price), 0)) \
+        .filter(Booking.status == 'confirmed') \
+        .group_by(Booking.booking_date, Booking.service_id).all()
+    totals = {}
+    for _, service_id, count, _ in rows:
+        totals[service_id] = totals.get(service_id, 0) + count
+    if rows:
+        db.session.execute(insert(BookingDailyCount), [
+            {'day': day, 'service_id': service_id, 'confirmed_count': count, 'revenue': revenue}
+            for day, service_id, count, revenue in rows
+        ])
+        db.session.execute(insert(BookingServiceCount), [
+            {'service_id': service_id, 'confirmed_count': count} for service_id, count in totals.items()
+        ])
+    after_commit(invalidate_dashboard)
+    db.session.commit()
+    return len(rows)
+
+
+def _customer_stats_select():
+    """SELECT das colunas de customer_stats, agrupado por cliente."""
+    confirmed = Booking.status == 'confirmed'
+    # Serviço favorito: o mais agendado; no empate, o agendado mais recentemente
+    favourite = aliased(Booking)
+    favourite_service_id = db.select(favourite.service_id) \
+        .where(favourite.customer_id == Booking.customer_id, favourite.status == 'confirmed') \
+        .group_by(favourite.service_id) \
+        .order_by(func.count().desc(), func.max(favourite.booking_date).desc(), favourite.service_id) \
+        .limit(1).correlate(Booking).scalar_subquery()
+    return db.select(
+        Booking.customer_id,
+        func.count(case((confirmed, 1))).label('visit_count'),
+        func.max(case((confirmed, Booking.booking_date))).label('last_visit_date'),
+        func.count(case((Booking.status == 'cancelled', 1))).label('cancelled_count'),
+        func.count(case((Booking.status == 'no_show', 1))).label('no_show_count'),
+        favourite_service_id.label('favourite_service_id'),
+    ).group_by(Booking.customer_id)
+
+
+CUSTOMER_STATS_COLUMNS = ('customer_id', 'visit_count', 'last_visit_date', 'cancelled_count', 'no_show_count',
+                          'favourite_service_id')
+
+
+def refresh_customer_stats(customer_id):
+    """Recalcula a linha de customer_stats do cliente a partir dos agendamentos dele (antes do commit)."""
+    row = db.session.execute(_customer_stats_select().where(Booking.customer_id == customer_id)).first()
+    values = dict(zip(CUSTOMER_STATS_COLUMNS[1:], row[1:])) if row else \
+        {'visit_count': 0, 'last_visit_date': None, 'cancelled_count': 0, 'no_show_count': 0,
+         'favourite_service_id': None}
+    values['updated_at'] = datetime.utcnow()
+    db.session.execute(
+        insert(CustomerStats)
+        .values(customer_id=customer_id, **values)
+        .on_conflict_do_update(index_elements=[CustomerStats.customer_id], set_=values)
+    )
+
+
+def rebuild_customer_stats():
+    """Recalcula customer_stats para todos os clientes com agendamentos. Retorna o número de linhas."""
+    CustomerStats.query.delete()
+    db.session.execute(insert(CustomerStats).from_select(CUSTOMER_STATS_COLUMNS, _customer_stats_select()))
+    count = CustomerStats.query.count()
+    db.session.commit()
+    return count
@@ -1,191 +1,382 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from src.models.user import db
 from src.models.blocked_time import BlockedTime
-from src.models.booking import Booking
-from src.models.service import Service
-from datetime import datetime, date, time, timedelta
-from sqlalchemy import func
+from src.models.business_hours import BusinessHours
+from src.models.recurring_rule import RecurringRule
+from datetime import datetime, date, timedelta
+import json
+from src import slot_engine, schedule
+from src.availability import refresh_day_availability, get_day_availability, get_availability_range
+from src.availability_events import availability_hub
+from src.slot_holds import slot_holds
+from src.http_cache import make_etag, conditional_response
+from src import dashboard, analytics
 
 admin_bp = Blueprint('admin', __name__)
 
 
-# --- Funções Auxiliares para Regras Recorrentes e Horários de Funcionamento ---
+# --- Funções Auxiliares para Regras Recorrentes ---
+
+def get_recurring_unavailable_slots(target_date):
+    """
+    Retorna os slots indisponíveis de acordo com as regras recorrentes (RecurringRule)
+    para uma data específica. Ex: Segunda, Quarta, Sexta: 09:00 - 11:30
+    """
+    return slot_engine.mask_labels(schedule.recurring_mask(target_date))
+
+
+# --- Endpoints de Configurações (Predefined Time Slots) ---
+@admin_bp.route('/settings/time-slots', methods=['GET'])
+def get_predefined_time_slots():
+    """
+    Retorna uma lista abrangente de todos os horários que a clínica PODE ter,
+    baseado na união dos horários de funcionamento de todos os dias.
+    Isso é para o frontend popular a lista de slots para seleção.
+    """
+    predefined_slots = slot_engine.mask_labels(schedule.all_working_mask())
+    return jsonify({'time_slots': predefined_slots}), 200
+
+
+def _parse_time_range(data):
+    """Lê start_time/end_time (HH:MM) de um dict e valida que o início vem antes do fim."""
+    start_time = datetime.strptime(data['start_time'], '%H:%M').time()
+    end_time = datetime.strptime(data['end_time'], '%H:%M').time()
+    if start_time >= end_time:
+        raise ValueError('O horário de início deve ser anterior ao de fim.')
+    return start_time, end_time
 
-def generate_time_slots(start_time_str, end_time_str, interval_minutes=30):
-    """Gera uma lista de slots de tempo no formato HH:MM."""
-    slots = []
-    start_time = datetime.strptime(start_time_str, '%H:%M').time()
-    end_time = datetime.strptime(end_time_str, '%H:%M').time()
 
-    current_slot_dt = datetime.combine(date.min, start_time)
-    # Gerar slots até o início do último slot
-    end_dt = datetime.combine(date.min, end_time)
+def _parse_weekday(value):
+    weekday = int(value)
+    if weekday < 1 or weekday > 7:
+        raise ValueError('Dia da semana deve estar entre 1 (Segunda) e 7 (Domingo).')
+    return weekday
 
-    while current_slot_dt < end_dt:  # Use < para que o último slot seja o final do horário (ex: 18:00 não entra se for 18:00-18:30)
-        slots.append(current_slot_dt.strftime('%H:%M'))
-        current_slot_dt += timedelta(minutes=interval_minutes)
-    return slots
+
+# --- Endpoints de Horários de Funcionamento e Regras Recorrentes ---
+@admin_bp.route('/settings/business-hours', methods=['GET'])
+def get_business_hours():
+    """Retorna os intervalos de funcionamento cadastrados, por dia da semana (1=Segunda ... 7=Domingo)."""
+    try:
+        hours = BusinessHours.query.order_by(BusinessHours.weekday, BusinessHours.start_time).all()
+        return jsonify({'business_hours': [h.to_dict() for h in hours]}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 
-def get_daily_working_slots(target_date):
+@admin_bp.route('/settings/business-hours', methods=['PUT'])
+def update_business_hours():
     """
-    Retorna os slots de trabalho (horários de funcionamento) para uma data específica,
-    considerando as regras da clínica.
+    Substitui todos os horários de funcionamento.
+    Data de entrada: { business_hours: [{ weekday: 1, start_time: "09:00", end_time: "18:00" }, ...] }
     """
-    day_of_week = target_date.isoweekday()  # 1=Segunda, 7=Domingo
+    try:
+        data = request.get_json()
+        entries = data.get('business_hours')
+        if entries is None:
+            return jsonify({'error': 'business_hours é obrigatório'}), 400
+
+        new_hours = []
+        for entry in entries:
+            start_time, end_time = _parse_time_range(entry)
+            new_hours.append(BusinessHours(weekday=_parse_weekday(entry['weekday']),
+                                           start_time=start_time, end_time=end_time))
+
+        BusinessHours.query.delete()
+        db.session.add_all(new_hours)
+        db.session.commit()
+        schedule.invalidate_schedule_cache()
+
+        return jsonify({'business_hours': [h.to_dict() for h in new_hours]}), 200
+    except (KeyError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'error': f'Erro de valor: {e}'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
 
-    if day_of_week >= 1 and day_of_week <= 5:  # Segunda a Sexta
-        return generate_time_slots("09:00", "18:00")
-    elif day_of_week == 6:  # Sábado
-        return generate_time_slots("09:00", "13:00")
-    else:  # Domingo (day_of_week == 7)
-        return []  # Domingo fechado
 
+@admin_bp.route('/settings/recurring-rules', methods=['GET'])
+def get_recurring_rules():
+    """Retorna as regras recorrentes de indisponibilidade."""
+    try:
+        rules = RecurringRule.query.order_by(RecurringRule.start_time).all()
+        return jsonify({'recurring_rules': [rule.to_dict() for rule in rules]}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-def get_recurring_unavailable_slots(target_date):
+
+def _apply_recurring_rule_data(rule, data):
+    """Preenche uma RecurringRule a partir do JSON da requisição (campos ausentes são mantidos)."""
+    if 'weekdays' in data:
+        weekdays = sorted({_parse_weekday(day) for day in data['weekdays']})
+        if not weekdays:
+            raise ValueError('Informe ao menos um dia da semana.')
+        rule.weekdays = ','.join(str(day) for day in weekdays)
+    if 'start_time' in data or 'end_time' in data:
+        rule.start_time, rule.end_time = _parse_time_range({
+            'start_time': data.get('start_time', rule.start_time.strftime('%H:%M') if rule.start_time else None),
+            'end_time': data.get('end_time', rule.end_time.strftime('%H:%M') if rule.end_time else None),
+        })
+    if 'reason' in data:
+        rule.reason = data['reason']
+    if 'active' in data:
+        rule.active = bool(data['active'])
+
+
+@admin_bp.route('/settings/recurring-rules', methods=['POST'])
+def create_recurring_rule():
     """
-    Retorna os slots indisponíveis de acordo com a regra recorrente para uma data específica.
-    Segunda, Quarta, Sexta: 09:00 - 11:00
+    Cria uma regra recorrente.
+    Data de entrada: { weekdays: [1, 3, 5], start_time: "09:00", end_time: "11:30", reason: "Manutenção" }
     """
-    recurring_blocked_slots = []
-    day_of_week = target_date.isoweekday()
+    try:
+        data = request.get_json()
+        if not all(k in data for k in ('weekdays', 'start_time', 'end_time')):
+            return jsonify({'error': 'weekdays, start_time e end_time são obrigatórios.'}), 400
 
-    # 1=Segunda, 3=Quarta, 5=Sexta
-    if day_of_week in [1, 3, 5]:
-        # Slots das 09:00, 09:30, 10:00, 10:30 são bloqueados.
-        # O loop vai até ANTES de 11:00.
-        start_time = time(9, 0)
-        end_time = time(11, 30)
+        rule = RecurringRule(active=True)
+        _apply_recurring_rule_data(rule, data)
+        db.session.add(rule)
+        db.session.commit()
+        schedule.invalidate_schedule_cache()
 
-        current_slot = datetime.combine(date.min, start_time)
-        end_dt = datetime.combine(date.min, end_time)
+        return jsonify(rule.to_dict()), 201
+    except (TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'error': f'Erro de valor: {e}'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
 
-        while current_slot.time() < end_dt.time():
-            recurring_blocked_slots.append(current_slot.strftime('%H:%M'))
-            current_slot += timedelta(minutes=30)
-    return recurring_blocked_slots
 
+@admin_bp.route('/settings/recurring-rules/<int:rule_id>', methods=['PUT'])
+def update_recurring_rule(rule_id):
+    """Atualiza uma regra recorrente."""
+    try:
+        rule = RecurringRule.query.get_or_404(rule_id)
+        _apply_recurring_rule_data(rule, request.get_json())
+        db.session.commit()
+        schedule.invalidate_schedule_cache()
 
-# --- Endpoints de Configurações (Predefined Time Slots) ---
-@admin_bp.route('/settings/time-slots', methods=['GET'])
-def get_predefined_time_slots():
+        return jsonify(rule.to_dict()), 200
+    except (TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'error': f'Erro de valor: {e}'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/settings/recurring-rules/<int:rule_id>', methods=['DELETE'])
+def delete_recurring_rule(rule_id):
+    """Remove uma regra recorrente."""
+    try:
+        rule = RecurringRule.query.get_or_404(rule_id)
+        db.session.delete(rule)
+        db.session.commit()
+        schedule.invalidate_schedule_cache()
+
+        return jsonify({'message': 'Regra removida com sucesso'}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+# --- Endpoints de Gerenciamento de Disponibilidade ---
+
+# Tamanho máximo do intervalo aceito por /availability?start=&end=
+AVAILABILITY_MAX_RANGE_DAYS = 731
+# Quantidade de dias serializados por pedaço da resposta em streaming
+AVAILABILITY_STREAM_CHUNK_DAYS = 31
+
+
+def _availability_entry(current_date, blocked, full_day_closed):
+    """Entrada do mapa de disponibilidade de um dia: {fullDayClosed, unavailableSlots}."""
+    # 1. Horários de funcionamento padrão para o dia
+    working = schedule.working_mask(current_date)
+    if not working:  # Se for domingo ou um dia com 0 horas de trabalho
+        return {'fullDayClosed': True, 'unavailableSlots': []}
+
+    # 2. Regra recorrente (Seg, Qua, Sex - manhã) + bloqueios explícitos do banco de dados
+    if full_day_closed:
+        # Se o dia está fechado explicitamente, todos os slots de trabalho são indisponíveis
+        unavailable = working
+    else:
+        unavailable = working & (schedule.recurring_mask(current_date) | blocked)
+
+    return {
+        'fullDayClosed': full_day_closed,
+        'unavailableSlots': slot_engine.mask_labels(unavailable)
+    }
+
+
+def _stream_availability(start_date, end_date, blocks_by_day, held_by_day):
     """
-    Retorna uma lista abrangente de todos os horários que a clínica PODE ter,
-    baseado nos horários de funcionamento mais amplos (Segunda a Sexta).
-    Isso é para o frontend popular a lista de slots para seleção.
+    Gera o JSON {"availability": {data: entrada}} dia a dia, em pedaços.
+    Dias sem bloqueios nem holds (a grande maioria) dependem apenas do dia da semana,
+    então usam um modelo por dia da semana serializado uma única vez.
     """
-    predefined_slots = generate_time_slots("09:00", "18:00")
-    return jsonify({'time_slots': predefined_slots}), 200
+    weekday_templates = {}
+    chunk = ['{"availability": {']
+    separator = ''
+    current_date = start_date
+    while current_date < end_date:
+        blocks = blocks_by_day.get(current_date)
+        held = held_by_day.get(current_date, 0)
+        if blocks is None and not held:
+            weekday = current_date.isoweekday()
+            if weekday not in weekday_templates:
+                weekday_templates[weekday] = json.dumps(_availability_entry(current_date, 0, False))
+            entry = weekday_templates[weekday]
+        else:
+            blocked, full_day_closed, _ = blocks or (0, False, 0)
+            # Slots segurados por holds aparecem como indisponíveis
+            entry = json.dumps(_availability_entry(current_date, blocked | held, full_day_closed))
+        chunk.append(f'{separator}"{current_date.isoformat()}": {entry}')
+        separator = ', '
+
+        if len(chunk) >= AVAILABILITY_STREAM_CHUNK_DAYS:
+            yield ''.join(chunk)
+            chunk = []
+        current_date += timedelta(days=1)
+    chunk.append('}}')
+    yield ''.join(chunk)
 
 
-# --- Endpoints de Gerenciamento de Disponibilidade ---
 @admin_bp.route('/availability', methods=['GET'])
 def get_availability():
     """
-    Retorna o mapa de disponibilidade para um determinado mês e ano,
+    Retorna o mapa de disponibilidade para um determinado mês e ano, ou para um intervalo
+    [start, end) de datas (ex: um trimestre ou um ano inteiro para o calendário do admin),
     incluindo bloqueios explícitos e recorrentes, e horários de funcionamento.
     Ex: /api/availability?year=2025&month=7
+        /api/availability?start=2025-01-01&end=2026-01-01
+    A resposta é enviada em streaming, dia a dia.
+    """
+    try:
+        start_str = request.args.get('start')
+        end_str = request.args.get('end')
+
+        if start_str or end_str:
+            if not (start_str and end_str):
+                return jsonify({'error': 'Informe start e end (YYYY-MM-DD).'}), 400
+            start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
+            if end_date <= start_date or (end_date - start_date).days > AVAILABILITY_MAX_RANGE_DAYS:
+                return jsonify({'error': f'Intervalo inválido (máximo de {AVAILABILITY_MAX_RANGE_DAYS} dias).'}), 400
+        else:
+            year = request.args.get('year', type=int)
+            month = request.args.get('month', type=int)
+
+            if not year or not month:
+                return jsonify({'error': 'Ano e mês são obrigatórios'}), 400
+
+            start_date, end_date = get_month_range(year, month)
+
+        # Busca a disponibilidade materializada do intervalo inteiro (uma consulta na chave primária)
+        blocks_by_day = get_availability_range(start_date, end_date)
+        # Versões lidas antes das máscaras: uma mudança no meio gera um ETag antigo, nunca um novo com dados velhos
+        hold_versions = slot_holds.versions(start_date, end_date)
+        held_by_day = slot_holds.held_masks(start_date, end_date)
+
+        # ETag: versões dos dias do intervalo + versão das regras + versões dos holds
+        etag = make_etag('availability', start_date, end_date, schedule.schedule_version(),
+                         sorted((day, version) for day, (_, _, version) in blocks_by_day.items()),
+                         sorted(hold_versions.items()))
+
+        # O gerador consulta as regras (recompiladas do banco se o cache foi invalidado),
+        # então o contexto da requisição precisa continuar ativo durante o streaming
+        return conditional_response(etag, lambda: Response(
+            stream_with_context(_stream_availability(start_date, end_date, blocks_by_day, held_by_day)),
+            status=200, mimetype='application/json'))
+
+    except ValueError:
+        return jsonify({'error': 'Ano, mês ou datas inválidos. Use números inteiros e datas YYYY-MM-DD.'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# Intervalo (segundos) entre comentários de keepalive no stream de disponibilidade
+AVAILABILITY_STREAM_KEEPALIVE_SECONDS = 15
+
+
+def _sse(event_name, data):
+    """Formata um evento server-sent events."""
+    return f"event: {event_name}\ndata: {json.dumps(data)}\n\n"
+
+
+def _stream_availability_events(subscription, snapshot):
+    """Envia o estado inicial do dia e depois cada delta publicado, até o cliente desconectar."""
+    try:
+        yield f"retry: 5000\n\n{_sse('snapshot', snapshot)}"
+        while True:
+            event = subscription.get(timeout=AVAILABILITY_STREAM_KEEPALIVE_SECONDS)
+            if event is None:
+                yield ': keepalive\n\n'
+                continue
+            yield _sse(event['type'], event)
+            if event['type'] == 'resync':
+                return  # O cliente reconecta e recebe um snapshot novo
+    finally:
+        availability_hub.unsubscribe(subscription)
+
+
+@admin_bp.route('/availability/stream', methods=['GET'])
+def stream_availability():
+    """
+    Stream (server-sent events) das mudanças de disponibilidade de uma data.
+    Ex: /api/availability/stream?date=2025-07-21
+
+    O primeiro evento ("snapshot") traz os horários disponíveis no momento; depois chegam
+    eventos "availability" com os slots que abriram (added) ou foram ocupados (removed),
+    em vez de a página consultar /available-times periodicamente. Um evento "resync"
+    indica que o cliente ficou para trás e deve reconectar.
     """
     try:
-        year = request.args.get('year', type=int)
-        month = request.args.get('month', type=int)
-
-        if not year or not month:
-            return jsonify({'error': 'Ano e mês são obrigatórios'}), 400
-
-        # Calcular o número de dias no mês
-        last_day_of_month = date(year, month, 1) + timedelta(days=get_days_in_month(year, month) - 1)
-        num_days = last_day_of_month.day
-
-        availability_map = {}
-
-        # Busca todos os bloqueios ativos para o mês e ano
-        blocked_times_in_month = BlockedTime.query.filter(
-            func.strftime('%Y-%m', BlockedTime.blocked_date) == f"{year}-{month:02d}",
-            BlockedTime.active == True
-        ).all()
-
-        # Constrói um dicionário para acesso rápido aos bloqueios por data
-        explicit_blocks = {}
-        for block in blocked_times_in_month:
-            date_str = block.blocked_date.isoformat()
-            if date_str not in explicit_blocks:
-                explicit_blocks[date_str] = []
-            explicit_blocks[date_str].append(block)
-
-        for day in range(1, num_days + 1):
-            current_date = date(year, month, day)
-            date_str = current_date.isoformat()
-
-            full_day_closed_by_rule = False
-            explicitly_full_day_closed = False
-            current_day_unavailable_slots_set = set()
-
-            # 1. Obter horários de funcionamento padrão para o dia
-            daily_working_slots = get_daily_working_slots(current_date)
-
-            if not daily_working_slots:  # Se for domingo ou um dia com 0 horas de trabalho
-                full_day_closed_by_rule = True
-            else:
-                # 2. Adiciona horários da regra recorrente (Seg, Qua, Sex - manhã)
-                recurring_slots = get_recurring_unavailable_slots(current_date)
-                current_day_unavailable_slots_set.update(recurring_slots)
-
-                # 3. Adiciona bloqueios explícitos do banco de dados
-                if date_str in explicit_blocks:
-                    for block in explicit_blocks[date_str]:
-                        if block.start_time is None and block.end_time is None:
-                            explicitly_full_day_closed = True
-                            break  # O dia está explicitamente fechado, não precisamos verificar mais slots
-                        else:
-                            # Adiciona slots bloqueados explicitamente
-                            start_dt = datetime.combine(date.min, block.start_time)
-                            end_dt = datetime.combine(date.min, block.end_time)
-                            current_slot = start_dt
-                            while current_slot.time() < end_dt.time():  # Use < para iterar pelos slots do bloqueio
-                                slot_str = current_slot.strftime('%H:%M')
-                                # Apenas adicione se o slot realmente existe nos horários de trabalho do dia
-                                if slot_str in daily_working_slots:
-                                    current_day_unavailable_slots_set.add(slot_str)
-                                current_slot += timedelta(minutes=30)
-
-            # Determina o estado final de full_day_closed
-            final_full_day_closed = full_day_closed_by_rule or explicitly_full_day_closed
-
-            final_unavailable_slots = []
-            if final_full_day_closed:
-                # Se o dia está fechado (por regra ou explicitamente), todos os slots de trabalho são indisponíveis
-                final_unavailable_slots = sorted(list(set(daily_working_slots)))
-            else:
-                # Caso contrário, apenas os slots explicitamente ou recorrentemente bloqueados
-                # que estão dentro dos horários de trabalho do dia
-                final_unavailable_slots = sorted([
-                    s for s in list(current_day_unavailable_slots_set)
-                    if s in daily_working_slots
-                ])
-
-            availability_map[date_str] = {
-                'fullDayClosed': final_full_day_closed,
-                'unavailableSlots': final_unavailable_slots
+        date_str = request.args.get('date')
+        if not date_str:
+            return jsonify({'error': 'Data é obrigatória (YYYY-MM-DD).'}), 400
+        target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+
+        # Assina antes de ler o estado atual para não perder mudanças entre os dois passos
+        subscription = availability_hub.subscribe(target_date)
+        try:
+            blocked, full_day_closed, version = get_day_availability(target_date)
+            snapshot = {
+                'date': target_date.isoformat(),
+                'version': version,
+                'available': slot_engine.mask_labels(schedule.bookable_mask(target_date, blocked, full_day_closed)),
             }
+        except Exception:
+            availability_hub.unsubscribe(subscription)
+            raise
 
-        return jsonify({'availability': availability_map}), 200
+        response = Response(_stream_availability_events(subscription, snapshot), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
 
     except ValueError:
-        return jsonify({'error': 'Ano ou mês inválido. Use números inteiros.'}), 400
+        return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD.'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-def get_days_in_month(year, month):
-    """Retorna o número de dias em um determinado mês e ano."""
-    if month == 2:
-        if (year % 4 == 0 and year % 100 != 0) or (year % 400 == 0):
-            return 29
-        return 28
-    elif month in [4, 6, 9, 11]:
-        return 30
-    return 31
+def get_month_range(year, month):
+    """
+    Retorna o intervalo semiaberto [início, fim) de um mês.
+    Filtrar com coluna >= início e coluna < fim permite usar índices, ao contrário de
+    func.strftime sobre a coluna, que obriga o SQLite a varrer a tabela inteira.
+    """
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def get_year_range(year):
+    """Retorna o intervalo semiaberto [início, fim) de um ano."""
+    return date(year, 1, 1), date(year + 1, 1, 1)
 
 
 @admin_bp.route('/availability/<string:date_string>', methods=['PUT'])
@@ -204,7 +395,7 @@ def update_day_availability(date_string):
 
         # 1. Desativa todos os bloqueios existentes para esta data
         BlockedTime.query.filter_by(blocked_date=target_date, active=True).update({'active': False})
-        db.session.commit()
+        db.session.flush()
 
         # 2. Adiciona novos bloqueios baseados na requisição
         if full_day_closed_request:
@@ -236,6 +427,7 @@ def update_day_availability(date_string):
                     )
                     db.session.add(new_block)
 
+        refresh_day_availability(target_date)
         db.session.commit()
         return jsonify({'message': 'Disponibilidade atualizada com sucesso'}), 200
 
@@ -253,9 +445,7 @@ def update_day_availability(date_string):
 def get_daily_appointments_count():
     """Retorna a contagem de agendamentos confirmados para o dia atual."""
     try:
-        today = date.today()
-        count = Booking.query.filter_by(booking_date=today, status='confirmed').count()
-        return jsonify({'count': count}), 200
+        return jsonify({'count': dashboard.daily_appointments_count(date.today())}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -264,14 +454,7 @@ def get_daily_appointments_count():
 def get_next_appointments():
     """Retorna os próximos agendamentos confirmados."""
     try:
-        now = datetime.now()
-        next_bookings = Booking.query.filter(
-            (Booking.booking_date > now.date()) |
-            ((Booking.booking_date == now.date()) & (Booking.booking_time >= now.time())),
-            Booking.status == 'confirmed'
-        ).order_by(Booking.booking_date, Booking.booking_time).limit(5).all()
-
-        return jsonify({'appointments': [booking.to_dict() for booking in next_bookings]}), 200
+        return jsonify({'appointments': dashboard.next_appointments(datetime.now())}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -280,16 +463,7 @@ def get_next_appointments():
 def get_appointments_by_service():
     """Retorna a contagem de agendamentos por tipo de serviço."""
     try:
-        service_counts = db.session.query(
-            Service.name, func.count(Booking.id)
-        ).join(Booking, Service.id == Booking.service_id) \
-            .filter(Booking.status == 'confirmed') \
-            .group_by(Service.name) \
-            .order_by(func.count(Booking.id).desc()) \
-            .all()
-
-        result = [{'service': name, 'count': count} for name, count in service_counts]
-        return jsonify({'stats': result}), 200
+        return jsonify({'stats': dashboard.appointments_by_service()}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -298,20 +472,113 @@ def get_appointments_by_service():
 def get_appointments_by_month():
     """Retorna a contagem de agendamentos por mês no ano atual."""
     try:
-        current_year = date.today().year
-        month_counts = db.session.query(
-            func.strftime('%m', Booking.booking_date).label('month'),
-            func.count(Booking.id)
-        ).filter(
-            func.strftime('%Y', Booking.booking_date) == str(current_year),
-            Booking.status == 'confirmed'
-        ).group_by('month') \
-            .order_by('month') \
-            .all()
-
-        result_dict = {month: count for month, count in month_counts}
-        full_year_data = {f"{i:02d}": result_dict.get(f"{i:02d}", 0) for i in range(1, 13)}
-        formatted_month_data = [{"month": month, "count": count} for month, count in full_year_data.items()]
-        return jsonify({'stats': formatted_month_data}), 200
+        return jsonify({'stats': dashboard.appointments_by_month(date.today().year)}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/dashboard/summary', methods=['GET'])
+def get_dashboard_summary():
+    """
+    Retorna os quatro widgets do dashboard em uma única resposta, calculados na mesma
+    transação de leitura. O resultado fica em cache por DASHBOARD_CACHE_SECONDS e é
+    descartado quando um agendamento é criado, alterado, cancelado ou apagado.
+    """
+    try:
+        ttl = current_app.config.get('DASHBOARD_CACHE_SECONDS', dashboard.DASHBOARD_CACHE_SECONDS)
+        return jsonify(dashboard.dashboard_summary(ttl)), 200
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+# --- Análises ---
+
+WEEKDAY_NAMES = {1: 'Segunda', 2: 'Terça', 3: 'Quarta', 4: 'Quinta', 5: 'Sexta', 6: 'Sábado', 7: 'Domingo'}
+
+
+def _occupancy_percent(booked, capacity):
+    return round(100.0 * booked / capacity, 1) if capacity else None
+
+
+@admin_bp.route('/admin/analytics/occupancy', methods=['GET'])
+def get_occupancy_analytics():
+    """
+    Percentual dos slots reserváveis ocupados por agendamentos confirmados, por dia da
+    semana e horário, nos últimos ``months`` meses até ontem (padrão 3, máximo 24);
+    ``end_date`` não entra no período.
+    Dias da semana e horários sem capacidade no período não aparecem.
+    """
+    try:
+        months = request.args.get('months', analytics.DEFAULT_OCCUPANCY_MONTHS, type=int)
+        if not 1 <= months <= analytics.MAX_OCCUPANCY_MONTHS:
+            return jsonify({'error': f'months deve estar entre 1 e {analytics.MAX_OCCUPANCY_MONTHS}.'}), 400
+        end_date = date.today()
+        start_date = analytics.months_before(end_date, months)
+        capacity, booked = analytics.occupancy(start_date, end_date)
+
+        weekdays = []
+        total_capacity = total_booked = 0
+        for weekday in range(1, 8):
+            slots = [
+                {'time': slot_engine.SLOT_LABELS[slot], 'capacity': slot_capacity,
+                 'booked': booked[weekday][slot],
+                 'occupancy_percent': _occupancy_percent(booked[weekday][slot], slot_capacity)}
+                for slot, slot_capacity in enumerate(capacity[weekday]) if slot_capacity
+            ]
+            if not slots:
+                continue
+            weekday_capacity = sum(slot['capacity'] for slot in slots)
+            weekday_booked = sum(slot['booked'] for slot in slots)
+            total_capacity += weekday_capacity
+            total_booked += weekday_booked
+            weekdays.append({
+                'weekday': weekday,
+                'name': WEEKDAY_NAMES[weekday],
+                'capacity': weekday_capacity,
+                'booked': weekday_booked,
+                'occupancy_percent': _occupancy_percent(weekday_booked, weekday_capacity),
+                'slots': slots,
+            })
+
+        return jsonify({
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'months': months,
+            'capacity': total_capacity,
+            'booked': total_booked,
+            'occupancy_percent': _occupancy_percent(total_booked, total_capacity),
+            'weekdays': weekdays,
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route('/admin/analytics/revenue', methods=['GET'])
+def get_revenue_analytics():
+    """
+    Faturamento dos agendamentos confirmados, pelo preço registrado em cada agendamento.
+    Parâmetros: granularity=day|week|month (padrão month) e start_date/end_date
+    (YYYY-MM-DD, inclusivos; padrão: o ano atual).
+    Ex: /api/admin/analytics/revenue?granularity=week&start_date=2025-01-01&end_date=2025-03-31
+    """
+    try:
+        granularity = request.args.get('granularity', 'month')
+        year_start, year_end = get_year_range(date.today().year)
+        start_date_str = request.args.get('start_date')
+        end_date_str = request.args.get('end_date')
+        start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else year_start
+        end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() + timedelta(days=1) if end_date_str else year_end
+        if end_date <= start_date:
+            return jsonify({'error': 'end_date deve ser igual ou posterior a start_date.'}), 400
+
+        periods, totals = analytics.revenue_by_period(start_date, end_date, granularity)
+        return jsonify({
+            'granularity': granularity,
+            'start_date': start_date.isoformat(),
+            'end_date': (end_date - timedelta(days=1)).isoformat(),
+            'periods': periods,
+            'totals': totals,
+        }), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
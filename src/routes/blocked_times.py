@@ -1,13 +1,20 @@
 from flask import Blueprint, jsonify, request
 from src.models.user import db
 from src.models.blocked_time import BlockedTime
+from src.availability import refresh_day_availability
+from src.idempotency import idempotent
+from src.pagination import keyset_page, page_size_arg
 from datetime import datetime
 
 blocked_times_bp = Blueprint('blocked_times', __name__)
 
 @blocked_times_bp.route('/blocked-times', methods=['GET'])
 def get_blocked_times():
-    """Retorna todos os horários bloqueados"""
+    """
+    Retorna todos os horários bloqueados.
+    Com ?page_size= (e ?cursor= nas páginas seguintes) a resposta é paginada por cursor:
+    { blocked_times: [...], next_cursor: "..." }.
+    """
     try:
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
@@ -19,12 +26,22 @@ def get_blocked_times():
         if end_date:
             query = query.filter(BlockedTime.blocked_date <= datetime.strptime(end_date, '%Y-%m-%d').date())
             
+        cursor = request.args.get('cursor')
+        if cursor is not None or 'page_size' in request.args:
+            blocked_times, next_cursor = keyset_page(query, (BlockedTime.blocked_date, BlockedTime.id), 'date',
+                                                     cursor, page_size_arg(request.args))
+            return jsonify({'blocked_times': [blocked_time.to_dict() for blocked_time in blocked_times],
+                            'next_cursor': next_cursor})
+
         blocked_times = query.order_by(BlockedTime.blocked_date).all()
         return jsonify([blocked_time.to_dict() for blocked_time in blocked_times])
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @blocked_times_bp.route('/blocked-times', methods=['POST'])
+@idempotent
 def create_blocked_time():
     """Cria um novo bloqueio de horário"""
     try:
@@ -38,6 +55,7 @@ def create_blocked_time():
         )
         
         db.session.add(blocked_time)
+        refresh_day_availability(blocked_time.blocked_date)
         db.session.commit()
         
         return jsonify(blocked_time.to_dict()), 201
@@ -51,6 +69,7 @@ def delete_blocked_time(blocked_time_id):
     try:
         blocked_time = BlockedTime.query.get_or_404(blocked_time_id)
         blocked_time.active = False
+        refresh_day_availability(blocked_time.blocked_date)
         db.session.commit()
         
         return jsonify({'message': 'Bloqueio removido com sucesso'})
@@ -1,25 +1,83 @@
 # src/routes/bookings.py
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from src.models.user import db
-from src.models.booking import Booking
+from src.models.booking import Booking, BOOKING_FIELDS, serialize_bookings, serialize_booking_rows
 from src.models.customer import Customer
-from src.models.service import Service
 from src.models.blocked_time import BlockedTime
+from src import slot_engine, schedule
+from src.http_cache import make_etag, conditional_response
+from src.catalog import get_catalog, get_service_info, catalog_version
+from src.availability import (refresh_day_availability, get_day_availability, get_availability_range,
+                              find_conflicting_block)
+from src.slot_holds import slot_holds
+from src.commit_hooks import after_commit
+from src.idempotency import idempotent
+from src.pagination import keyset_page, page_size_arg
+from src.rollups import booking_count_key, apply_booking_change, adjust_confirmed_count, refresh_customer_stats
 from datetime import datetime, date, time, timedelta
 # Lembre-se de importar no topo do arquivo:
+from sqlalchemy import insert, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 from datetime import date, timedelta  # Apenas para garantir que estão presentes
+import csv
+from collections import Counter
+import io
 import json
+import secrets
 
 bookings_bp = Blueprint('bookings', __name__)
 
-# Importe a função auxiliar do admin.py para reutilizar a lógica da regra recorrente
-from src.routes.admin import get_recurring_unavailable_slots
+# Entidades aceitas em ?include= para /bookings
+BOOKING_INCLUDES = ('customer', 'service')
+
+
+def _parse_list_arg(args, name, allowed):
+    """Lê um parâmetro separado por vírgulas (ex: fields=id,status) e valida contra ``allowed``."""
+    values = [value.strip() for value in args.get(name, '').split(',') if value.strip()]
+    invalid = [value for value in values if value not in allowed]
+    if invalid:
+        raise ValueError(f"{name} inválido(s): {', '.join(invalid)}. Use: {', '.join(allowed)}")
+    return list(dict.fromkeys(values))
+
+
+def _side_loaded_customers(customer_ids):
+    """``{id: cliente}`` dos clientes referenciados, em consultas por lotes de ids."""
+    customer_ids = sorted(customer_ids)
+    customers = {}
+    for i in range(0, len(customer_ids), 500):
+        for customer in Customer.query.filter(Customer.id.in_(customer_ids[i:i + 500])):
+            customers[str(customer.id)] = customer.to_dict()
+    return customers
+
+
+def _normalized_bookings_payload(rows, fields, include):
+    """Resposta com ?fields=/?include=: agendamentos planos e cada cliente/serviço referenciado uma vez."""
+    payload = {'bookings': serialize_booking_rows(rows, fields)}
+    if 'customer' in include:
+        payload['customers'] = _side_loaded_customers({row.customer_id for row in rows})
+    if 'service' in include:
+        catalog = get_catalog()
+        payload['services'] = {
+            str(service_id): catalog.get(service_id).to_dict()
+            for service_id in sorted({row.service_id for row in rows}) if catalog.get(service_id) is not None
+        }
+    return payload
 
 
 @bookings_bp.route('/bookings', methods=['GET'])
 def get_bookings():
-    """Retorna agendamentos com filtros opcionais por data, status, serviço e ordenação."""
+    """
+    Retorna agendamentos com filtros opcionais por data, status, serviço e ordenação.
+    Com ?page_size= (e ?cursor= nas páginas seguintes) a resposta é paginada por cursor:
+    { bookings: [...], next_cursor: "..." }, com next_cursor nulo na última página.
+
+    Para listas grandes:
+    - ?fields=id,booking_date,booking_time,status seleciona só essas colunas (no SQL);
+    - ?include=customer,service devolve cada cliente/serviço uma única vez, em mapas por id:
+      { bookings: [...], customers: {id: {...}}, services: {id: {...}} }.
+    Com qualquer um dos dois, os agendamentos vêm sem os objetos aninhados e a resposta é um objeto.
+    """
     try:
         # Parâmetros de filtro
         single_date_str = request.args.get('date')  # Novo parâmetro para data única
@@ -29,8 +87,30 @@ def get_bookings():
         service_id = request.args.get('service_id', type=int)  # Novo parâmetro para filtrar por serviço
         limit = request.args.get('limit', type=int)  # Novo parâmetro para limitar resultados
         order_by = request.args.get('order_by')  # Novo parâmetro para tipo de ordenação
+        cursor = request.args.get('cursor')
+        paginate = cursor is not None or 'page_size' in request.args
+        fields = _parse_list_arg(request.args, 'fields', BOOKING_FIELDS)
+        include = _parse_list_arg(request.args, 'include', BOOKING_INCLUDES)
+        normalized = bool(fields or include)
 
-        query = Booking.query
+        # Chave de ordenação (a paginação por cursor inclui o id para desempatar)
+        if order_by == 'latest':
+            sort_columns, sort_kind, descending = (Booking.created_at, Booking.id), 'latest', True
+        else:
+            sort_columns, sort_kind, descending = (Booking.booking_date, Booking.booking_time, Booking.id), 'date', False
+
+        if normalized:
+            # Apenas as colunas pedidas (+ ids referenciados e chave de ordenação), sem objetos ORM
+            fields = fields or list(BOOKING_FIELDS)
+            selected = list(fields)
+            if 'customer' in include:
+                selected.append('customer_id')
+            if 'service' in include:
+                selected.append('service_id')
+            selected += [column.key for column in sort_columns]
+            query = Booking.query.with_entities(*[getattr(Booking, name) for name in dict.fromkeys(selected)])
+        else:
+            query = Booking.query.options(*Booking.list_options())
 
         # Filtrar por uma data específica (se 'date' for fornecido)
         if single_date_str:
@@ -48,18 +128,131 @@ def get_bookings():
         if service_id:
             query = query.filter(Booking.service_id == service_id)
 
-        # Ordenação
-        if order_by == 'latest':
-            query = query.order_by(Booking.created_at.desc())  # Ordenar por mais recente
+        if paginate:
+            bookings, next_cursor = keyset_page(query, sort_columns, sort_kind, cursor,
+                                                page_size_arg(request.args), descending=descending)
+        else:
+            # Ordenação
+            if order_by == 'latest':
+                query = query.order_by(Booking.created_at.desc())  # Ordenar por mais recente
+            else:
+                query = query.order_by(Booking.booking_date, Booking.booking_time)  # Ordenação padrão
+
+            # Limitar resultados (para 'Mais Recentes')
+            if limit:
+                query = query.limit(limit)
+
+            bookings = query.all()
+
+        if normalized:
+            payload = _normalized_bookings_payload(bookings, fields, include)
+        elif paginate:
+            payload = {'bookings': serialize_bookings(bookings)}
+        else:
+            return jsonify(serialize_bookings(bookings))
+
+        if paginate:
+            payload['next_cursor'] = next_cursor
+        return jsonify(payload)
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# Colunas do export, na ordem do cabeçalho do CSV (service_price é o preço registrado no agendamento)
+EXPORT_COLUMNS = ('id', 'booking_date', 'booking_time', 'status', 'notes', 'created_at',
+                  'customer_id', 'customer_name', 'customer_email', 'customer_phone',
+                  'service_id', 'service_name', 'service_category', 'service_price')
+# Linhas buscadas do cursor por vez e linhas por pedaço enviado ao cliente
+EXPORT_BATCH_SIZE = 1000
+
+
+def _export_rows(query):
+    """Gera as linhas do export como tuplas planas, na ordem de EXPORT_COLUMNS."""
+    catalog = get_catalog()
+    for (booking_id, booking_date, booking_time, status, notes, created_at,
+         customer_id, customer_name, customer_email, customer_phone, service_id, price) in query:
+        service = catalog.get(service_id)
+        if price is None:
+            price = service.price if service else ''
+        yield (booking_id, booking_date.isoformat(), booking_time.strftime('%H:%M'), status, notes or '',
+               created_at.isoformat() if created_at else '',
+               customer_id, customer_name, customer_email, customer_phone or '',
+               service_id, service.name if service else '', service.category if service else '',
+               price)
+
+
+def _stream_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _stream_ndjson(rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False))
+        if len(lines) == EXPORT_BATCH_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+@bookings_bp.route('/bookings/export', methods=['GET'])
+def export_bookings():
+    """
+    Exporta agendamentos em CSV ou NDJSON, em streaming (ex: relatório anual para a contabilidade).
+    Ex: /api/bookings/export?format=csv&start_date=2025-01-01&end_date=2025-12-31
+    Filtros opcionais: start_date, end_date (inclusivos), status e service_id.
+
+    As linhas são lidas do cursor em lotes (yield_per) como tuplas planas, sem objetos ORM,
+    e enviadas à medida que são lidas, então a memória não cresce com a quantidade de linhas.
+    """
+    try:
+        export_format = request.args.get('format', 'csv')
+        if export_format not in ('csv', 'ndjson'):
+            return jsonify({'error': 'format deve ser csv ou ndjson.'}), 400
+
+        query = db.session.query(
+            Booking.id, Booking.booking_date, Booking.booking_time, Booking.status, Booking.notes, Booking.created_at,
+            Customer.id, Customer.name, Customer.email, Customer.phone, Booking.service_id, Booking.price
+        ).join(Customer, Customer.id == Booking.customer_id)
+
+        start_date_str = request.args.get('start_date')
+        end_date_str = request.args.get('end_date')
+        if start_date_str:
+            query = query.filter(Booking.booking_date >= datetime.strptime(start_date_str, '%Y-%m-%d').date())
+        if end_date_str:
+            query = query.filter(Booking.booking_date <= datetime.strptime(end_date_str, '%Y-%m-%d').date())
+        if request.args.get('status'):
+            query = query.filter(Booking.status == request.args['status'])
+        if request.args.get('service_id'):
+            query = query.filter(Booking.service_id == int(request.args['service_id']))
+
+        query = query.order_by(Booking.booking_date, Booking.booking_time, Booking.id) \
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+        rows = _export_rows(query)
+        if export_format == 'csv':
+            body, mimetype = _stream_csv(rows), 'text/csv'
         else:
-            query = query.order_by(Booking.booking_date, Booking.booking_time)  # Ordenação padrão
+            body, mimetype = _stream_ndjson(rows), 'application/x-ndjson'
 
-        # Limitar resultados (para 'Mais Recentes')
-        if limit:
-            query = query.limit(limit)
+        response = Response(stream_with_context(body), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename=bookings.{export_format}'
+        return response
 
-        bookings = query.all()
-        return jsonify([booking.to_dict() for booking in bookings])
+    except ValueError:
+        return jsonify({'error': 'Parâmetros inválidos. Use datas YYYY-MM-DD e service_id inteiro.'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -74,22 +267,49 @@ def get_booking(booking_id):
         return jsonify({'error': str(e)}), 500
 
 
+def _get_or_create_customer(customer_data):
+    """
+    Busca o cliente pelo e-mail normalizado ou cria um novo; retorna None se os dados
+    estiverem incompletos.
+
+    A criação é um único INSERT ... ON CONFLICT DO NOTHING: se outra requisição (ou um
+    cadastro com o mesmo e-mail em outra caixa) já criou o cliente, o INSERT não faz nada
+    e a busca pelo índice único do e-mail o encontra. O e-mail é a identidade do cliente:
+    se o INSERT não fez nada por causa do telefone, ele já é de outra pessoa (ex.: alguém
+    da mesma família) e o cliente novo é criado sem ``phone_normalized``, como na
+    migração a1b2c3d4e5f6 — o telefone informado continua salvo em ``phone``.
+    """
+    if not customer_data or not all(k in customer_data for k in ('email', 'name', 'phone')):
+        return None
+
+    values = Customer.normalized_values(customer_data.get('name'), customer_data.get('email'),
+                                        customer_data.get('phone'))
+    if values['email_normalized'] is None:
+        return None
+    now = datetime.utcnow()
+    db.session.execute(
+        sqlite_insert(Customer).values(created_at=now, updated_at=now, **values).on_conflict_do_nothing()
+    )
+    customer = Customer.query.filter_by(email_normalized=values['email_normalized']).first()
+    if customer is None and values['phone_normalized'] is not None:
+        values['phone_normalized'] = None
+        db.session.execute(
+            sqlite_insert(Customer).values(created_at=now, updated_at=now, **values).on_conflict_do_nothing()
+        )
+        customer = Customer.query.filter_by(email_normalized=values['email_normalized']).first()
+    return customer
+
+
 @bookings_bp.route('/bookings', methods=['POST'])
+@idempotent
 def create_booking():
     """Cria um novo agendamento de forma atômica, confiando na constraint do DB."""
     # Sua lógica para obter os dados e o cliente permanece a mesma.
     data = request.get_json()
-    customer_data = data.get('customer')
-    if not customer_data or not all(k in customer_data for k in ('email', 'name', 'phone')):
+    customer = _get_or_create_customer(data.get('customer'))
+    if customer is None:
         return jsonify({'error': 'Dados do cliente ausentes'}), 400
 
-    customer = Customer.query.filter_by(email=customer_data.get('email')).first()
-    if not customer:
-        customer = Customer(name=customer_data.get('name'), phone=customer_data.get('phone'),
-                            email=customer_data.get('email'))
-        db.session.add(customer)
-        db.session.flush()
-
     try:
         booking_date = datetime.strptime(data['booking_date'], '%Y-%m-%d').date()
         booking_time = datetime.strptime(data['booking_time'], '%H:%M').time()
@@ -100,51 +320,67 @@ def create_booking():
         #
         # existing_booking = Booking.query.filter_by(...) -> REMOVIDO
 
-        # 2. MANTENHA AS VERIFICAÇÕES DE BLOQUEIOS (RECORRENTES E MANUAIS)
-        # É bom verificar isso antes para dar uma resposta mais específica ao usuário.
-        recurring_blocked_slots = get_recurring_unavailable_slots(booking_date)
-        if booking_time.strftime('%H:%M') in recurring_blocked_slots:
-            return jsonify(
-                {'error': 'Este horário não está disponível para agendamento (manutenção).'}), 409  # Use 409 Conflict
-
-        blocked_explicitly = BlockedTime.query.filter_by(blocked_date=booking_date, active=True).all()
-        service_duration = Service.query.get(service_id).duration_minutes
-        booking_slot_start_dt = datetime.combine(date.min, booking_time)
-        booking_slot_end_dt = booking_slot_start_dt + timedelta(minutes=service_duration)
-
-        for block in blocked_explicitly:
-            if block.start_time is None and block.end_time is None:
-                return jsonify({'error': 'Data inteira bloqueada para agendamentos.'}), 409
-
-            blocked_start_dt = datetime.combine(date.min, block.start_time)
-            blocked_end_dt = datetime.combine(date.min, block.end_time)
-            if (booking_slot_start_dt < blocked_end_dt and booking_slot_end_dt > blocked_start_dt):
+        # Com um hold válido deste horário (POST /slot-holds), ele já foi validado e está
+        # reservado para este cliente; a UniqueConstraint continua sendo a garantia final.
+        service = get_service_info(int(service_id))
+        if service is None:
+            return jsonify({'error': 'Serviço não encontrado.'}), 404
+
+        hold_token = data.get('hold_token')
+        hold = slot_holds.get(hold_token) if hold_token else None
+        if hold is not None and hold.covers(booking_date, booking_time, service.id):
+            service_duration = hold.duration_minutes
+        else:
+            hold_token = None
+
+            # 2. MANTENHA AS VERIFICAÇÕES DE BLOQUEIOS (RECORRENTES E MANUAIS)
+            # É bom verificar isso antes para dar uma resposta mais específica ao usuário.
+            service_duration = service.duration_minutes
+            if not _fits_schedule(booking_date, booking_time, service_duration):
+                return jsonify(
+                    {'error': 'Este horário não está disponível para agendamento (fora do expediente ou em manutenção).'}), 409  # Use 409 Conflict
+
+            if slot_holds.held_mask(booking_date) & slot_engine.duration_mask(booking_time, service_duration):
+                return jsonify({'error': 'Este horário está reservado temporariamente por outro cliente.'}), 409
+
+            conflicting_block = find_conflicting_block(booking_date, booking_time, service_duration)
+            if conflicting_block is not None:
+                if conflicting_block.start_time is None and conflicting_block.end_time is None:
+                    return jsonify({'error': 'Data inteira bloqueada para agendamentos.'}), 409
                 return jsonify({'error': 'Este horário está bloqueado.'}), 409
 
+        booking_slot_end_dt = datetime.combine(date.min, booking_time) + timedelta(minutes=service_duration)
+
         # 3. TENTE CRIAR O AGENDAMENTO DIRETAMENTE
         booking = Booking(
             customer_id=customer.id,
-            service_id=service_id,
+            service_id=service.id,
             booking_date=booking_date,
             booking_time=booking_time,
             notes=data.get('notes', ''),
             status='confirmed'
         )
+        booking.snapshot_price(service)
         db.session.add(booking)
         db.session.flush()
 
         # Sua lógica de criar BlockedTime associado está correta e permanece aqui
-        service_name = Service.query.get(service_id).name
         blocked_by_booking = BlockedTime(
             blocked_date=booking_date,
             start_time=booking_time,
             end_time=booking_slot_end_dt.time(),
-            reason=f"Agendamento de {customer.name} para {service_name}",
+            reason=f"Agendamento de {customer.name} para {service.name}",
             booking_id=booking.id,
             created_at=datetime.utcnow(),
             active=True
         )
         db.session.add(blocked_by_booking)
+        refresh_day_availability(booking_date)
+        apply_booking_change(None, booking_count_key(booking))
+        refresh_customer_stats(customer.id)
+        if hold_token:
+            # O horário passa a ser protegido pelo BlockedTime; o hold só é liberado depois do commit
+            after_commit(lambda: slot_holds.release(hold_token))
 
         db.session.commit()
 
@@ -162,6 +398,154 @@ def create_booking():
         return jsonify({'error': 'Ocorreu um erro inesperado ao processar seu agendamento.'}), 500
 
 
+# Quantidade máxima de sessões por requisição em /bookings/batch
+BATCH_MAX_ITEMS = 20
+
+
+def _batch_slots(data):
+    """
+    Lê as sessões pedidas em /bookings/batch como lista de ``(data, hora)``: de ``items``
+    ([{booking_date, booking_time}, ...]) ou de ``recurrence``
+    ({start_date, booking_time, count, weekday (1..7, opcional), every_weeks (padrão 1)}).
+    """
+    if 'items' in data:
+        return [(datetime.strptime(item['booking_date'], '%Y-%m-%d').date(),
+                 datetime.strptime(item['booking_time'], '%H:%M').time()) for item in data['items']]
+
+    recurrence = data['recurrence']
+    start_date = datetime.strptime(recurrence['start_date'], '%Y-%m-%d').date()
+    booking_time = datetime.strptime(recurrence['booking_time'], '%H:%M').time()
+    count = int(recurrence['count'])
+    every_weeks = int(recurrence.get('every_weeks', 1))
+    if count < 1 or every_weeks < 1:
+        raise ValueError('count e every_weeks devem ser positivos.')
+    if 'weekday' in recurrence:
+        # Primeira ocorrência do dia da semana a partir de start_date (ex: "toda terça 14:00 x 8")
+        weekday = int(recurrence['weekday'])
+        if weekday < 1 or weekday > 7:
+            raise ValueError('weekday deve estar entre 1 (Segunda) e 7 (Domingo).')
+        start_date += timedelta(days=(weekday - start_date.isoweekday()) % 7)
+    return [(start_date + timedelta(weeks=i * every_weeks), booking_time)
+            for i in range(min(count, BATCH_MAX_ITEMS + 1))]
+
+
+@bookings_bp.route('/bookings/batch', methods=['POST'])
+@idempotent
+def create_bookings_batch():
+    """
+    Agenda várias sessões (pacotes e séries) de uma vez, de forma atômica.
+    Data de entrada: { customer: {...}, service_id: 5, notes: "", client_token: "...",
+                       items: [{ booking_date: "2025-07-15", booking_time: "14:00" }, ...] }
+                  ou { ..., recurrence: { start_date: "2025-07-15", weekday: 2, booking_time: "14:00", count: 8 } }
+
+    Com o client_token dos holds (POST /slot-holds), os horários segurados pelo próprio
+    cliente contam como livres e os holds agendados são liberados depois do commit.
+
+    Todas as sessões são validadas contra um único retrato da disponibilidade (uma consulta
+    por intervalo) e inseridas em lote na mesma transação. Se alguma não couber, nada é
+    gravado e a resposta 409 lista os conflitos por item.
+    """
+    data = request.get_json()
+    try:
+        slots = _batch_slots(data)
+        service = get_service_info(int(data['service_id']))
+        hold_client = data.get('client_token')
+        if hold_client is not None and not isinstance(hold_client, str):
+            raise ValueError('client_token inválido.')
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Parâmetros inválidos: {e}'}), 400
+    if not slots:
+        return jsonify({'error': 'Informe ao menos uma sessão.'}), 400
+    if len(slots) > BATCH_MAX_ITEMS:
+        return jsonify({'error': f'Máximo de {BATCH_MAX_ITEMS} sessões por requisição.'}), 400
+    if service is None:
+        return jsonify({'error': 'Serviço não encontrado.'}), 404
+
+    try:
+        customer = _get_or_create_customer(data.get('customer'))
+        if customer is None:
+            return jsonify({'error': 'Dados do cliente ausentes'}), 400
+
+        # Retrato da disponibilidade de todos os dias envolvidos, em uma consulta
+        dates = [booking_date for booking_date, _ in slots]
+        availability_by_day = get_availability_range(min(dates), max(dates) + timedelta(days=1))
+
+        # Slots já tomados por itens anteriores do próprio lote, por dia
+        taken_by_day = {}
+        conflicts = []
+        for index, (booking_date, booking_time) in enumerate(slots):
+            needed_mask = slot_engine.duration_mask(booking_time, service.duration_minutes)
+            blocked_mask, full_day_closed, _ = availability_by_day.get(booking_date, (0, False, 0))
+            available_mask = _bookable_mask(booking_date, blocked_mask, full_day_closed, hold_client=hold_client)
+
+            error = None
+            if booking_date < date.today():
+                error = 'Data no passado.'
+            elif needed_mask & taken_by_day.get(booking_date, 0):
+                error = 'Conflita com outra sessão do mesmo pedido.'
+            elif not needed_mask or needed_mask & ~available_mask:
+                error = 'Data inteira bloqueada para agendamentos.' if full_day_closed else 'Este horário não está disponível.'
+            if error:
+                conflicts.append({'index': index, 'booking_date': booking_date.isoformat(),
+                                  'booking_time': booking_time.strftime('%H:%M'), 'error': error})
+            taken_by_day[booking_date] = taken_by_day.get(booking_date, 0) | needed_mask
+
+        if conflicts:
+            db.session.rollback()
+            return jsonify({'error': 'Algumas sessões não estão disponíveis.', 'conflicts': conflicts}), 409
+
+        # Inserção em lote (executemany): uma instrução para os Bookings e uma para os BlockedTimes.
+        # Os ids são recuperados em uma consulta pela UniqueConstraint (data, hora, status).
+        now = datetime.utcnow()
+        db.session.execute(insert(Booking), [
+            {'customer_id': customer.id, 'service_id': service.id, 'booking_date': booking_date,
+             'booking_time': booking_time, 'notes': data.get('notes', ''), 'status': 'confirmed',
+             'price': service.price, 'original_price': service.original_price,
+             'on_promotion': bool(service.on_promotion), 'created_at': now, 'updated_at': now}
+            for booking_date, booking_time in slots
+        ])
+        booking_ids = dict(
+            ((booking_date, booking_time), booking_id) for booking_id, booking_date, booking_time in
+            db.session.query(Booking.id, Booking.booking_date, Booking.booking_time).filter(
+                Booking.status == 'confirmed', tuple_(Booking.booking_date, Booking.booking_time).in_(slots))
+        )
+        reason = f"Agendamento de {customer.name} para {service.name}"
+        db.session.execute(insert(BlockedTime), [
+            {'blocked_date': booking_date, 'start_time': booking_time,
+             'end_time': (datetime.combine(date.min, booking_time) + timedelta(minutes=service.duration_minutes)).time(),
+             'reason': reason, 'booking_id': booking_ids[(booking_date, booking_time)], 'created_at': now, 'active': True}
+            for booking_date, booking_time in slots
+        ])
+        for booking_date in sorted(set(dates)):
+            refresh_day_availability(booking_date)
+        for booking_date, count in Counter(dates).items():
+            adjust_confirmed_count(booking_date, service.id, count, count * service.price)
+        refresh_customer_stats(customer.id)
+        if hold_client:
+            # Os horários passam a ser protegidos pelos BlockedTimes; os holds só saem depois do commit
+            for booking_date, booked_mask in taken_by_day.items():
+                after_commit(lambda booking_date=booking_date, booked_mask=booked_mask:
+                             slot_holds.release_client(hold_client, booking_date, booked_mask))
+
+        bookings = Booking.query.options(*Booking.list_options()).filter(
+            Booking.id.in_([booking_ids[slot] for slot in slots])
+        ).order_by(Booking.booking_date, Booking.booking_time).all()
+        # Serializa antes do commit para não recarregar cada linha expirada depois dele
+        payload = serialize_bookings(bookings)
+        db.session.commit()
+
+        return jsonify({'bookings': payload}), 201
+
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Desculpe, algum destes horários acabou de ser agendado. Por favor, tente novamente.'}), 409
+
+    except Exception as e:
+        db.session.rollback()
+        print(f"Erro ao criar agendamentos em lote: {e}")
+        return jsonify({'error': 'Ocorreu um erro inesperado ao processar seu agendamento.'}), 500
+
+
 @bookings_bp.route('/bookings/<int:booking_id>', methods=['PUT'])
 def update_booking(booking_id):
     """Atualiza um agendamento"""
@@ -169,14 +553,12 @@ def update_booking(booking_id):
         booking = Booking.query.get_or_404(booking_id)
         data = request.get_json()
 
+        old_count_key = booking_count_key(booking)
         old_booking_date = booking.booking_date
         old_booking_time = booking.booking_time
         old_service_id = booking.service_id  # Precisamos do service_id antigo para calcular a duração do slot antigo
         old_status = booking.status
 
-        # Determinar a duração do serviço para o cálculo do slot antigo
-        old_service_duration = Service.query.get(old_service_id).duration_minutes
-
         # Atualiza o agendamento
         if 'booking_date' in data:
             booking.booking_date = datetime.strptime(data['booking_date'], '%Y-%m-%d').date()
@@ -188,30 +570,28 @@ def update_booking(booking_id):
             booking.notes = data['notes']
         if 'service_id' in data:
             booking.service_id = data['service_id']
+            if booking.service_id != old_service_id:
+                # Troca de serviço: registra o preço atual do novo serviço
+                new_service = get_service_info(int(booking.service_id))
+                if new_service is None:
+                    raise ValueError('Serviço não encontrado.')
+                booking.snapshot_price(new_service)
 
         booking.updated_at = datetime.utcnow()
         db.session.flush()
 
         # --- LÓGICA DE ATUALIZAÇÃO DO BLOCKEDTIME CORRESPONDENTE ---
-        # Primeiro, desativar o BlockedTime antigo associado a este agendamento
-        existing_blocked_time_for_booking = BlockedTime.query.filter_by(
-            booking_id=booking_id,
-            blocked_date=old_booking_date,
-            start_time=old_booking_time
-            # Não filtrando por end_time, pois ele pode ter sido ligeiramente diferente dependendo da duração do serviço
-        ).first()
-
-        if existing_blocked_time_for_booking:
-            existing_blocked_time_for_booking.active = False
-            db.session.add(existing_blocked_time_for_booking)  # Marca para desativação
-
-        # Se o agendamento ainda está ativo (não cancelado) e sua data/hora/serviço mudou,
-        # ou se o status mudou para 'confirmed' (de 'pending' ou outro)
-        if booking.status == 'confirmed' and \
-                (booking.booking_date != old_booking_date or \
-                 booking.booking_time != old_booking_time or \
-                 booking.service_id != old_service_id or \
-                 old_status != 'confirmed'):  # Se o status mudou para confirmado
+        # booking_id é único em BlockedTime, então o registro do agendamento é reaproveitado
+        # (inserir um novo registro para o mesmo agendamento violaria a constraint).
+        blocked_by_booking = BlockedTime.query.filter_by(booking_id=booking_id).first()
+
+        # Se a data/hora/serviço mudou, ou se o status mudou para 'confirmed' (de 'pending' ou outro)
+        slot_changed = (booking.booking_date != old_booking_date or
+                        booking.booking_time != old_booking_time or
+                        booking.service_id != old_service_id or
+                        old_status != 'confirmed')
+
+        if booking.status == 'confirmed' and slot_changed:
 
             # 1. Verificar se o NOVO horário está disponível (apenas se o horário mudou ou o status foi confirmado)
             if booking.booking_date != old_booking_date or booking.booking_time != old_booking_time or old_status != 'confirmed':
@@ -224,51 +604,49 @@ def update_booking(booking_id):
                 if existing_booking_at_new_slot:
                     raise ValueError('O novo horário já está ocupado por outro agendamento confirmado.')
 
-            # 2. Verificar regras recorrentes para o NOVO horário
-            recurring_blocked_slots = get_recurring_unavailable_slots(booking.booking_date)
-            if booking.booking_time.strftime('%H:%M') in recurring_blocked_slots:
-                raise ValueError('O novo horário está bloqueado por regra recorrente (Manutenção).')
-
-            # 3. Verificar bloqueios explícitos para o NOVO horário
-            blocked_explicitly = BlockedTime.query.filter_by(
-                blocked_date=booking.booking_date,
-                active=True
-            ).all()
-
-            new_service_duration = Service.query.get(booking.service_id).duration_minutes
-            new_booking_slot_start_dt = datetime.combine(date.min, booking.booking_time)
-            new_booking_slot_end_dt = new_booking_slot_start_dt + timedelta(minutes=new_service_duration)
-
-            for block in blocked_explicitly:
-                # Ignorar o próprio blocked_time do agendamento que está sendo atualizado
-                if block.booking_id == booking_id:
-                    continue
-
-                if block.start_time is None and block.end_time is None:
+            new_service = get_service_info(booking.service_id)
+            if new_service is None:
+                raise ValueError('Serviço não encontrado.')
+            new_service_duration = new_service.duration_minutes
+
+            # 2. Verificar expediente e regras recorrentes durante todo o NOVO atendimento
+            if not _fits_schedule(booking.booking_date, booking.booking_time, new_service_duration):
+                raise ValueError('O novo horário está fora do expediente ou bloqueado por regra recorrente (Manutenção).')
+
+            # 3. Verificar bloqueios explícitos e holds de outros clientes para o NOVO horário
+            # (ignorando o próprio blocked_time do agendamento que está sendo atualizado)
+            if booking.booking_date != old_booking_date or booking.booking_time != old_booking_time:
+                if slot_holds.held_mask(booking.booking_date) & slot_engine.duration_mask(
+                        booking.booking_time, new_service_duration):
+                    raise ValueError('O novo horário está reservado temporariamente por outro cliente.')
+            conflicting_block = find_conflicting_block(booking.booking_date, booking.booking_time,
+                                                       new_service_duration, exclude_booking_id=booking_id)
+            if conflicting_block is not None:
+                if conflicting_block.start_time is None and conflicting_block.end_time is None:
                     raise ValueError('A nova data está bloqueada para agendamentos.')
-
-                blocked_start_dt = datetime.combine(date.min, block.start_time)
-                blocked_end_dt = datetime.combine(date.min, block.end_time)
-
-                if (new_booking_slot_start_dt < blocked_end_dt and new_booking_slot_end_dt > blocked_start_dt):
-                    raise ValueError('O novo horário está bloqueado explicitamente.')
-
-            # Recriar um novo registro BlockedTime para o agendamento com as novas informações
-            new_blocked_by_booking = BlockedTime(
-                blocked_date=booking.booking_date,
-                start_time=booking.booking_time,
-                end_time=new_booking_slot_end_dt.time(),
-                reason=f"Agendamento de {booking.customer.name} para {booking.service.name}",
-                booking_id=booking.id,
-                created_at=datetime.utcnow(),
-                active=True
-            )
-            db.session.add(new_blocked_by_booking)
-        elif booking.status == 'cancelled' and old_status != 'cancelled':
-            # Se o agendamento foi cancelado, certificar-se de desativar o blocked_time correspondente
-            if existing_blocked_time_for_booking:
-                existing_blocked_time_for_booking.active = False
-                db.session.add(existing_blocked_time_for_booking)
+                raise ValueError('O novo horário está bloqueado explicitamente.')
+
+            new_booking_slot_end_dt = datetime.combine(date.min, booking.booking_time) + timedelta(
+                minutes=new_service_duration)
+
+            # Atualiza (ou cria) o registro BlockedTime do agendamento com as novas informações
+            if blocked_by_booking is None:
+                blocked_by_booking = BlockedTime(booking_id=booking.id, created_at=datetime.utcnow())
+                db.session.add(blocked_by_booking)
+            blocked_by_booking.blocked_date = booking.booking_date
+            blocked_by_booking.start_time = booking.booking_time
+            blocked_by_booking.end_time = new_booking_slot_end_dt.time()
+            blocked_by_booking.reason = f"Agendamento de {booking.customer.name} para {new_service.name}"
+            blocked_by_booking.active = True
+        elif booking.status != 'confirmed' and blocked_by_booking:
+            # Se o agendamento foi cancelado (ou deixou de estar confirmado), libera o horário
+            blocked_by_booking.active = False
+
+        refresh_day_availability(old_booking_date)
+        if booking.booking_date != old_booking_date:
+            refresh_day_availability(booking.booking_date)
+        apply_booking_change(old_count_key, booking_count_key(booking))
+        refresh_customer_stats(booking.customer_id)
 
         db.session.commit()
 
@@ -276,6 +654,10 @@ def update_booking(booking_id):
     except ValueError as ve:  # Captura erros de validação
         db.session.rollback()
         return jsonify({'error': str(ve)}), 400
+    except IntegrityError:
+        db.session.rollback()
+        # UniqueConstraint violada: outro agendamento ocupou o mesmo horário
+        return jsonify({'error': 'O novo horário já está ocupado por outro agendamento confirmado.'}), 409
     except Exception as e:
         db.session.rollback()
         print(f"Erro ao atualizar agendamento: {e}")
@@ -294,7 +676,12 @@ def delete_booking(booking_id):
             blocked_time_to_deactivate.active = False
             db.session.add(blocked_time_to_deactivate)
 
+        booking_date = booking.booking_date
+        customer_id = booking.customer_id
+        apply_booking_change(booking_count_key(booking), None)
         db.session.delete(booking)
+        refresh_day_availability(booking_date)
+        refresh_customer_stats(customer_id)
         db.session.commit()
         return jsonify({'message': 'Agendamento deletado com sucesso!'}), 200
     except Exception as e:
@@ -313,6 +700,7 @@ def cancel_booking(booking_id):
         if old_status == 'cancelled':
             return jsonify({'message': 'Agendamento já está cancelado.'}), 200
 
+        old_count_key = booking_count_key(booking)
         booking.status = 'cancelled'
         booking.updated_at = datetime.utcnow()
         db.session.flush()
@@ -323,6 +711,9 @@ def cancel_booking(booking_id):
             blocked_time_to_deactivate.active = False
             db.session.add(blocked_time_to_deactivate)
 
+        refresh_day_availability(booking.booking_date)
+        apply_booking_change(old_count_key, None)
+        refresh_customer_stats(booking.customer_id)
         db.session.commit()
         return jsonify(booking.to_dict()), 200
     except Exception as e:
@@ -331,83 +722,213 @@ def cancel_booking(booking_id):
         return jsonify({'error': str(e)}), 500
 
 
+def _parse_service_ids(args):
+    """Lê ?service_id=1&service_id=2 ou ?service_id=1,2 e retorna a lista de ids (sem repetição)."""
+    service_ids = []
+    for value in args.getlist('service_id'):
+        for part in value.split(','):
+            if part.strip():
+                service_id = int(part)
+                if service_id not in service_ids:
+                    service_ids.append(service_id)
+    return service_ids
+
+
+def _service_durations(service_ids):
+    """Retorna {service_id: duração em minutos}; lança LookupError se algum serviço não existir."""
+    catalog = get_catalog()
+    durations = {service_id: catalog.get(service_id).duration_minutes
+                 for service_id in service_ids if catalog.get(service_id) is not None}
+    missing = [service_id for service_id in service_ids if service_id not in durations]
+    if missing:
+        raise LookupError(f"Serviço(s) não encontrado(s): {', '.join(map(str, missing))}")
+    return durations
+
+
+def _fits_schedule(target_date, start_time, duration_minutes):
+    """Indica se o atendimento inteiro cai no expediente do dia e fora das regras recorrentes."""
+    needed_mask = slot_engine.duration_mask(start_time, duration_minutes)
+    return bool(needed_mask) and not needed_mask & ~schedule.bookable_mask(target_date, 0, False)
+
+
+def _bookable_mask(target_date, blocked_mask, full_day_closed, hold_client=None):
+    """
+    Máscara dos horários oferecidos no dia, sem os segurados por holds (exceto os de
+    ``hold_client``) e os que já passaram se for hoje.
+    """
+    available_mask = schedule.bookable_mask(target_date, blocked_mask, full_day_closed)
+    available_mask &= ~slot_holds.held_mask(target_date, exclude_client=hold_client)
+    if target_date == date.today():
+        available_mask &= ~slot_engine.past_slots_mask(datetime.now().time())
+    return available_mask
+
+
 @bookings_bp.route('/available-times', methods=['GET'])
 def get_available_times():
-    """Retorna horários disponíveis para uma data específica, considerando bloqueios e regras recorrentes."""
+    """
+    Retorna horários disponíveis para uma data específica, considerando bloqueios e regras recorrentes.
+    Com ?service_id= (um ou vários, repetidos ou separados por vírgula), retorna apenas os horários
+    de início em que a duração inteira do serviço cabe em slots livres consecutivos.
+    Ex: /api/available-times?date=2025-07-15&service_id=1&service_id=12
+    """
     try:
         date_str = request.args.get('date')
         if not date_str:
             return jsonify({'error': 'Data é obrigatória'}), 400
 
         booking_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        service_ids = _parse_service_ids(request.args)
+
+        # A disponibilidade materializada do dia já considera apenas bloqueios ativos,
+        # então basta uma busca pela chave primária.
+        blocked_mask, full_day_closed, day_version = get_day_availability(booking_date)
+
+        # ETag: versão do dia + versão das regras e dos holds (+ do catálogo, pelas durações) + slot atual se for hoje
+        current_slot = slot_engine.slot_index(datetime.now().time()) if booking_date == date.today() else None
+        etag = make_etag('available-times', booking_date, day_version, schedule.schedule_version(),
+                         slot_holds.version(booking_date),
+                         sorted(service_ids), catalog_version() if service_ids else None, current_slot)
+
+        def build_response():
+            # 1. Horários de funcionamento menos a regra recorrente
+            # 2. Menos os horários bloqueados (manualmente ou por agendamentos).
+            # 3. Opcional: Filtro para horários que já passaram no dia de hoje
+            available_mask = _bookable_mask(booking_date, blocked_mask, full_day_closed, hold_client=hold_client)
+
+            if not service_ids:
+                return jsonify({'available_times': slot_engine.mask_labels(available_mask)})
+
+            # 4. Apenas inícios em que o serviço inteiro cabe (busca de sequências contíguas na máscara)
+            durations = _service_durations(service_ids)
+            times_by_service = {
+                str(service_id): slot_engine.mask_labels(
+                    slot_engine.fitting_starts_mask(available_mask, durations[service_id]))
+                for service_id in service_ids
+            }
+            response = {'available_times_by_service': times_by_service}
+            if len(service_ids) == 1:
+                response['available_times'] = times_by_service[str(service_ids[0])]
+            return jsonify(response)
+
+        return conditional_response(etag, build_response)
+
+    except LookupError as le:
+        return jsonify({'error': str(le)}), 404
+    except ValueError:
+        return jsonify({'error': 'Parâmetros inválidos. Use date=YYYY-MM-DD e service_id inteiro.'}), 400
+    except Exception as e:
+        # É uma boa prática logar o erro para debug
+        print(f"Erro em get_available_times: {e}")
+        return jsonify({'error': str(e)}), 500
 
-        # Horários de funcionamento (mantido como no seu original)
-        business_hours = {
-            1: [],  # Domingo
-            2: ['14:00', '14:30', '15:00', '15:30', '16:00', '16:30', '17:00', '17:30'],  # Segunda
-            3: ['09:00', '09:30', '10:00', '10:30', '14:00', '14:30', '15:00', '15:30', '16:00', '16:30', '17:00',
-                '17:30'],  # Terça
-            4: ['14:00', '14:30', '15:00', '15:30', '16:00', '16:30', '17:00', '17:30'],  # Quarta
-            5: ['09:00', '09:30', '10:00', '10:30', '14:00', '14:30', '15:00', '15:30', '16:00', '16:30', '17:00',
-                '17:30'],  # Quinta
-            6: ['14:00', '14:30', '15:00', '15:30', '16:00', '16:30', '17:00', '17:30'],  # Sexta
-            7: ['09:00', '09:30', '10:00', '10:30', '11:00', '11:30', '12:00', '12:30'],  # Sábado
-        }
-
-        day_of_week_iso = booking_date.isoweekday()
-        weekday_for_business_hours = 1 if day_of_week_iso == 7 else day_of_week_iso + 1
-        available_times = business_hours.get(weekday_for_business_hours, [])
-
-        # 1. Remover horários da regra recorrente
-        recurring_blocked = get_recurring_unavailable_slots(booking_date)
-        available_times = [t for t in available_times if t not in recurring_blocked]
-
-        # --- SEÇÃO REMOVIDA ---
-        # A consulta direta aos Bookings foi removida para evitar redundância.
-        # A lógica agora confia apenas na tabela BlockedTime.
-        # booked_times = Booking.query.filter_by(...)
-        # -----------------------
-
-        # 2. Remover horários bloqueados (manualmente ou por agendamentos)
-        # Esta consulta é a ÚNICA necessária, pois já lida com agendamentos (active=True)
-        # e libera horários cancelados (active=False).
-        explicitly_blocked_entries = BlockedTime.query.filter_by(
-            blocked_date=booking_date,
-            active=True  # Apenas bloqueios ativos são considerados!
-        ).all()
-
-        # Lógica de remoção otimizada
-        slots_to_remove = set()
-        for blocked_entry in explicitly_blocked_entries:
-            if blocked_entry.start_time is None and blocked_entry.end_time is None:
-                # Se o dia todo está bloqueado, esvazia a lista e para.
-                available_times = []
-                break
 
-            blocked_start_dt = datetime.combine(date.min, blocked_entry.start_time)
-            blocked_end_dt = datetime.combine(date.min, blocked_entry.end_time)
+# Limites da busca do próximo horário livre
+NEXT_AVAILABLE_MAX_DAYS = 180
+NEXT_AVAILABLE_MAX_LIMIT = 50
 
-            for slot_str in available_times:
-                slot_time = datetime.strptime(slot_str, '%H:%M').time()
-                slot_datetime_obj = datetime.combine(date.min, slot_time)
-                # Assumindo slots de 30 minutos
-                slot_end_datetime_obj = slot_datetime_obj + timedelta(minutes=30)
 
-                # Verifica se há qualquer sobreposição
-                if slot_datetime_obj < blocked_end_dt and slot_end_datetime_obj > blocked_start_dt:
-                    slots_to_remove.add(slot_str)
+@bookings_bp.route('/available-times/next', methods=['GET'])
+def get_next_available_times():
+    """
+    Retorna os próximos horários livres a partir de uma data, varrendo vários dias em uma única requisição.
+    Parâmetros: service_id (opcional, considera a duração do serviço), from (YYYY-MM-DD, padrão hoje),
+    limit (padrão 1) e days (horizonte da busca, padrão 60).
+    Ex: /api/available-times/next?service_id=12&from=2025-07-15&limit=3
+    """
+    try:
+        from_str = request.args.get('from')
+        start_date = datetime.strptime(from_str, '%Y-%m-%d').date() if from_str else date.today()
+        start_date = max(start_date, date.today())  # Horários no passado nunca são oferecidos
+        limit = min(max(int(request.args.get('limit', 1)), 1), NEXT_AVAILABLE_MAX_LIMIT)
+        days = min(max(int(request.args.get('days', 60)), 1), NEXT_AVAILABLE_MAX_DAYS)
+
+        service_ids = _parse_service_ids(request.args)
+        if len(service_ids) > 1:
+            return jsonify({'error': 'Informe apenas um service_id.'}), 400
+        duration = _service_durations(service_ids)[service_ids[0]] if service_ids else slot_engine.SLOT_MINUTES
+
+        # Uma única consulta por intervalo carrega a disponibilidade materializada da janela inteira
+        end_date = start_date + timedelta(days=days)
+        availability_by_day = get_availability_range(start_date, end_date)
+
+        next_available = []
+        current_date = start_date
+        while current_date < end_date and len(next_available) < limit:
+            blocked_mask, full_day_closed, _ = availability_by_day.get(current_date, (0, False, 0))
+            starts = slot_engine.fitting_starts_mask(
+                _bookable_mask(current_date, blocked_mask, full_day_closed), duration)
+            for slot_label in slot_engine.mask_labels(starts)[:limit - len(next_available)]:
+                next_available.append({'date': current_date.isoformat(), 'time': slot_label})
+            current_date += timedelta(days=1)
+
+        return jsonify({'next_available': next_available})
+
+    except LookupError as le:
+        return jsonify({'error': str(le)}), 404
+    except ValueError:
+        return jsonify({'error': 'Parâmetros inválidos. Use from=YYYY-MM-DD e números inteiros.'}), 400
+    except Exception as e:
+        print(f"Erro em get_next_available_times: {e}")
+        return jsonify({'error': str(e)}), 500
 
-        if available_times:  # Continua apenas se o dia não foi totalmente bloqueado
-            available_times = [t for t in available_times if t not in slots_to_remove]
 
-        # 3. Opcional: Filtro para horários que já passaram no dia de hoje
-        if booking_date == date.today():
-            now_time = datetime.now().time()
-            available_times = [t for t in available_times if datetime.strptime(t, '%H:%M').time() > now_time]
+# Até quantos dias à frente um horário pode ser segurado por hold
+HOLD_MAX_DAYS_AHEAD = 90
+# Tamanho máximo do client_token enviado pelo navegador
+HOLD_CLIENT_TOKEN_MAX_LENGTH = 64
+
+
+@bookings_bp.route('/slot-holds', methods=['POST'])
+def create_slot_hold():
+    """
+    Reserva temporariamente um horário enquanto o cliente preenche o formulário.
+    Data de entrada: { booking_date: "2025-07-15", booking_time: "14:00", service_id: 1, client_token: "..." }
+    Retorna { hold_token, client_token, expires_at, ... }; envie o hold_token no POST /bookings.
+    Enquanto o hold vale, o horário não aparece em /available-times para os outros clientes.
+    O client_token identifica o navegador (o IP não serve: atrás do proxy todos têm o mesmo):
+    sem ele, um novo é gerado e devolvido, e o navegador o reenvia nos próximos holds. Cada
+    client_token segura no máximo HOLD_MAX_PER_CLIENT horários: um hold novo substitui o mais
+    antigo dele. Só são aceitos horários de hoje até HOLD_MAX_DAYS_AHEAD dias à frente.
+    """
+    try:
+        data = request.get_json()
+        booking_date = datetime.strptime(data['booking_date'], '%Y-%m-%d').date()
+        booking_time = datetime.strptime(data['booking_time'], '%H:%M').time()
+        service_id = int(data['service_id'])
+        client = data.get('client_token') or secrets.token_urlsafe(16)
+        if not isinstance(client, str) or len(client) > HOLD_CLIENT_TOKEN_MAX_LENGTH:
+            return jsonify({'error': 'client_token inválido.'}), 400
+        if not date.today() <= booking_date <= date.today() + timedelta(days=HOLD_MAX_DAYS_AHEAD):
+            return jsonify({'error': f'Só é possível reservar horários de hoje até {HOLD_MAX_DAYS_AHEAD} dias à frente.'}), 400
+        duration = _service_durations([service_id])[service_id]
+
+        # Mesma validação do agendamento, feita uma vez aqui e só com leituras
+        blocked_mask, full_day_closed, _ = get_day_availability(booking_date)
+        needed_mask = slot_engine.duration_mask(booking_time, duration)
+        # Holds do próprio cliente não contam: o novo hold os substitui
+        available_mask = _bookable_mask(booking_date, blocked_mask, full_day_closed, hold_client=client)
+        if not needed_mask or needed_mask & ~available_mask:
+            if needed_mask & slot_holds.held_mask(booking_date, exclude_client=client):
+                return jsonify({'error': 'Este horário está reservado temporariamente por outro cliente.'}), 409
+            return jsonify({'error': 'Este horário não está disponível.'}), 409
+
+        hold = slot_holds.create(booking_date, booking_time, service_id, duration, needed_mask, client=client)
+        if hold is None:
+            return jsonify({'error': 'Este horário está reservado temporariamente por outro cliente.'}), 409
+        return jsonify(hold.to_dict()), 201
+
+    except (KeyError, TypeError, ValueError):  # KeyError antes de LookupError, que é sua classe base
+        return jsonify({'error': 'Informe booking_date (YYYY-MM-DD), booking_time (HH:MM) e service_id.'}), 400
+    except LookupError as le:
+        return jsonify({'error': str(le)}), 404
+    except Exception as e:
+        print(f"Erro ao criar hold: {e}")
+        return jsonify({'error': str(e)}), 500
 
-        return jsonify({'available_times': sorted(available_times)})
 
-    except Exception as e:
-        # É uma boa prática logar o erro para debug
-        print(f"Erro em get_available_times: {e}")
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+@bookings_bp.route('/slot-holds/<string:hold_token>', methods=['DELETE'])
+def release_slot_hold(hold_token):
+    """Libera um hold antes do vencimento (ex.: o cliente desistiu ou trocou de horário)."""
+    if not slot_holds.release(hold_token):
+        return jsonify({'error': 'Reserva não encontrada ou expirada.'}), 404
+    return jsonify({'message': 'Reserva liberada.'}), 200
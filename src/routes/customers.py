@@ -0,0 +1,118 @@
+from flask import Blueprint, jsonify, request
+from sqlalchemy.orm import joinedload
+from src.models.user import db
+from src.models.customer import Customer, PREFIX_END, normalize_email, normalize_name, normalize_phone
+from src.models.customer_stats import CustomerStats
+from src.catalog import get_catalog
+from src.pagination import keyset_page, page_size_arg
+
+customers_bp = Blueprint('customers', __name__)
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 50
+
+
+def _prefix_search(column, prefix, limit):
+    return Customer.query.filter(column >= prefix, column < prefix + PREFIX_END) \
+        .order_by(column).limit(limit).all()
+
+
+@customers_bp.route('/customers/search', methods=['GET'])
+def search_customers():
+    """
+    Busca clientes pelo começo do nome, do e-mail ou do telefone.
+    Ex: /api/customers/search?q=ana  |  ?q=ana@  |  ?q=(11) 9876
+    Maiúsculas, acentos e a formatação do telefone são ignorados. Cada campo é uma
+    busca por intervalo no índice da coluna normalizada (name_normalized,
+    email_normalized, phone_normalized).
+    """
+    try:
+        query_text = (request.args.get('q') or '').strip()
+        limit = min(max(request.args.get('limit', DEFAULT_SEARCH_LIMIT, type=int), 1), MAX_SEARCH_LIMIT)
+        if len(query_text) < 2:
+            return jsonify({'error': 'Informe ao menos 2 caracteres em q.'}), 400
+
+        if '@' in query_text:
+            searches = [(Customer.email_normalized, normalize_email(query_text))]
+        elif not any(char.isalpha() for char in query_text):
+            searches = [(Customer.phone_normalized, normalize_phone(query_text))]
+        else:
+            searches = [(Customer.name_normalized, normalize_name(query_text)),
+                        (Customer.email_normalized, normalize_email(query_text))]
+
+        customers = {}
+        for column, prefix in searches:
+            if not prefix:
+                continue
+            for customer in _prefix_search(column, prefix, limit):
+                customers.setdefault(customer.id, customer)
+        results = sorted(customers.values(), key=lambda customer: (customer.name_normalized or '', customer.id))
+        return jsonify({'customers': [customer.to_dict() for customer in results[:limit]]}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# Ordenações da listagem: coluna de customer_stats (sempre decrescente, desempate por id)
+CUSTOMER_SORTS = {
+    'last_visit': CustomerStats.last_visit_date,
+    'visits': CustomerStats.visit_count,
+    'cancellations': CustomerStats.cancelled_count,
+    'no_shows': CustomerStats.no_show_count,
+}
+
+
+def _stats_dict(stats, catalog):
+    """Resumo do histórico no formato das respostas, com o nome do serviço favorito."""
+    if stats is None:
+        return {'total_visits': 0, 'last_visit': None, 'cancelled_count': 0, 'no_show_count': 0,
+                'favourite_service': None}
+    service = catalog.get(stats.favourite_service_id) if stats.favourite_service_id else None
+    return {
+        'total_visits': stats.visit_count,
+        'last_visit': stats.last_visit_date.isoformat() if stats.last_visit_date else None,
+        'cancelled_count': stats.cancelled_count,
+        'no_show_count': stats.no_show_count,
+        'favourite_service': {'id': service.id, 'name': service.name} if service else None,
+    }
+
+
+@customers_bp.route('/customers', methods=['GET'])
+def list_customers():
+    """
+    Lista clientes com o resumo do histórico, ordenados (decrescente) por
+    ?sort=last_visit|visits|cancellations|no_shows (padrão last_visit).
+    Paginada por cursor: ?page_size= e ?cursor= -> { customers: [...], next_cursor: "..." }.
+    Só entram clientes com agendamentos; em last_visit, só os que têm alguma visita.
+    """
+    try:
+        sort = request.args.get('sort', 'last_visit')
+        sort_column = CUSTOMER_SORTS.get(sort)
+        if sort_column is None:
+            return jsonify({'error': f"sort deve ser um de: {', '.join(CUSTOMER_SORTS)}."}), 400
+
+        query = CustomerStats.query.options(joinedload(CustomerStats.customer, innerjoin=True))
+        if sort == 'last_visit':
+            query = query.filter(CustomerStats.last_visit_date != None)
+        stats_rows, next_cursor = keyset_page(query, (sort_column, CustomerStats.customer_id), sort,
+                                              request.args.get('cursor'), page_size_arg(request.args),
+                                              descending=True)
+        catalog = get_catalog()
+        customers = [dict(stats.customer.to_dict(), stats=_stats_dict(stats, catalog)) for stats in stats_rows]
+        return jsonify({'customers': customers, 'next_cursor': next_cursor}), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@customers_bp.route('/customers/<int:customer_id>/summary', methods=['GET'])
+def get_customer_summary(customer_id):
+    """Dados do cliente e o resumo do histórico: visitas, última visita, cancelamentos, faltas e serviço favorito."""
+    try:
+        customer = db.session.get(Customer, customer_id)
+        if customer is None:
+            return jsonify({'error': 'Cliente não encontrado.'}), 404
+        stats = db.session.get(CustomerStats, customer_id)
+        return jsonify(dict(customer.to_dict(), stats=_stats_dict(stats, get_catalog()))), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
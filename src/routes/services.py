@@ -1,6 +1,8 @@
 from flask import Blueprint, jsonify, request
 from src.models.user import db
 from src.models.service import Service
+from src.http_cache import make_etag, conditional_response
+from src.catalog import get_catalog, invalidate_catalog
 
 services_bp = Blueprint('services', __name__)
 
@@ -14,12 +16,13 @@ def get_services():
         # Apenas para fins de gerenciamento: retornar todos os serviços, incluindo inativos
         # Para o front-end voltado ao cliente, manteria apenas o filter_by(active=True)
         # ou faria um endpoint separado para "serviços visíveis para o cliente".
-        if request.args.get('all') == 'true':
-            services = Service.query.all()
-        else:
-            services = Service.query.filter_by(active=True).all()
+        include_inactive = request.args.get('all') == 'true'
 
-        return jsonify([service.to_dict() for service in services])
+        # O catálogo muda raramente: lido do retrato em memória e, com If-None-Match válido, 304
+        catalog = get_catalog()
+        services = catalog.services if include_inactive else catalog.active_services()
+        return conditional_response(make_etag('services', include_inactive, catalog.version),
+                                    lambda: jsonify([service.to_dict() for service in services]))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -28,8 +31,12 @@ def get_services():
 def get_service(service_id):
     """Retorna um serviço específico."""
     try:
-        service = Service.query.get_or_404(service_id)
-        return jsonify(service.to_dict())
+        catalog = get_catalog()
+        service = catalog.get(service_id)
+        if service is None:
+            return jsonify({'error': 'Serviço não encontrado.'}), 404
+        return conditional_response(make_etag('service', service_id, catalog.version),
+                                    lambda: jsonify(service.to_dict()))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -80,6 +87,7 @@ def create_service():
 
         db.session.add(service)
         db.session.commit()
+        invalidate_catalog()
 
         return jsonify(service.to_dict()), 201
     except KeyError as e:
@@ -155,6 +163,7 @@ def update_service(service_id):
             # No entanto, a forma mais segura é que 'on_promotion' e 'original_price' sejam enviados juntos.
 
         db.session.commit()
+        invalidate_catalog()
 
         return jsonify(service.to_dict())
     except Exception as e:
@@ -169,6 +178,7 @@ def deactivate_service(service_id):
         service = Service.query.get_or_404(service_id)
         service.active = False
         db.session.commit()
+        invalidate_catalog()
 
         return jsonify({'message': 'Serviço desativado com sucesso'}), 200
     except Exception as e:
@@ -183,6 +193,7 @@ def activate_service(service_id):
         service = Service.query.get_or_404(service_id)
         service.active = True
         db.session.commit()
+        invalidate_catalog()
 
         return jsonify({'message': 'Serviço ativado com sucesso'}), 200
     except Exception as e:
@@ -197,6 +208,7 @@ def delete_service_permanent(service_id):
         service = Service.query.get_or_404(service_id)
         db.session.delete(service)
         db.session.commit()
+        invalidate_catalog()
 
         return jsonify({'message': 'Serviço excluído permanentemente com sucesso'}), 204
     except Exception as e:
@@ -1,10 +1,12 @@
 from flask import Blueprint, jsonify, request
 import requests
 import os
+from src.idempotency import idempotent
 
 whatsapp_bp = Blueprint('whatsapp', __name__)
 
 @whatsapp_bp.route('/send-confirmation', methods=['POST'])
+@idempotent
 def send_whatsapp_confirmation():
     """Envia confirmação de agendamento via WhatsApp"""
     try:
@@ -0,0 +1,118 @@
+# src/schedule.py
+"""
+Horários de funcionamento e regras recorrentes editáveis pelo admin.
+
+As tabelas BusinessHours e RecurringRule são compiladas uma única vez em modelos
+de máscara por dia da semana (ver src/slot_engine.py) e ficam em cache no
+processo. As rotas que alteram essas tabelas chamam ``invalidate_schedule_cache``
+depois do commit, e a próxima leitura recompila os modelos.
+"""
+import threading
+from datetime import time
+
+from src.models.user import db
+from src.models.business_hours import BusinessHours
+from src.models.recurring_rule import RecurringRule
+from src import slot_engine
+
+# Valores iniciais (equivalentes às regras que antes eram fixas no código)
+DEFAULT_BUSINESS_HOURS = [
+    (weekday, time(9, 0), time(18, 0)) for weekday in (1, 2, 3, 4, 5)
+] + [(6, time(9, 0), time(13, 0))]
+
+DEFAULT_RECURRING_RULES = [
+    ('1,3,5', time(9, 0), time(11, 30), 'Manutenção'),
+    ('1,3,5', time(11, 30), time(14, 0), 'Intervalo de almoço'),
+    ('2,4', time(11, 0), time(14, 0), 'Intervalo de almoço'),
+]
+
+_lock = threading.Lock()
+_cache = {'templates': None, 'version': 0}
+
+
+def _compile_templates():
+    """Compila as tabelas em ``(working_masks, recurring_masks)``, indexados pelo dia ISO."""
+    working = [0] * 8  # Índice 0 não é usado
+    recurring = [0] * 8
+    for weekday, start_time, end_time in db.session.query(
+            BusinessHours.weekday, BusinessHours.start_time, BusinessHours.end_time):
+        working[weekday] |= slot_engine.time_range_mask(start_time, end_time)
+    for rule in RecurringRule.query.filter_by(active=True):
+        rule_mask = slot_engine.time_range_mask(rule.start_time, rule.end_time)
+        for weekday in rule.weekday_list():
+            recurring[weekday] |= rule_mask
+    return tuple(working), tuple(recurring)
+
+
+def get_templates():
+    """Retorna os modelos compilados, compilando-os na primeira chamada após uma invalidação."""
+    templates = _cache['templates']
+    if templates is None:
+        version = _cache['version']
+        templates = _compile_templates()
+        with _lock:
+            # Só guarda se as regras não mudaram durante a compilação
+            if _cache['version'] == version:
+                _cache['templates'] = templates
+    return templates
+
+
+def invalidate_schedule_cache():
+    """Descarta os modelos compilados (chamar após o commit de alterações nas regras)."""
+    with _lock:
+        _cache['templates'] = None
+        _cache['version'] += 1
+
+
+def schedule_version():
+    """Versão das regras no processo; muda a cada invalidação."""
+    return _cache['version']
+
+
+def working_mask(target_date):
+    """Slots de funcionamento do dia."""
+    return get_templates()[0][target_date.isoweekday()]
+
+
+def recurring_mask(target_date):
+    """Slots indisponíveis pelas regras recorrentes no dia."""
+    return get_templates()[1][target_date.isoweekday()]
+
+
+def all_working_mask():
+    """União dos slots de funcionamento de todos os dias da semana."""
+    mask = 0
+    for weekday_mask in get_templates()[0]:
+        mask |= weekday_mask
+    return mask
+
+
+def bookable_mask(target_date, blocked_mask, full_day_closed):
+    """Slots oferecidos aos clientes, descontando regras recorrentes e bloqueios."""
+    if full_day_closed:
+        return 0
+    working, recurring = get_templates()
+    weekday = target_date.isoweekday()
+    return working[weekday] & ~recurring[weekday] & ~blocked_mask
+
+
+def seed_default_schedule(new_tables):
+    """
+    Insere os horários e regras padrão nas tabelas recém-criadas (``new_tables``, nomes das
+    tabelas). Tabelas que já existiam não são tocadas, mesmo vazias: o admin pode ter removido
+    todas as regras de propósito. Retorna True se criou algo.
+    """
+    created = False
+    if BusinessHours.__tablename__ in new_tables:
+        for weekday, start_time, end_time in DEFAULT_BUSINESS_HOURS:
+            db.session.add(BusinessHours(weekday=weekday, start_time=start_time, end_time=end_time))
+        created = True
+    if RecurringRule.__tablename__ in new_tables:
+        for weekdays, start_time, end_time, reason in DEFAULT_RECURRING_RULES:
+            db.session.add(RecurringRule(weekdays=weekdays, start_time=start_time, end_time=end_time,
+                                         reason=reason, active=True))
+        created = True
+    if created:
+        db.session.commit()
+        invalidate_schedule_cache()
+    return created
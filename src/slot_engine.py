@@ -0,0 +1,115 @@
+# src/slot_engine.py
+"""
+Motor de slots baseado em bitmask.
+
+Cada dia é representado por um inteiro em que o bit ``i`` corresponde ao slot de
+30 minutos que começa ``i * 30`` minutos após a meia-noite (bit 0 = 00:00,
+bit 28 = 14:00, bit 47 = 23:30). Horários de funcionamento, regras recorrentes e
+bloqueios viram máscaras e são combinados com operações bit a bit, então o
+caminho quente de disponibilidade não faz parsing de strings.
+"""
+
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+FULL_DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+
+# Rótulos "HH:MM" pré-calculados para cada slot do dia
+SLOT_LABELS = tuple(
+    f"{(i * SLOT_MINUTES) // 60:02d}:{(i * SLOT_MINUTES) % 60:02d}" for i in range(SLOTS_PER_DAY)
+)
+_SLOT_BY_LABEL = {label: i for i, label in enumerate(SLOT_LABELS)}
+
+
+# --- Conversões entre horários, slots e máscaras ---
+
+def minutes_of(t):
+    """Minutos desde a meia-noite de um ``datetime.time``."""
+    return t.hour * 60 + t.minute
+
+
+def slot_index(t):
+    """Índice do slot que contém o horário ``t``."""
+    return minutes_of(t) // SLOT_MINUTES
+
+
+def range_mask(start_minutes, end_minutes):
+    """Máscara dos slots que se sobrepõem ao intervalo [start, end), em minutos."""
+    first = max(start_minutes // SLOT_MINUTES, 0)
+    last = min(-(-end_minutes // SLOT_MINUTES), SLOTS_PER_DAY)  # exclusivo (teto da divisão)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def time_range_mask(start_time, end_time):
+    """Máscara dos slots que se sobrepõem ao intervalo [start_time, end_time)."""
+    return range_mask(minutes_of(start_time), minutes_of(end_time))
+
+
+def duration_mask(start_time, duration_minutes):
+    """Máscara dos slots ocupados por um atendimento que começa em ``start_time``."""
+    start = minutes_of(start_time)
+    return range_mask(start, start + duration_minutes)
+
+
+def labels_mask(labels):
+    """Converte uma lista de rótulos "HH:MM" alinhados à grade em máscara (ignora os demais)."""
+    mask = 0
+    for label in labels:
+        index = _SLOT_BY_LABEL.get(label)
+        if index is not None:
+            mask |= 1 << index
+    return mask
+
+
+def mask_labels(mask):
+    """Converte uma máscara na lista ordenada de rótulos "HH:MM"."""
+    labels = []
+    while mask:
+        lowest = mask & -mask
+        labels.append(SLOT_LABELS[lowest.bit_length() - 1])
+        mask ^= lowest
+    return labels
+
+
+def slots_needed(duration_minutes):
+    """Quantidade de slots consecutivos ocupados por um atendimento de ``duration_minutes``."""
+    return max(-(-(duration_minutes or SLOT_MINUTES) // SLOT_MINUTES), 1)
+
+
+def fitting_starts_mask(free_mask, duration_minutes):
+    """
+    Slots livres a partir dos quais cabe um atendimento inteiro de ``duration_minutes``,
+    ou seja, inícios de sequências contíguas de slots livres longas o suficiente.
+    """
+    fits = free_mask
+    for offset in range(1, slots_needed(duration_minutes)):
+        fits &= free_mask >> offset
+    return fits
+
+
+def has_slot(mask, t):
+    """Indica se o slot que contém ``t`` está marcado na máscara."""
+    return bool((mask >> slot_index(t)) & 1)
+
+
+def blocks_mask(blocks):
+    """
+    Combina bloqueios ``(start_time, end_time)`` em uma máscara.
+    Retorna ``(mask, full_day_closed)``; um bloqueio sem início e fim fecha o dia inteiro.
+    """
+    mask = 0
+    for start_time, end_time in blocks:
+        if start_time is None and end_time is None:
+            return FULL_DAY_MASK, True
+        if start_time is None or end_time is None:
+            continue
+        mask |= time_range_mask(start_time, end_time)
+    return mask, False
+
+
+def past_slots_mask(now):
+    """Máscara dos slots cujo início já passou (ou é exatamente agora) no horário ``now``."""
+    elapsed_seconds = now.hour * 3600 + now.minute * 60 + now.second
+    first_future_slot = elapsed_seconds // (SLOT_MINUTES * 60) + 1
+    return (1 << min(first_future_slot, SLOTS_PER_DAY)) - 1
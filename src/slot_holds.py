@@ -0,0 +1,190 @@
+# src/slot_holds.py
+"""
+Reservas temporárias (holds) de horários, em memória.
+
+Enquanto o cliente preenche o formulário, ``POST /slot-holds`` segura o horário por
+alguns minutos. As rotas de disponibilidade descontam os slots segurados e o
+``create_booking`` com o token do hold pula a revalidação, então clientes
+concorrentes desistem antes de abrir uma transação em vez de colidir na
+UniqueConstraint.
+
+Os holds expiram por um heap ordenado pelo vencimento, limpo preguiçosamente a cada
+acesso (O(log n) por hold vencido, sem thread de limpeza). Cada dia com holds tem uma
+versão, que entra nos ETags das rotas de disponibilidade; a versão vem de um contador
+global, então um dia que fica sem holds pode ser esquecido (versão 0 = nenhum hold)
+sem que uma versão já vista volte a aparecer com outro conteúdo.
+
+Cada cliente (o ``client_token`` do navegador, não o IP, que atrás do proxy é o mesmo
+para todos) segura no máximo ``HOLD_MAX_PER_CLIENT`` horários: um hold novo substitui o
+mais antigo do mesmo cliente, e também os dele que se sobrepõem ao novo.
+Como os outros caches em memória, o estado é por processo.
+"""
+import heapq
+import itertools
+import secrets
+import threading
+import time as _time
+from datetime import datetime, timedelta
+
+# Tempo de vida de um hold, em segundos
+HOLD_TTL_SECONDS = 5 * 60
+# Holds simultâneos por cliente; além disso, o mais antigo é substituído
+HOLD_MAX_PER_CLIENT = 3
+
+
+class SlotHold:
+    """Um horário segurado até ``expires_at``."""
+
+    def __init__(self, token, target_date, start_time, service_id, duration_minutes, mask, ttl_seconds,
+                 client=None):
+        self.token = token
+        self.client = client
+        self.target_date = target_date
+        self.start_time = start_time
+        self.service_id = service_id
+        self.duration_minutes = duration_minutes
+        self.mask = mask
+        self.deadline = _time.monotonic() + ttl_seconds
+        self.expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+
+    def covers(self, target_date, start_time, service_id):
+        """Indica se o hold é exatamente deste dia, horário e serviço."""
+        return (self.target_date == target_date and self.start_time == start_time
+                and self.service_id == service_id)
+
+    def to_dict(self):
+        return {
+            'hold_token': self.token,
+            'client_token': self.client,
+            'booking_date': self.target_date.isoformat(),
+            'booking_time': self.start_time.strftime('%H:%M'),
+            'service_id': self.service_id,
+            'expires_at': self.expires_at.isoformat() + 'Z',
+        }
+
+
+class SlotHoldStore:
+    """Holds ativos indexados por token, por dia e por cliente, com expiração por heap."""
+
+    def __init__(self, ttl_seconds=HOLD_TTL_SECONDS, max_per_client=HOLD_MAX_PER_CLIENT):
+        self.ttl_seconds = ttl_seconds
+        self.max_per_client = max_per_client
+        self._lock = threading.Lock()
+        self._holds = {}
+        self._by_day = {}
+        self._by_client = {}
+        self._expiry_heap = []
+        self._versions = {}
+        self._version_counter = itertools.count(1)
+
+    def _remove(self, hold):
+        del self._holds[hold.token]
+        day_holds = self._by_day[hold.target_date]
+        del day_holds[hold.token]
+        if day_holds:
+            self._versions[hold.target_date] = next(self._version_counter)
+        else:
+            # Sem holds no dia, a versão volta a 0, que só representa "nenhum hold"
+            del self._by_day[hold.target_date]
+            del self._versions[hold.target_date]
+        if hold.client is not None:
+            client_holds = self._by_client[hold.client]
+            client_holds.remove(hold)
+            if not client_holds:
+                del self._by_client[hold.client]
+
+    def _purge_expired(self):
+        now = _time.monotonic()
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, token = heapq.heappop(self._expiry_heap)
+            hold = self._holds.get(token)
+            if hold is not None and hold.deadline <= now:
+                self._remove(hold)
+
+    def create(self, target_date, start_time, service_id, duration_minutes, mask, client=None):
+        """
+        Segura os slots de ``mask`` no dia para ``client``. Retorna o SlotHold, ou None se um
+        hold de outro cliente já os segura. Holds do mesmo cliente que se sobrepõem são
+        substituídos, assim como o mais antigo dele se já tiver ``max_per_client`` holds.
+        """
+        with self._lock:
+            self._purge_expired()
+            overlapping = [held for held in self._by_day.get(target_date, {}).values() if held.mask & mask]
+            if any(client is None or held.client != client for held in overlapping):
+                return None
+            for held in overlapping:
+                self._remove(held)
+            if client is not None:
+                client_holds = self._by_client.get(client, [])
+                while len(client_holds) >= self.max_per_client:
+                    self._remove(client_holds[0])
+                    client_holds = self._by_client.get(client, [])
+            hold = SlotHold(secrets.token_urlsafe(16), target_date, start_time, service_id,
+                            duration_minutes, mask, self.ttl_seconds, client)
+            self._holds[hold.token] = hold
+            self._by_day.setdefault(target_date, {})[hold.token] = hold
+            if client is not None:
+                self._by_client.setdefault(client, []).append(hold)
+            heapq.heappush(self._expiry_heap, (hold.deadline, hold.token))
+            self._versions[target_date] = next(self._version_counter)
+            return hold
+
+    def get(self, token):
+        """Hold ativo do token, ou None se não existe ou já expirou."""
+        with self._lock:
+            self._purge_expired()
+            return self._holds.get(token)
+
+    def release(self, token):
+        """Libera o hold (ex.: depois que o agendamento foi confirmado). Retorna True se existia."""
+        with self._lock:
+            self._purge_expired()
+            hold = self._holds.get(token)
+            if hold is None:
+                return False
+            self._remove(hold)
+            return True
+
+    def release_client(self, client, target_date, mask):
+        """Libera os holds de ``client`` no dia que se sobrepõem a ``mask`` (ex.: horários agendados em lote)."""
+        with self._lock:
+            self._purge_expired()
+            for hold in list(self._by_client.get(client, [])):
+                if hold.target_date == target_date and hold.mask & mask:
+                    self._remove(hold)
+
+    def held_mask(self, target_date, exclude_client=None):
+        """Máscara dos slots segurados no dia, opcionalmente ignorando os holds de ``exclude_client``."""
+        with self._lock:
+            self._purge_expired()
+            mask = 0
+            for hold in self._by_day.get(target_date, {}).values():
+                if exclude_client is None or hold.client != exclude_client:
+                    mask |= hold.mask
+            return mask
+
+    def held_masks(self, start_date, end_date):
+        """``{data: máscara segurada}`` para os dias com holds em [start, end)."""
+        with self._lock:
+            self._purge_expired()
+            masks = {}
+            for day, day_holds in self._by_day.items():
+                if start_date <= day < end_date:
+                    for hold in day_holds.values():
+                        masks[day] = masks.get(day, 0) | hold.mask
+            return masks
+
+    def version(self, target_date):
+        """Versão que muda sempre que os holds do dia mudam (criação, liberação ou expiração); 0 sem holds."""
+        with self._lock:
+            self._purge_expired()
+            return self._versions.get(target_date, 0)
+
+    def versions(self, start_date, end_date):
+        """``{data: versão}`` dos dias em [start, end) com holds ativos."""
+        with self._lock:
+            self._purge_expired()
+            return {day: version for day, version in self._versions.items() if start_date <= day < end_date}
+
+
+slot_holds = SlotHoldStore()
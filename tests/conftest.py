@@ -0,0 +1,55 @@
+# tests/conftest.py
+"""
+Fixtures dos testes: a aplicação roda contra um SQLite temporário criado por
+``init_database()`` (o src/database/app.db nunca é usado). Rode da raiz do
+repositório com ``python -m pytest -q``.
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_database_dir = tempfile.TemporaryDirectory()
+DATABASE_URL = f"sqlite:///{os.path.join(_database_dir.name, 'app.db')}"
+os.environ['DATABASE_URL'] = DATABASE_URL
+
+from src.main import app as flask_app, init_database, db  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    init_database()
+    yield flask_app
+    with flask_app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_statements(app):
+    """Conta os comandos SQL executados dentro do bloco: ``with count_statements() as counter: ...``."""
+    @contextmanager
+    def counting():
+        counter = {'statements': 0}
+
+        def before_cursor_execute(*args):
+            counter['statements'] += 1
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    return counting
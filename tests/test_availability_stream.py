@@ -0,0 +1,126 @@
+# tests/test_availability_stream.py
+"""
+Centenas de assinantes de /availability/stream no servidor do contêiner (gunicorn
+com um worker gevent): todos recebem o delta de uma escrita e o worker não cria uma
+thread do sistema por conexão.
+"""
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+from conftest import DATABASE_URL, ROOT
+
+pytest.importorskip('gevent')
+pytest.importorskip('gunicorn')
+
+SUBSCRIBERS = 300
+STREAM_DATE = '2043-03-03'  # Terça-feira
+# Threads do sistema toleradas no worker (principal + pool interno do gevent), bem abaixo de SUBSCRIBERS
+MAX_WORKER_THREADS = 10
+TIMEOUT_SECONDS = 30
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def _wait_for_port(port, server):
+    deadline = time.monotonic() + TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            pytest.fail(f'gunicorn terminou com código {server.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    pytest.fail('gunicorn não abriu a porta a tempo')
+
+
+@pytest.fixture
+def gevent_server(app):
+    """Sobe o gunicorn como no src/Dockerfile, usando o banco temporário dos testes."""
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--worker-class', 'gevent', '--workers', '1',
+         '--worker-connections', '1000', '--bind', f'127.0.0.1:{port}',
+         # Streams abertos só percebem a desconexão no próximo keepalive; não espera por eles ao encerrar
+         '--graceful-timeout', '1', 'src.main:app'],
+        cwd=ROOT, env=dict(os.environ, DATABASE_URL=DATABASE_URL),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_for_port(port, server)
+        yield port, server
+    finally:
+        server.terminate()
+        server.wait(TIMEOUT_SECONDS)
+
+
+def _worker_threads(master_pid):
+    """Quantidade de threads do sistema do worker do gunicorn (via /proc), ou None fora do Linux."""
+    children_file = f'/proc/{master_pid}/task/{master_pid}/children'
+    if not os.path.exists(children_file):
+        return None
+    with open(children_file) as children:
+        worker_pid = int(children.read().split()[0])
+    return len(os.listdir(f'/proc/{worker_pid}/task'))
+
+
+def _read_until(selector, buffers, marker):
+    """Lê dos sockets até todos terem recebido ``marker``; retorna quantos receberam."""
+    pending = {key.fileobj for key in selector.get_map().values() if marker not in buffers[key.fileobj]}
+    deadline = time.monotonic() + TIMEOUT_SECONDS
+    while pending and time.monotonic() < deadline:
+        for key, _ in selector.select(timeout=1):
+            data = key.fileobj.recv(65536)
+            buffers[key.fileobj] += data
+            if marker in buffers[key.fileobj]:
+                pending.discard(key.fileobj)
+    return SUBSCRIBERS - len(pending)
+
+
+def test_hundreds_of_subscribers_share_one_worker_thread(gevent_server):
+    port, server = gevent_server
+    request = (f'GET /api/availability/stream?date={STREAM_DATE} HTTP/1.1\r\n'
+               f'Host: 127.0.0.1:{port}\r\nAccept: text/event-stream\r\n\r\n').encode()
+
+    selector = selectors.DefaultSelector()
+    buffers = {}
+    try:
+        for _ in range(SUBSCRIBERS):
+            subscriber = socket.create_connection(('127.0.0.1', port))
+            subscriber.sendall(request)
+            subscriber.setblocking(False)
+            selector.register(subscriber, selectors.EVENT_READ)
+            buffers[subscriber] = b''
+
+        assert _read_until(selector, buffers, b'event: snapshot') == SUBSCRIBERS
+
+        threads = _worker_threads(server.pid)
+        if threads is not None:
+            assert threads <= MAX_WORKER_THREADS
+
+        block = urllib.request.Request(
+            f'http://127.0.0.1:{port}/api/blocked-times', method='POST',
+            headers={'Content-Type': 'application/json'},
+            data=json.dumps({'blocked_date': STREAM_DATE, 'start_time': '15:00', 'end_time': '15:30',
+                             'reason': 'Teste de stream'}).encode())
+        with urllib.request.urlopen(block, timeout=TIMEOUT_SECONDS) as response:
+            assert response.status == 201
+
+        assert _read_until(selector, buffers, b'event: availability') == SUBSCRIBERS
+        assert all(b'"removed": ["15:00"]' in data for data in buffers.values())
+    finally:
+        for subscriber in buffers:
+            selector.unregister(subscriber)
+            subscriber.close()
+        selector.close()
@@ -0,0 +1,78 @@
+# tests/test_booking_lists.py
+"""
+As listas de agendamentos carregam cliente, bloqueio e serviço sem consultas por
+linha: o número de comandos SQL de cada requisição não depende de quantas linhas ela
+devolve.
+"""
+from datetime import date, timedelta
+from itertools import count
+
+import pytest
+
+BOOKING_TIMES = ('14:00', '15:00', '16:00', '17:00')
+_customers = count(1)
+
+
+def _create_bookings(client, first_day, total):
+    """Cria ``total`` agendamentos, cada um de um cliente diferente, em dias úteis a partir de ``first_day``."""
+    created = 0
+    current_date = first_day
+    while created < total:
+        if current_date.isoweekday() <= 5:
+            for booking_time in BOOKING_TIMES[:total - created]:
+                number = next(_customers)
+                response = client.post('/api/bookings', json={
+                    'customer': {'name': f'Cliente {number}', 'email': f'lista{number}@exemplo.com',
+                                 'phone': f'11 9{number:08d}'},
+                    'booking_date': current_date.isoformat(),
+                    'booking_time': booking_time,
+                    'service_id': 1 + created % 10,
+                })
+                assert response.status_code == 201, response.json
+                created += 1
+        current_date += timedelta(days=1)
+
+
+def _statements_for(client, count_statements, url):
+    client.get(url)  # Aquece os caches em processo (catálogo) antes de contar
+    with count_statements() as counter:
+        response = client.get(url)
+    assert response.status_code == 200, response.json
+    return counter['statements'], response.json
+
+
+# Dois anos com quantidades bem diferentes de agendamentos: {total: primeiro dia}
+DATASETS = {2: date(2040, 1, 2), 40: date(2041, 1, 2)}
+
+
+@pytest.fixture(scope='module')
+def booking_datasets(app):
+    client = app.test_client()
+    for total, first_day in DATASETS.items():
+        _create_bookings(client, first_day, total)
+    return DATASETS
+
+
+@pytest.mark.parametrize('query', [
+    '',
+    '&page_size=100',
+    '&include=customer,service',
+])
+def test_booking_list_statement_count_does_not_grow_with_rows(client, count_statements, booking_datasets, query):
+    statements = {}
+    for total, first_day in booking_datasets.items():
+        url = f'/api/bookings?start_date={first_day.isoformat()}&end_date={first_day.replace(month=12).isoformat()}{query}'
+        statements[total], payload = _statements_for(client, count_statements, url)
+        rows = payload if isinstance(payload, list) else payload['bookings']
+        assert len(rows) == total
+    assert statements[2] == statements[40]
+
+
+def test_next_appointments_statement_count_does_not_grow_with_rows(client, count_statements):
+    url = '/api/admin/dashboard/next-appointments'
+    _create_bookings(client, date(2042, 1, 2), 1)
+    few, _ = _statements_for(client, count_statements, url)
+    _create_bookings(client, date(2042, 2, 3), 20)
+    many, payload = _statements_for(client, count_statements, url)
+    assert payload
+    assert few == many
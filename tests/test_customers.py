@@ -0,0 +1,35 @@
+# tests/test_customers.py
+"""Identidade do cliente no agendamento: o e-mail normalizado; o telefone pode ser compartilhado."""
+from datetime import date, timedelta
+
+
+def _next_weekday(days_ahead):
+    current_date = date.today() + timedelta(days=days_ahead)
+    while current_date.isoweekday() > 5:
+        current_date += timedelta(days=1)
+    return current_date.isoformat()
+
+
+def _book(client, customer, booking_time):
+    return client.post('/api/bookings', json={'customer': customer, 'booking_date': _next_weekday(20),
+                                              'booking_time': booking_time, 'service_id': 1})
+
+
+def test_same_email_in_other_case_is_the_same_customer(client):
+    first = _book(client, {'name': 'Ana Souza', 'email': 'Ana.Souza@exemplo.com', 'phone': '(11) 91111-0001'}, '14:00')
+    second = _book(client, {'name': 'Ana', 'email': ' ana.souza@EXEMPLO.com', 'phone': '+55 11 91111-0001'}, '15:00')
+    assert first.status_code == 201 and second.status_code == 201
+    assert first.json['customer_id'] == second.json['customer_id']
+
+
+def test_phone_of_another_customer_creates_a_new_customer(client):
+    owner = _book(client, {'name': 'Bia', 'email': 'bia@exemplo.com', 'phone': '(11) 92222-0002'}, '16:00')
+    assert owner.status_code == 201
+    other = _book(client, {'name': 'Bob', 'email': 'bob@exemplo.com', 'phone': '11 92222-0002'}, '17:00')
+    assert other.status_code == 201
+    assert other.json['customer_id'] != owner.json['customer_id']
+    customers = {booking['booking_time'][:5]: booking['customer']
+                 for booking in client.get(f"/api/bookings?date={_next_weekday(20)}").json}
+    assert customers['16:00']['email'] == 'bia@exemplo.com'
+    assert customers['17:00']['email'] == 'bob@exemplo.com'
+    assert customers['17:00']['phone'] == '11 92222-0002'
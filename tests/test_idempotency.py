@@ -0,0 +1,32 @@
+# tests/test_idempotency.py
+"""Idempotency-Key: só UUIDs são aceitos, e a repetição recebe a resposta guardada."""
+import uuid
+from datetime import date, timedelta
+
+import pytest
+
+
+def _booking(email, booking_time):
+    booking_date = date.today() + timedelta(days=50)
+    while booking_date.isoweekday() > 5:
+        booking_date += timedelta(days=1)
+    return {'customer': {'name': 'Duda', 'email': email, 'phone': f'11 9444{booking_time[:2]}-0004'},
+            'booking_date': booking_date.isoformat(), 'booking_time': booking_time, 'service_id': 1}
+
+
+@pytest.mark.parametrize('key', ['1', 'pedido-42', 'x' * 300])
+def test_key_that_is_not_a_uuid_is_a_bad_request(client, key):
+    response = client.post('/api/bookings', json=_booking('duda@exemplo.com', '14:00'),
+                           headers={'Idempotency-Key': key})
+    assert response.status_code == 400
+    assert 'UUID' in response.json['error']
+
+
+def test_repeated_uuid_key_replays_the_first_response(client):
+    key = str(uuid.uuid4())
+    payload = _booking('duda.uuid@exemplo.com', '15:00')
+    first = client.post('/api/bookings', json=payload, headers={'Idempotency-Key': key})
+    again = client.post('/api/bookings', json=payload, headers={'Idempotency-Key': key.upper()})
+    assert first.status_code == 201
+    assert again.status_code == 201 and again.headers['Idempotent-Replayed'] == 'true'
+    assert again.json['id'] == first.json['id']
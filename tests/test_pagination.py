@@ -0,0 +1,27 @@
+# tests/test_pagination.py
+"""Cursores malformados são rejeitados com 400, nunca com 500."""
+import base64
+import json
+
+import pytest
+
+
+def _cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+@pytest.mark.parametrize('cursor', [
+    'não-é-base64',
+    _cursor({'date': '2025-07-15'}),
+    _cursor(['latest', '2025-07-15T10:00:00', 1]),
+    _cursor(['date', 123, '10:00:00', 1]),
+    _cursor(['date', '2025-07-15', ['10:00:00'], 1]),
+    _cursor(['date', '2025-07-15', '10:00:00', 'um']),
+    _cursor(['date', '15/07/2025', '10:00:00', 1]),
+])
+def test_malformed_cursor_is_a_bad_request(client, cursor):
+    for url in (f'/api/bookings?cursor={cursor}', f'/api/blocked-times?cursor={cursor}'):
+        response = client.get(url)
+        assert response.status_code == 400, (url, response.json)
+        assert 'Cursor' in response.json['error']
+
@@ -0,0 +1,14 @@
+# tests/test_query_plans.py
+"""
+As consultas quentes de src/query_plans.py continuam usando os índices esperados:
+o teste falha se um índice sumir ou um filtro de data deixar de usar o índice.
+"""
+from src.query_plans import check_query_plans
+
+
+def test_hot_queries_use_expected_indexes(app):
+    with app.app_context():
+        results = check_query_plans()
+    assert results
+    failures = [(description, plan) for description, plan, ok in results if not ok]
+    assert failures == []
@@ -0,0 +1,107 @@
+# tests/test_slot_holds.py
+"""Limites dos holds por cliente e horizonte, e versões por dia sem crescimento ilimitado."""
+from datetime import date, time, timedelta
+
+from src.slot_holds import SlotHoldStore
+
+DAY = date(2044, 5, 3)
+
+
+def _hold(store, target_date, start_hour, client, slots=1):
+    mask = ((1 << slots) - 1) << (start_hour * 2)
+    return store.create(target_date, time(start_hour, 0), 1, 30 * slots, mask, client=client)
+
+
+def test_new_hold_replaces_the_oldest_of_the_same_client():
+    store = SlotHoldStore(max_per_client=2)
+    first = _hold(store, DAY, 14, 'a')
+    second = _hold(store, DAY, 15, 'a')
+    third = _hold(store, DAY, 16, 'a')
+    assert store.get(first.token) is None
+    assert store.get(second.token) is not None and store.get(third.token) is not None
+    assert store.held_mask(DAY) == (1 << 30) | (1 << 32)
+
+
+def test_client_can_re_hold_an_overlapping_slot_but_others_cannot():
+    store = SlotHoldStore()
+    first = _hold(store, DAY, 14, 'a', slots=2)
+    assert _hold(store, DAY, 14, 'b') is None
+    again = _hold(store, DAY, 14, 'a')
+    assert again is not None and store.get(first.token) is None
+    assert store.held_mask(DAY, exclude_client='a') == 0
+
+
+def test_versions_are_dropped_with_the_last_hold_and_never_reused():
+    store = SlotHoldStore()
+    hold = _hold(store, DAY, 14, 'a')
+    first_version = store.version(DAY)
+    assert first_version > 0
+    store.release(hold.token)
+    assert store.version(DAY) == 0
+    assert store.versions(DAY, DAY + timedelta(days=1)) == {}
+    _hold(store, DAY, 14, 'b')
+    assert store.version(DAY) not in (0, first_version)
+
+
+def test_slot_hold_route_rejects_dates_beyond_the_horizon(client):
+    response = client.post('/api/slot-holds', json={
+        'booking_date': (date.today() + timedelta(days=365)).isoformat(), 'booking_time': '14:00', 'service_id': 1})
+    assert response.status_code == 400
+    response = client.post('/api/slot-holds', json={
+        'booking_date': (date.today() - timedelta(days=1)).isoformat(), 'booking_time': '14:00', 'service_id': 1})
+    assert response.status_code == 400
+
+
+def _next_weekday(days_ahead):
+    current_date = date.today() + timedelta(days=days_ahead)
+    while current_date.isoweekday() > 5:
+        current_date += timedelta(days=1)
+    return current_date.isoformat()
+
+
+def test_clients_behind_the_same_address_keep_their_own_holds(client):
+    booking_date = _next_weekday(30)
+    proxy = {'REMOTE_ADDR': '10.0.0.1'}
+
+    def hold(booking_time, client_token=None):
+        payload = {'booking_date': booking_date, 'booking_time': booking_time, 'service_id': 1}
+        if client_token:
+            payload['client_token'] = client_token
+        return client.post('/api/slot-holds', json=payload, environ_base=proxy)
+
+    first = hold('14:00')
+    assert first.status_code == 201
+    first_client = first.json['client_token']
+    # Outro navegador atrás do mesmo proxy: não substitui nem ultrapassa o hold do primeiro
+    second = hold('14:00')
+    assert second.status_code == 409
+    other_tokens = set()
+    other_client = None
+    for booking_time in ('15:00', '15:30', '16:00', '16:30'):
+        response = hold(booking_time, other_client)
+        assert response.status_code == 201
+        other_client = response.json['client_token']
+        other_tokens.add(response.json['hold_token'])
+    assert other_client != first_client
+    assert client.delete(f"/api/slot-holds/{first.json['hold_token']}").status_code == 200
+    # O segundo navegador ficou com no máximo HOLD_MAX_PER_CLIENT dos próprios holds
+    assert sum(client.delete(f'/api/slot-holds/{token}').status_code == 200 for token in other_tokens) == 3
+
+
+def test_batch_can_book_the_slots_held_by_the_same_client(client):
+    booking_date = _next_weekday(40)
+    first = client.post('/api/slot-holds', json={'booking_date': booking_date, 'booking_time': '14:00', 'service_id': 1})
+    client_token = first.json['client_token']
+    second = client.post('/api/slot-holds', json={'booking_date': booking_date, 'booking_time': '15:00',
+                                                  'service_id': 1, 'client_token': client_token})
+    assert first.status_code == 201 and second.status_code == 201
+    batch = {'customer': {'name': 'Carla', 'email': 'carla.lote@exemplo.com', 'phone': '11 93333-0003'},
+             'service_id': 1, 'items': [{'booking_date': booking_date, 'booking_time': '14:00'},
+                                        {'booking_date': booking_date, 'booking_time': '15:00'}]}
+    assert client.post('/api/bookings/batch', json=batch).status_code == 409
+    response = client.post('/api/bookings/batch', json=dict(batch, client_token=client_token))
+    assert response.status_code == 201
+    assert len(response.json['bookings']) == 2
+    # Os holds agendados foram liberados
+    assert client.delete(f"/api/slot-holds/{first.json['hold_token']}").status_code == 404
+    assert client.delete(f"/api/slot-holds/{second.json['hold_token']}").status_code == 404